@@ -20,6 +20,7 @@ from duqtools.config._schema_root import ConfigModel
 from duqtools.ids._schema import ImasBaseModel
 from duqtools.schema import (
     ARange,
+    Distribution,
     IDSOperationDim,
     LinSpace,
     OperationDim,
@@ -46,6 +47,7 @@ def gen_docs():
         ARange,
         ConfigModel,
         CreateConfigModel,
+        Distribution,
         IDSOperationDim,
         ImasBaseModel,
         JettoVariableModel,
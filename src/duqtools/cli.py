@@ -85,6 +85,14 @@ def logfile_option(f):
                         group='Common options')(f)
 
 
+def cache_option(f):
+    return click.option('--cache',
+                        is_flag=True,
+                        help='Cache the variables read from IMAS data.',
+                        cls=GroupOpt,
+                        group='Common options')(f)
+
+
 logging_options = (logfile_option, debug_option)
 all_options = (*logging_options, config_option, quiet_option, dry_run_option,
                yes_option)
@@ -108,6 +116,14 @@ def variables_option(f):
                         multiple=True)(f)
 
 
+def jobs_option(f):
+    return click.option('-j',
+                        '--jobs',
+                        type=int,
+                        default=1,
+                        help='Number of processes to use.')(f)
+
+
 def datafile_option(f):
     return click.option('-i',
                         '--input',
@@ -130,6 +146,7 @@ class OptionParser:
                     self.parse_yes,
                     self.parse_dry_run,
                     self.parse_quiet,
+                    self.parse_cache,
             ):
                 try:
                     parse(**kwargs)
@@ -183,6 +200,11 @@ class OptionParser:
     def parse_yes(self, *, yes, **kwargs):
         op_queue.yes = yes
 
+    def parse_cache(self, *, cache, **kwargs):
+        if cache:
+            from .ids._cache import enable_cache
+            enable_cache()
+
 
 def common_options(*options):
     """common_options.
@@ -271,19 +293,26 @@ def cli_setup(**kwargs):
 @click.option('--no-sampling',
               is_flag=True,
               help='Create base run (ignores `dimensions`/`sampler`).')
+@click.option('--chunk-size',
+              type=int,
+              default=None,
+              help=('Generate and create the runs in chunks of this size, '
+                    'and write `runs.yaml` incrementally.'))
+@jobs_option
 @common_options(*all_options)
-def cli_create(**kwargs):
+def cli_create(jobs, **kwargs):
     """Read duqtools.yaml and create the new IMAS data files from template
     data."""
     from .create import create
-    with op_queue_context():
-        create(cfg=CFG, **kwargs)
+    with op_queue_context(jobs=jobs):
+        create(cfg=CFG, jobs=jobs, **kwargs)
 
 
 @cli.command('recreate', cls=GroupCmd)
 @click.argument('runs', type=Path, nargs=-1)
+@jobs_option
 @common_options(*all_options)
-def cli_recreate(**kwargs):
+def cli_recreate(jobs, **kwargs):
     """Read `runs.yaml` and re-create the given runs.
 
     \b
@@ -292,7 +321,7 @@ def cli_recreate(**kwargs):
     - `duqtools recreate run_0003 run_0004 --force`
     """
     from .create import recreate
-    with op_queue_context():
+    with op_queue_context(jobs=jobs):
         recreate(cfg=CFG, **kwargs)
 
 
@@ -303,6 +332,9 @@ def cli_recreate(**kwargs):
 @click.option('--schedule',
               is_flag=True,
               help=('Schedule and submit jobs automatically.'))
+@click.option('--resume',
+              is_flag=True,
+              help=('Resume an interrupted `--schedule` from its journal.'))
 @click.option('-j',
               '--max_jobs',
               type=int,
@@ -344,7 +376,12 @@ def cli_submit(**kwargs):
     There is a scheduler that will continue to submit jobs until the
     specified maximum number of jobs is running. Once a job has
     completed, a new job will be submitted from the queue to fill the
-    spot.
+    spot. The state of the scheduler is kept in `duqtools_schedule.jsonl`,
+    use `--schedule --resume` to continue an interrupted scheduler.
+
+    Jobs are submitted concurrently, limited by `system.submit_rate`
+    and `system.submit_workers`. The latency for every job is written
+    to `duqtools_submit_report.csv`.
     """
     from .submit import submit
     with op_queue_context():
@@ -393,7 +430,7 @@ def cli_status(**kwargs):
               is_flag=True,
               help='Plot the errorbars (if present)')
 @datafile_option
-@common_options(*logging_options)
+@common_options(*logging_options, cache_option)
 def cli_plot(**kwargs):
     """Generate plots for IMAS data.
 
@@ -461,7 +498,8 @@ def cli_yolo(ctx, **kwargs):
 
 
 @cli.command('dash', cls=GroupCmd)
-@common_options(*logging_options, quiet_option, dry_run_option, yes_option)
+@common_options(*logging_options, quiet_option, dry_run_option, yes_option,
+                cache_option)
 def cli_dash(**kwargs):
     """Open dashboard for evaluating IDS data."""
     from .dash import dash
@@ -486,7 +524,8 @@ def cli_dash(**kwargs):
 @click.option('--force',
               is_flag=True,
               help='Overwrite existing output dataset.')
-@common_options(*all_options)
+@jobs_option
+@common_options(*all_options, cache_option)
 def cli_merge(**kwargs):
     """Merge data sets with error propagation.
 
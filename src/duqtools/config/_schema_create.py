@@ -1,7 +1,7 @@
 from __future__ import annotations
 
 from pathlib import Path
-from typing import Optional, Union
+from typing import Literal, Optional, Union
 
 from pydantic import Field
 
@@ -81,3 +81,30 @@ class CreateConfigModel(BaseModel):
         of all operations. By specifying a different `sampler`, a subset of
         this hypercube can be efficiently sampled. This paramater is optional.
         """))
+
+    copy_method: Literal['file', 'reflink', 'hardlink', 'overlay',
+                         'imas'] = Field('file',
+                                         description=f("""
+        How to copy the template data for every run. By default (`file`),
+        the data files are copied directly, letting the file system share or
+        copy the data blocks where it can. Use `reflink` to make copy-on-write
+        clones (e.g. on btrfs or xfs), this falls back to a regular copy if the
+        file system does not support it. `hardlink` links the data files to
+        the template data, linked files are copied before they are written to,
+        so that the template data are never modified. `overlay` only copies the
+        IDSs modified by the operations, the other IDSs are linked to the
+        template data, which must therefore not be moved or removed (HDF5 only,
+        falls back to `file` for MDSplus). `imas` reads and writes every IDS
+        via IMAS, this is much slower.
+        """))
+
+    ensemble: bool = Field(False,
+                           description=f("""
+        If True, apply the IDS operations to all runs at once. The template
+        data are read once and the operations are applied to all samples in a
+        single vectorized step, after which the data for each run are written
+        to its data entry. This is much faster for large numbers of samples,
+        but keeps the modified data for all runs in memory. Only applies if all
+        runs have the same operations (apart from their values), and none of
+        the operations use `custom` code or `input_variables`.
+        """))
@@ -1,21 +1,24 @@
 from __future__ import annotations
 
+import itertools
 import logging
 import shutil
 import warnings
 from pathlib import Path
-from typing import Any, Sequence
+from typing import Any, Iterable, Iterator, Optional, Sequence
 
 import pandas as pd
-from pydantic_yaml import to_yaml_file
+from pydantic_yaml import to_yaml_file, to_yaml_str
 
 from .apply_model import apply_model
 from .cleanup import remove_run
 from .config import Config
-from .ids import ImasHandle
+from .ids import IDSMapping, ImasHandle
+from .ids._ensemble import EnsembleData, apply_ensemble, ensemble_key
 from .matrix_samplers import get_matrix_sampler
 from .models import Job, Locations, Run, Runs
 from .operations import add_to_op_queue, op_queue
+from .schema import IDSOperation
 from .systems import get_system
 
 logger = logging.getLogger(__name__)
@@ -27,6 +30,15 @@ class CreateError(Exception):
     ...
 
 
+def _flatten(operations: Iterable[Any] | None) -> Iterator[Any]:
+    """Flatten (coupled) operations."""
+    for operation in operations or ():
+        if isinstance(operation, (list, tuple)):
+            yield from _flatten(operation)
+        else:
+            yield operation
+
+
 class CreateManager:
     """Docstring for CreateManager."""
 
@@ -67,14 +79,15 @@ class CreateManager:
         base_ops = [op.convert() for op in self.options.operations]
         return base_ops
 
-    def generate_ops_dict(self,
-                          *,
-                          base_only: bool = False) -> dict[str, list[Any]]:
-        """Generate set of operations for a run."""
+    def iter_ops(self,
+                 *,
+                 base_only: bool = False) -> Iterator[tuple[str, list[Any]]]:
+        """Lazily generate the name and set of operations for every run."""
         base_ops = self.get_base_ops()
 
         if base_only:
-            return {'base': base_ops}
+            yield 'base', base_ops
+            return
 
         matrix = tuple(model.expand() for model in self.options.dimensions)
         matrix_sampler = get_matrix_sampler(self.options.sampler.method)
@@ -82,12 +95,15 @@ class CreateManager:
         sampled_ops_lists = matrix_sampler(*matrix,
                                            **dict(self.options.sampler))
 
-        ops_dict = {}
         for i, ops_list in enumerate(sampled_ops_lists):
             name = f'{RUN_PREFIX}{i:04d}'
-            ops_dict[name] = [*base_ops, *ops_list]
+            yield name, [*base_ops, *ops_list]
 
-        return ops_dict
+    def generate_ops_dict(self,
+                          *,
+                          base_only: bool = False) -> dict[str, list[Any]]:
+        """Generate set of operations for a run."""
+        return dict(self.iter_ops(base_only=base_only))
 
     def make_run_models(self, *, ops_dict: dict[str, list[Any]],
                         absolute_dirpath: bool) -> list[Run]:
@@ -161,29 +177,94 @@ class CreateManager:
                          extra_description='Some targets already exist, '
                          'use --force to override')
 
-    @add_to_op_queue('Setting inital condition of', '{data_in}', quiet=True)
-    def apply_operations(self, data_in: ImasHandle, run_dir: Path,
-                         operations: list[Any]):
-        for model in operations:
-            apply_model(model,
-                        run_dir=run_dir,
-                        ids_mapping=data_in,
-                        system=self.system)
+    @add_to_op_queue('Setting inital condition of',
+                     '{data_in}',
+                     quiet=True,
+                     writes=('{data_in}', '{run_dir}'))
+    def apply_operations(self,
+                         data_in: ImasHandle,
+                         run_dir: Path,
+                         operations: list[Any],
+                         data_out: Optional[ImasHandle] = None,
+                         ids_data: Optional[EnsembleData] = None):
+        """Apply operations to the run.
+
+        The run is created from the template, the operations are applied and
+        the imas locations are set within a single system session, so that
+        the system configuration is read and written once.
+
+        Every IDS is read once, all operations are applied in memory, and
+        the modified IDSs are written back in one go at the end.
+
+        If `ids_data` is given, the IDS operations have already been applied
+        to the ensemble (see `apply_ensemble`), and the resulting data are
+        written instead.
+        """
+        mappings: dict[str, IDSMapping] = {}
+
+        with self.system.session(run_dir, template_drc=self.template_drc):
+            for model in _flatten(operations):
+                if isinstance(model, IDSOperation):
+                    if ids_data is not None:
+                        continue
+                    ids = model.variable.ids
+                    if ids not in mappings:
+                        mappings[ids] = data_in.get(ids)
+                    ids_mapping = mappings[ids]
+                else:
+                    ids_mapping = data_in
+
+                apply_model(model,
+                            run_dir=run_dir,
+                            ids_mapping=ids_mapping,
+                            system=self.system)
+
+            if data_out:
+                self.system.set_imas_locations(run_dir,
+                                               inp=data_in,
+                                               out=data_out)
+
+        for ids, arrays in (ids_data or {}).items():
+            mappings[ids] = ids_mapping = data_in.get(ids)
+            for path, data in arrays.items():
+                ids_mapping[path] = data
+
+        if mappings:
+            logger.info('Writing data entry: %s', data_in)
+            data_in.update_from_mappings(mappings.values())
 
     @add_to_op_queue('Writing runs', '{self.runs_yaml}', quiet=True)
-    def write_runs_file(self, runs: Sequence[Run]) -> None:
+    def write_runs_file(self,
+                        runs: Sequence[Run],
+                        append: bool = False) -> None:
+        """Write runs to `runs.yaml`, if `append`, add the runs to the
+        existing file."""
         runs = Runs.model_validate(runs, from_attributes=True)
 
+        filenames = [self.runs_yaml]
+
+        # Only if it is a different directory
+        if self._is_runs_dir_different_from_config_dir():
+            filenames.append(self.runs_dir / 'runs.yaml')
+
         with warnings.catch_warnings():
             warnings.simplefilter('ignore')
-            to_yaml_file(self.runs_yaml, runs)
 
-            # Only if it is a different directory
-            if self._is_runs_dir_different_from_config_dir():
-                to_yaml_file(self.runs_dir / 'runs.yaml', runs)
+            if not append:
+                for filename in filenames:
+                    to_yaml_file(filename, runs)
+                return
+
+            # runs.yaml is a list, so new items can be appended
+            string = to_yaml_str(runs)
+            for filename in filenames:
+                with open(filename, 'a') as f:
+                    f.write(string)
 
     @add_to_op_queue('Writing csv', quiet=True)
-    def write_runs_csv(self, runs: Sequence[Run]):
+    def write_runs_csv(self, runs: Sequence[Run], append: bool = False):
+        """Write data locations to csv, if `append`, add the runs to the
+        existing file."""
         fname = self.data_csv
 
         prefix = f'{self.cfg.tag}.' if self.cfg.tag else ''
@@ -193,10 +274,14 @@ class CreateManager:
             for run in runs if run.data_out
         }
         df = pd.DataFrame.from_dict(run_map, orient='index')
-        df.to_csv(fname)
+
+        mode = 'a' if append else 'w'
+        header = not append
+
+        df.to_csv(fname, mode=mode, header=header)
 
         if self._is_runs_dir_different_from_config_dir():
-            df.to_csv(self.runs_dir / fname)
+            df.to_csv(self.runs_dir / fname, mode=mode, header=header)
 
     def copy_config(self):
         if self.cfg._path is None:
@@ -218,7 +303,62 @@ class CreateManager:
         dir."""
         return Path.cwd().resolve() != self.runs_dir.resolve()
 
-    def create_run(self, model: Run, *, force: bool = False):
+    @staticmethod
+    def _modified_ids(operations) -> set[str]:
+        """Return the names of the IDSs modified by the operations."""
+        return {
+            operation.variable.ids
+            for operation in _flatten(operations)
+            if isinstance(operation, IDSOperation)
+        }
+
+    def apply_ensemble(self,
+                       runs: Sequence[Run]) -> Optional[list[EnsembleData]]:
+        """Apply the IDS operations for all runs at once.
+
+        Only if enabled via `create.ensemble`, and all runs have the
+        same IDS operations apart from their values.
+
+        Returns
+        -------
+        Optional[list[EnsembleData]]
+            The modified data for every run, or None if the operations
+            cannot be applied to the ensemble.
+        """
+        if not (self.options.ensemble and runs):
+            return None
+
+        keys = None
+        operations = []
+
+        for model in runs:
+            ops = list(_flatten(model.operations))
+
+            if any(
+                    getattr(op, 'input_variables', None) is not None
+                    for op in ops):
+                logger.info('Input variables cannot be used with ensemble, '
+                            'applying operations per run.')
+                return None
+
+            ids_ops = [op for op in ops if isinstance(op, IDSOperation)]
+            run_keys = [ensemble_key(op) for op in ids_ops]
+
+            if None in run_keys or (keys is not None and run_keys != keys):
+                logger.info('Operations differ between runs, '
+                            'applying operations per run.')
+                return None
+
+            keys = run_keys
+            operations.append(ids_ops)
+
+        return apply_ensemble(self.source, operations)
+
+    def create_run(self,
+                   model: Run,
+                   *,
+                   force: bool = False,
+                   ids_data: Optional[EnsembleData] = None):
         """Take a run model and create it."""
         op_queue.add(action=model.dirname.mkdir,
                      kwargs={
@@ -228,24 +368,133 @@ class CreateManager:
                      description='Creating run',
                      extra_description=f'{model.dirname}')
 
-        self.source.copy_data_to(
-            ImasHandle.model_validate(model.data_in, from_attributes=True))
+        data_in = ImasHandle.model_validate(model.data_in,
+                                            from_attributes=True)
+        self.source.copy_data_to(data_in,
+                                 method=self.options.copy_method,
+                                 ids=self._modified_ids(model.operations))
 
-        if self.template_drc:
-            self.system.copy_from_template(self.template_drc, model.dirname)
+        if not (model.data_in and model.data_out):
+            raise Exception(
+                'data not present in model, this should not happen')
 
-        self.apply_operations(model.data_in, model.dirname, model.operations)
+        self.apply_operations(data_in,
+                              model.dirname,
+                              model.operations,
+                              data_out=model.data_out,
+                              ids_data=ids_data)
 
         self.system.write_batchfile(model.dirname)
 
-        if model.data_in and model.data_out:
-            self.system.update_imas_locations(run=model.dirname,
-                                              inp=model.data_in,
-                                              out=model.data_out,
-                                              template_drc=self.template_drc)
-        else:
-            raise Exception(
-                'data not present in model, this should not happen')
+
+def _chunks(iterable: Iterable[Any], size: int) -> Iterator[list[Any]]:
+    """Split iterable into lists of (at most) `size` items."""
+    iterator = iter(iterable)
+    while chunk := list(itertools.islice(iterator, size)):
+        yield chunk
+
+
+def _apply_chunk(jobs: int) -> bool:
+    """Apply the operations queued for a chunk of runs.
+
+    Returns True if the operations were applied, after which the
+    remaining chunks are applied without asking again (`iter_create`
+    restores `op_queue.yes` when it is done).
+    """
+    applied = op_queue.confirm_apply_all(jobs=jobs)
+    op_queue.clear()
+
+    if applied:
+        op_queue.yes = True
+
+    return applied
+
+
+def iter_create(*,
+                cfg: Config,
+                force: bool = False,
+                no_sampling: bool = False,
+                absolute_dirpath: bool = False,
+                chunk_size: Optional[int] = None,
+                jobs: int = 1,
+                **kwargs) -> Iterator[list[Run]]:
+    """Create the runs chunk by chunk, see `create` for the parameters.
+
+    Without `chunk_size`, all runs are yielded as a single chunk, and
+    the queued operations are applied as usual (when the
+    `op_queue_context` exits).
+
+    With `chunk_size`, the operations for every chunk are confirmed and
+    applied before the chunk is yielded, so that only runs that have
+    been created are yielded. The operations of these runs are dropped,
+    so that they are not kept in memory.
+
+    Yields
+    ------
+    list[Run]
+        The runs in every chunk.
+    """
+    create_mgr = CreateManager(cfg)
+
+    ops_iter = create_mgr.iter_ops(base_only=no_sampling)
+
+    if chunk_size:
+        chunks = _chunks(ops_iter, chunk_size)
+    else:
+        chunks = iter((list(ops_iter), ))
+
+    yes = op_queue.yes
+
+    try:
+        for i, ops_chunk in enumerate(chunks):
+            chunk = create_mgr.make_run_models(
+                ops_dict=dict(ops_chunk),
+                absolute_dirpath=absolute_dirpath,
+            )
+
+            if not force:
+
+                target_exists = any([
+                    i == 0 and create_mgr.runs_yaml_exists(),
+                    create_mgr.data_locations_exist(chunk),
+                    create_mgr.run_dirs_exist(chunk),
+                ])
+
+                if target_exists:
+                    create_mgr.warn_no_create_runs()
+                    return
+
+            ensemble = create_mgr.apply_ensemble(chunk)
+
+            for j, model in enumerate(chunk):
+                ids_data = ensemble[j] if ensemble else None
+                with op_queue.group(model.dirname):
+                    create_mgr.create_run(model,
+                                          force=force,
+                                          ids_data=ids_data)
+
+            create_mgr.write_runs_file(chunk, append=i > 0)
+            create_mgr.write_runs_csv(chunk, append=i > 0)
+
+            if i == 0:
+                create_mgr.copy_config()
+
+            if chunk_size and op_queue.enabled:
+                if op_queue.dry_run:
+                    # The queue is shown when the `op_queue_context` exits
+                    logger.info(
+                        'Dry run, only the first chunk of runs is shown.')
+                    return
+
+                if not _apply_chunk(jobs):
+                    return
+
+                for model in chunk:
+                    model.operations = None
+
+            yield chunk
+    finally:
+        op_queue.yes = yes
 
 
 def create(*,
@@ -253,6 +502,8 @@ def create(*,
            force: bool = False,
            no_sampling: bool = False,
            absolute_dirpath: bool = False,
+           chunk_size: Optional[int] = None,
+           jobs: int = 1,
            **kwargs) -> list[Run]:
     """Create input for jetto and IDS data structures.
 
@@ -264,39 +515,32 @@ def create(*,
         Duqtools config
     no_sampling : bool
         If true, create base run by ignoring `sampler`/`dimensions`.
+    chunk_size : int, optional
+        If given, generate and create the runs in chunks of this size.
+        The operations for each chunk are applied and the runs are
+        appended to `runs.yaml` before the next chunk is generated,
+        so that the operations for all runs are never in memory at once.
+        Use `iter_create` to process the runs chunk by chunk.
+    jobs : int, optional
+        Number of workers to apply the operations for a chunk with.
 
     **kwargs
         Unused.
-    """
-    create_mgr = CreateManager(cfg)
 
-    ops_dict = create_mgr.generate_ops_dict(base_only=no_sampling)
-
-    runs = create_mgr.make_run_models(
-        ops_dict=ops_dict,
-        absolute_dirpath=absolute_dirpath,
-    )
-
-    if not force:
-
-        target_exists = any([
-            create_mgr.runs_yaml_exists(),
-            create_mgr.data_locations_exist(runs),
-            create_mgr.run_dirs_exist(runs),
-        ])
-
-        if target_exists:
-            create_mgr.warn_no_create_runs()
-            return []
-
-    for model in runs:
-        create_mgr.create_run(model, force=force)
-
-    create_mgr.write_runs_file(runs)
-    create_mgr.write_runs_csv(runs)
-    create_mgr.copy_config()
+    Returns
+    -------
+    list[Run]
+        The runs. With `chunk_size`, only the runs that have been
+        created, without their operations.
+    """
+    chunks = iter_create(cfg=cfg,
+                         force=force,
+                         no_sampling=no_sampling,
+                         absolute_dirpath=absolute_dirpath,
+                         chunk_size=chunk_size,
+                         jobs=jobs)
 
-    return runs
+    return [run for chunk in chunks for run in chunk]
 
 
 def create_api(config: dict, **kwargs) -> dict[str, tuple[Job, Run]]:
@@ -349,7 +593,8 @@ def recreate(*, cfg: Config, runs: Sequence[Path], **kwargs):
         run_models.append(model)
 
     for model in run_models:
-        create_mgr.create_run(model)
+        with op_queue.group(model.dirname):
+            create_mgr.create_run(model)
 
     return run_models
 
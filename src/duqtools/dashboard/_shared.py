@@ -6,11 +6,11 @@ from typing import Sequence
 
 import streamlit as st
 import xarray as xr
-from imas2xarray import standardize_grid_and_time
 
 from duqtools.api import ImasHandle
 from duqtools.config import var_lookup
 from duqtools.ids._mapping import EmptyVarError
+from duqtools.ids._rebase import standardize_grid_and_time
 
 if sys.version_info < (3, 10):
     from importlib_resources import files
@@ -7,12 +7,14 @@ from abc import abstractmethod
 from contextlib import contextmanager
 from getpass import getuser
 from pathlib import Path
-from typing import TYPE_CHECKING, Sequence
+from typing import TYPE_CHECKING, Collection, Iterable, Optional, Sequence
 
 from imas2xarray import squash_placeholders
 from pydantic import field_validator
 
-from ._copy import add_provenance_info
+from ._cache import variable_cache
+from ._copy import add_provenance_info, materialize_file
+from ._lazy import LazyIDSMapping
 from ._mapping import IDSMapping
 from ._schema import ImasBaseModel
 
@@ -140,18 +142,26 @@ class _ImasHandle(ImasBaseModel):
 
         return data
 
-    def get(self, ids: str = 'core_profiles') -> IDSMapping:
+    def get(self,
+            ids: str = 'core_profiles',
+            lazy: bool = False) -> IDSMapping:
         """Map the data to a dict-like structure.
 
         Parameters
         ----------
         ids : str, optional
             Name of profiles to open
+        lazy : bool, optional
+            If True, only read the data nodes when they are requested,
+            using partial reads where the backend supports them.
 
         Returns
         -------
         IDSMapping
         """
+        if lazy:
+            return LazyIDSMapping(self, ids)
+
         raw_data = self.get_raw_data(ids)
         return IDSMapping(raw_data)
 
@@ -208,6 +218,10 @@ class _ImasHandle(ImasBaseModel):
         This function looks up the data location from the
         `duqtools.config.var_lookup` table, and returns
 
+        Only the data nodes for the requested variables are read
+        if the backend supports partial reads. The result is stored in
+        a persistent cache (see `duqtools.ids._cache`).
+
         Parameters
         ----------
         variables : Sequence[Union[str, Variable]]
@@ -238,13 +252,24 @@ class _ImasHandle(ImasBaseModel):
 
         ids = list(idss)[0]
 
-        data_map = self.get(ids)
+        cache_key = variable_cache.key(self,
+                                       ids,
+                                       var_models,
+                                       squash=squash,
+                                       **kwargs)
+        ds = variable_cache.load(cache_key)
+        if ds is not None:
+            return ds
+
+        data_map = self.get(ids, lazy=True)
 
         ds = data_map.to_xarray(variables=var_models, **kwargs)
 
         if squash:
             ds = squash_placeholders(ds)
 
+        variable_cache.save(cache_key, ds)
+
         return ds
 
     @abstractmethod
@@ -286,6 +311,32 @@ class _ImasHandle(ImasBaseModel):
         finally:
             entry.close()
 
+    def materialize(self, ids: Optional[Collection[str]] = None):
+        """Replace data files that are linked to another data entry by
+        copies, so that the data can be modified.
+
+        Data files are linked when the entry is created with
+        `copy_data_to(..., method='overlay')` or
+        `copy_data_to(..., method='hardlink')`.
+
+        Parameters
+        ----------
+        ids : Collection[str], optional
+            Only materialize the files for these IDSs (and the master
+            file). By default, or if the IDSs are not stored in separate
+            files, materialize all files.
+        """
+        paths = self.paths()
+
+        if ids is not None and set(ids) <= {path.stem for path in paths}:
+            paths = [
+                path for path in paths
+                if path.stem in ids or path.stem == 'master'
+            ]
+
+        for path in paths:
+            materialize_file(path)
+
     def update_from(self, mapping: IDSMapping):
         """Synchronize updated data back to IMAS db entry.
 
@@ -297,7 +348,33 @@ class _ImasHandle(ImasBaseModel):
             Points to an IDS mapping of the data that should be written
             to this handle.
         """
-        add_provenance_info(handle=self)
+        self.update_from_mappings((mapping, ))
+
+    def update_from_mappings(self, mappings: Iterable[IDSMapping]):
+        """Synchronize multiple updated IDSs back to IMAS db entry.
+
+        The data entry is opened once to write all IDSs,
+        and the provenance info is added once afterwards.
+
+        Parameters
+        ----------
+        mappings : Iterable[IDSMapping]
+            IDS mappings of the data that should be written to this handle.
+        """
+        mappings = tuple(mappings)
+
+        for mapping in mappings:
+            if (isinstance(mapping, LazyIDSMapping)
+                    and not mapping._fully_loaded):
+                raise ValueError('Cannot write back a partially loaded IDS, '
+                                 'use `ImasHandle.get(ids, lazy=False)`.')
+
+        ids_names = {type(mapping._ids).__name__ for mapping in mappings}
+        # core_profiles is updated with the provenance info
+        self.materialize(ids=ids_names | {'core_profiles'})
 
         with self.open() as db_entry:
-            mapping._ids.put(db_entry=db_entry)
+            for mapping in mappings:
+                mapping._ids.put(db_entry=db_entry)
+
+        add_provenance_info(handle=self)
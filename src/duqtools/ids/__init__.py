@@ -5,6 +5,7 @@ import logging
 from ._handle import ImasHandle
 from ._hdf5handle import HDF5ImasHandle
 from ._imas import imas_mocked
+from ._lazy import LazyIDSMapping
 from ._mapping import IDSMapping
 from ._mdsplushandle import MdsplusImasHandle
 from ._merge import merge_data
@@ -18,4 +19,5 @@ __all__ = [
     'merge_data',
     'imas_mocked',
     'IDSMapping',
+    'LazyIDSMapping',
 ]
@@ -1,12 +1,13 @@
 from __future__ import annotations
 
 import logging
-from typing import TYPE_CHECKING, Optional, Union
+from typing import TYPE_CHECKING, Any, Optional, Union
 
 import numpy as np
 
 from .._logging_utils import duqlog_screen
 from ._handle import ImasHandle
+from ._mapping import compile_path
 
 if TYPE_CHECKING:
     from types import SimpleNamespace
@@ -17,6 +18,111 @@ if TYPE_CHECKING:
 logger = logging.getLogger(__name__)
 
 
+def _get_value(model: IDSOperation, path: str, ids_mapping: IDSMapping) -> Any:
+    """Get the value to apply to the data at `path`."""
+    if model.scale_to_error:
+        sigma_key = path + model._upper_suffix
+
+        if model.value < 0:
+            lower_key = path + model._lower_suffix
+            if lower_key in ids_mapping:
+                sigma_key = lower_key
+
+        if sigma_key not in ids_mapping:
+            raise ValueError(f'scale_to_error={model.scale_to_error} '
+                             f'but `{sigma_key}` is empty.')
+
+        sigma = ids_mapping[sigma_key]
+
+        return sigma * model.value
+
+    return model.value
+
+
+def _get_values(model: IDSOperation, paths: list[str],
+                ids_mapping: IDSMapping) -> list[Any]:
+    """Get the values to apply to the data at all `paths`.
+
+    The error nodes for all paths are looked up in a single pass
+    over the IDS, instead of once for every path.
+    """
+    if not model.scale_to_error:
+        return [model.value for _ in paths]
+
+    suffixes = [model._upper_suffix]
+    if model.value < 0:
+        suffixes.insert(0, model._lower_suffix)
+
+    patterns = [model.variable.path + suffix for suffix in suffixes]
+
+    if any(compile_path(pattern) is None for pattern in patterns):
+        return [_get_value(model, path, ids_mapping) for path in paths]
+
+    sigmas: dict[str, Any] = {}
+    for pattern in patterns:
+        sigmas.update(ids_mapping.findall(pattern))
+
+    values = []
+    for path in paths:
+        for suffix in suffixes:
+            if (sigma_key := path + suffix) in sigmas:
+                break
+        else:
+            raise ValueError(f'scale_to_error={model.scale_to_error} '
+                             f'but `{path + model._upper_suffix}` is empty.')
+
+        values.append(sigmas[sigma_key] * model.value)
+
+    return values
+
+
+def _apply_to_data(model: IDSOperation,
+                   data: np.ndarray,
+                   value: Any,
+                   input_var: Optional[SimpleNamespace],
+                   stacked: bool = False) -> None:
+    """Apply operation to data in-place.
+
+    If `stacked`, the first axis of the data are the time slices.
+    """
+    if model.linear_ramp is not None:
+        a, b = model.linear_ramp
+        n = data.shape[1] if stacked else len(data)
+        value = np.linspace(a, b, n) * value
+
+    logger.debug('data range before: %s - %s', data.min(), data.max())
+
+    model.npfunc(data, value, out=data, var=input_var)
+
+    if model.clip_max is not None or model.clip_min is not None:
+        np.clip(data, a_min=model.clip_min, a_max=model.clip_max, out=data)
+
+    logger.debug('data range after: %s - %s', data.min(), data.max())
+
+
+def _can_stack(model: IDSOperation, arrays: list[np.ndarray],
+               values: list[Any]) -> bool:
+    """Check if the operation can be applied to all arrays at once.
+
+    Custom code is only applied to the stacked arrays if
+    `custom_vectorize` is set, because it may not be element-wise.
+    """
+    if len(arrays) < 2:
+        return False
+
+    if model.operator == 'custom' and not model.custom_vectorize:
+        return False
+
+    shape = np.shape(arrays[0])
+    if not all(
+            isinstance(arr, np.ndarray) and arr.shape == shape
+            for arr in arrays):
+        return False
+
+    value_shape = np.shape(values[0])
+    return all(np.shape(value) == value_shape for value in values)
+
+
 def _apply_ids(model: IDSOperation,
                *,
                ids_mapping: Union[ImasHandle, IDSMapping],
@@ -51,40 +157,23 @@ def _apply_ids(model: IDSOperation,
         duqlog_screen.error(
             f'{model.variable.path} not found in IDS, cannot adjust value')
 
-    for path, data in data_map.items():
-        if model.scale_to_error:
-            sigma_key = path + model._upper_suffix
-
-            if model.value < 0:
-                lower_key = path + model._lower_suffix
-                if lower_key in ids_mapping:
-                    sigma_key = lower_key
-
-            if sigma_key not in ids_mapping:
-                raise ValueError(f'scale_to_error={model.scale_to_error} '
-                                 f'but `{sigma_key}` is empty.')
-
-            sigma = ids_mapping[sigma_key]
-
-            value = sigma * model.value
-        else:
-
-            value = model.value
-
-        logger.info('Apply %s', model)
-
-        if model.linear_ramp is not None:
-            a, b = model.linear_ramp
-            value = np.linspace(a, b, len(data)) * value
+    logger.info('Apply %s', model)
 
-        logger.debug('data range before: %s - %s', data.min(), data.max())
+    arrays = list(data_map.values())
+    values = _get_values(model, list(data_map), ids_mapping)
 
-        model.npfunc(data, value, out=data, var=input_var)
+    if _can_stack(model, arrays, values):
+        # Apply to all time slices at once, and scatter back
+        stacked = np.stack(arrays)
+        value = np.stack(values) if model.scale_to_error else model.value
 
-        if model.clip_max is not None or model.clip_min is not None:
-            np.clip(data, a_min=model.clip_min, a_max=model.clip_max, out=data)
+        _apply_to_data(model, stacked, value, input_var, stacked=True)
 
-        logger.debug('data range after: %s - %s', data.min(), data.max())
+        for data, new in zip(arrays, stacked):
+            data[...] = new
+    else:
+        for data, value in zip(arrays, values):
+            _apply_to_data(model, data, value, input_var)
 
     if target_in:
         logger.info('Writing data entry: %s', target_in)
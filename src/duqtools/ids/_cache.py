@@ -0,0 +1,213 @@
+"""Persistent cache for variables extracted from IMAS data.
+
+The cache is disabled by default, enable it with the `--cache` option
+(`duqtools plot`, `duqtools merge`, `duqtools dash`) or by setting
+`DUQTOOLS_CACHE=1`.
+
+The cache is stored in `$DUQTOOLS_CACHE_DIR` (default:
+`$XDG_CACHE_HOME/duqtools` or `~/.cache/duqtools`), and is shared between
+all duqtools commands and the dashboard. Entries are keyed by the handle,
+IDS, variables, and the modification time and size of the data files,
+so that they are invalidated when the data change. The least recently
+used entries are removed when the cache exceeds `$DUQTOOLS_CACHE_SIZE`
+(in MB, default: 2048).
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+import tempfile
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Optional, Sequence
+
+if TYPE_CHECKING:
+    import xarray as xr
+    from imas2xarray import Variable
+
+    from .__handle import _ImasHandle
+
+logger = logging.getLogger(__name__)
+
+SUFFIX = '.nc'
+
+
+def _default_cache_dir() -> Path:
+    if cache_dir := os.environ.get('DUQTOOLS_CACHE_DIR'):
+        return Path(cache_dir)
+
+    xdg_cache = os.environ.get('XDG_CACHE_HOME', Path.home() / '.cache')
+    return Path(xdg_cache, 'duqtools')
+
+
+class VariableCache:
+
+    def __init__(self,
+                 cache_dir: Optional[Path] = None,
+                 max_size: Optional[int] = None,
+                 enabled: Optional[bool] = None):
+        """On-disk cache for datasets extracted from IMAS data.
+
+        Parameters
+        ----------
+        cache_dir : Path, optional
+            Directory to store the cache.
+        max_size : int, optional
+            Maximum size of the cache in bytes.
+        enabled : bool, optional
+            Enable or disable the cache.
+        """
+        if enabled is None:
+            enabled = os.environ.get('DUQTOOLS_CACHE', '') not in ('', '0')
+        if max_size is None:
+            max_size = int(os.environ.get('DUQTOOLS_CACHE_SIZE', 2048)) << 20
+
+        self.cache_dir = cache_dir or _default_cache_dir()
+        self.max_size = max_size
+        self.enabled = enabled
+
+        # Total size of the entries, computed on first use
+        self._size: Optional[int] = None
+
+    @staticmethod
+    def key(handle: _ImasHandle, ids: str, variables: Sequence[Variable],
+            **kwargs) -> Optional[str]:
+        """Return the cache key, or None if the data files cannot be
+        found."""
+        stamps = []
+        for path in sorted(handle.paths()):
+            try:
+                stat = path.stat()
+            except OSError:
+                return None
+            stamps.append((path.name, stat.st_mtime_ns, stat.st_size))
+
+        if not stamps:
+            return None
+
+        var_specs = sorted((var.model_dump(mode='json') for var in variables),
+                           key=lambda var: var['name'])
+
+        spec = {
+            'handle': handle.model_dump(mode='json'),
+            'path': str(handle.path()),
+            'ids': ids,
+            'variables': var_specs,
+            'stamps': stamps,
+            'kwargs': kwargs,
+        }
+
+        string = json.dumps(spec, sort_keys=True, default=str)
+        return hashlib.sha256(string.encode()).hexdigest()
+
+    def _path(self, key: str) -> Path:
+        return self.cache_dir / f'{key}{SUFFIX}'
+
+    def load(self, key: Optional[str]) -> Optional[xr.Dataset]:
+        """Return dataset from the cache, or None if it is not cached."""
+        if not (self.enabled and key):
+            return None
+
+        import xarray as xr
+
+        path = self._path(key)
+
+        try:
+            ds = xr.load_dataset(path)
+        except FileNotFoundError:
+            return None
+        except Exception as err:
+            logger.debug('Cannot read cache entry %s: %s', path, err)
+            return None
+
+        # Mark as recently used
+        try:
+            path.touch()
+        except OSError:
+            pass
+
+        logger.debug('Loaded %s from cache', key)
+        return ds
+
+    def save(self, key: Optional[str], ds: xr.Dataset) -> None:
+        """Store dataset in the cache."""
+        if not (self.enabled and key):
+            return
+
+        path = self._path(key)
+        size = self.size()
+
+        try:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            fd, tmp = tempfile.mkstemp(suffix='.tmp', dir=self.cache_dir)
+            os.close(fd)
+            try:
+                ds.to_netcdf(tmp)
+                new_size = os.path.getsize(tmp)
+                old_size = path.stat().st_size if path.exists() else 0
+                os.replace(tmp, path)
+            finally:
+                if os.path.exists(tmp):
+                    os.unlink(tmp)
+        except Exception as err:
+            logger.debug('Cannot write cache entry %s: %s', path, err)
+            return
+
+        self._size = size + new_size - old_size
+
+        if self._size > self.max_size:
+            self.evict()
+
+    def _entries(self) -> list[tuple[Path, Any]]:
+        entries = []
+        for path in self.cache_dir.glob(f'*{SUFFIX}'):
+            try:
+                entries.append((path, path.stat()))
+            except OSError:
+                pass
+        return entries
+
+    def size(self) -> int:
+        """Return the total size of the cache in bytes.
+
+        The cache directory is only scanned on first use, afterwards
+        the size is updated when entries are written or removed.
+        """
+        if self._size is None:
+            self._size = sum(stat.st_size for _, stat in self._entries())
+        return self._size
+
+    def evict(self) -> None:
+        """Remove the least recently used entries until the cache fits in
+        `max_size`."""
+        entries = sorted(self._entries(), key=lambda entry: entry[1].st_mtime)
+        total = sum(stat.st_size for _, stat in entries)
+
+        for path, stat in entries:
+            if total <= self.max_size:
+                break
+            try:
+                path.unlink()
+            except OSError:
+                continue
+            logger.debug('Evicted %s from cache', path.name)
+            total -= stat.st_size
+
+        self._size = total
+
+    def clear(self) -> None:
+        """Remove all entries from the cache."""
+        for path, _ in self._entries():
+            path.unlink(missing_ok=True)
+        self._size = 0
+
+
+variable_cache = VariableCache()
+
+
+def enable_cache() -> None:
+    """Enable the variable cache, also for subprocesses (e.g. the
+    dashboard)."""
+    os.environ['DUQTOOLS_CACHE'] = '1'
+    variable_cache.enabled = True
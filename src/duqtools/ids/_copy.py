@@ -4,17 +4,24 @@ import logging
 import os
 import shutil
 from pathlib import Path
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, Collection, Iterable, Literal, Optional
 
 from packaging import version
 
 from .._logging_utils import LoggingContext
 from ..operations import add_to_op_queue
-from ._imas import Parser, imas
+from ._imas import Parser, imas, imasdef
 
 if TYPE_CHECKING:
     from .ids import ImasHandle
 
+logger = logging.getLogger(__name__)
+
+CopyMethod = Literal['file', 'reflink', 'hardlink', 'overlay', 'imas']
+
+# From linux/fs.h, clone the extents of one file into another
+FICLONE = 0x40049409
+
 
 def get_imas_ual_version():
     """Get imas/ual versions.
@@ -48,6 +55,8 @@ def add_provenance_info(handle: ImasHandle, ids: str = 'core_profiles'):
     import git
     import pkg_resources  # type: ignore
 
+    handle.materialize(ids=(ids, ))
+
     with handle.open() as data_entry_target:
         entry = data_entry_target.get(ids)
 
@@ -128,8 +137,306 @@ def copy_ids_entry_complex(source: ImasHandle, target: ImasHandle):
     idss_out.close()
 
 
-@add_to_op_queue('Copy ids from template to', '{target}', quiet=True)
-def copy_ids_entry(source: ImasHandle, target: ImasHandle):
+def convert_ids_entry(source: ImasHandle, target: ImasHandle):
+    """Copy ids entry by reading and writing all IDSs via `imas.DBEntry`.
+
+    Unlike `copy_ids_entry_complex`, this works between different
+    backends, e.g. to convert MDSplus data to HDF5.
+
+    Parameters
+    ----------
+    source : ImasHandle
+        Source ids entry
+    target : ImasHandle
+        Target ids entry
+    """
+    parser = Parser.load_idsdef()
+
+    with LoggingContext(level=logging.CRITICAL), \
+            source.open() as entry_in, \
+            target.open(create=True) as entry_out:
+
+        for ids_info in parser.idss:
+            name = ids_info['name']
+            maxoccur = int(ids_info['maxoccur'])
+
+            if name in ('ec_launchers', 'numerics', 'sdn'):
+                continue
+
+            for i in range(maxoccur + 1):
+                ids = entry_in.get(name, i)
+
+                if ids.ids_properties.homogeneous_time == imasdef.EMPTY_INT:
+                    continue
+
+                entry_out.put(ids, i)
+
+
+def _copy_file_range(src: Path, dst: Path):
+    """Copy file in kernel space using `copy_file_range`.
+
+    On file systems that support it (e.g. btrfs, xfs, nfs 4.2),
+    this shares the data blocks or copies them server-side.
+    """
+    with open(src, 'rb') as fsrc, open(dst, 'wb') as fdst:
+        remaining = os.fstat(fsrc.fileno()).st_size
+        while remaining > 0:
+            n = os.copy_file_range(fsrc.fileno(), fdst.fileno(), remaining)
+            if n == 0:
+                break
+            remaining -= n
+
+
+def _reflink(src: Path, dst: Path):
+    """Make a copy-on-write clone of the file."""
+    import fcntl
+
+    with open(src, 'rb') as fsrc, open(dst, 'wb') as fdst:
+        fcntl.ioctl(fdst.fileno(), FICLONE, fsrc.fileno())
+
+
+def _symlink(src: Path, dst: Path):
+    """Link the destination to the file, replacing it if it exists."""
+    dst.unlink(missing_ok=True)
+    dst.symlink_to(src.resolve())
+
+
+def _read_block(f, offset: int, size: int) -> bytes:
+    f.seek(offset)
+    return f.read(size)
+
+
+def _verify_copy(src: Path,
+                 dst: Path,
+                 method: CopyMethod = 'file',
+                 n_blocks: int = 8,
+                 block_size: int = 1 << 16):
+    """Check that the copy is complete and has the same content.
+
+    Files that are larger than `n_blocks * block_size` are compared on
+    `n_blocks` blocks spread evenly over the file (including the first and
+    last block), so that the check does not read all data twice.
+
+    Only hardlinks may share the data with the source, for any other
+    method this means that the source was written to.
+    """
+    src_stat = src.stat()
+    dst_stat = dst.stat()
+
+    if os.path.samestat(src_stat, dst_stat):
+        if method == 'hardlink':
+            return
+        raise OSError(f'Copy of {src} to {dst} refers to the source file')
+
+    src_size = src_stat.st_size
+    dst_size = dst_stat.st_size
+
+    if src_size != dst_size:
+        raise OSError(f'Copy of {src} to {dst} is incomplete: '
+                      f'{dst_size} of {src_size} bytes')
+
+    offsets: Iterable[int]
+    if src_size <= n_blocks * block_size:
+        offsets = range(0, src_size, block_size)
+    else:
+        step = (src_size - block_size) / (n_blocks - 1)
+        offsets = [round(i * step) for i in range(n_blocks)]
+
+    with open(src, 'rb') as fsrc, open(dst, 'rb') as fdst:
+        for offset in offsets:
+            if (_read_block(fsrc, offset, block_size)
+                    != _read_block(fdst, offset, block_size)):
+                raise OSError(f'Copy of {src} to {dst} differs from the '
+                              f'source at byte {offset}')
+
+
+def copy_file(src: Path, dst: Path, method: CopyMethod = 'file'):
+    """Copy a single file.
+
+    Falls back to a regular copy if the method is not supported
+    by the file system (e.g. reflinks on ext4 or hardlinks
+    between devices).
+
+    The copy is written to a temporary file next to `dst`, and then
+    moved in place. An existing `dst` is replaced, and never written to,
+    so that data shared with another file (through a symbolic link or
+    a hardlink) are not modified.
+
+    Parameters
+    ----------
+    src : Path
+        Source file
+    dst : Path
+        Destination file
+    method : str, optional
+        One of `file`, `reflink`, `hardlink`.
+
+    Raises
+    ------
+    OSError
+        If the copy is incomplete.
+    """
+    src = Path(src)
+    dst = Path(dst)
+
+    funcs = {
+        'file': _copy_file_range,
+        'reflink': _reflink,
+        'hardlink': os.link,
+    }
+
+    try:
+        func = funcs[method]
+    except KeyError:
+        raise ValueError(f'Invalid copy method: {method!r}') from None
+
+    tmp = dst.with_name(f'.{dst.name}.tmp')
+    tmp.unlink(missing_ok=True)
+
+    try:
+        try:
+            func(src, tmp)
+        except (AttributeError, OSError) as err:
+            logger.debug(
+                'Cannot %s copy %s (%s), falling back to regular copy', method,
+                src, err)
+            tmp.unlink(missing_ok=True)
+            shutil.copyfile(src, tmp)
+
+        _verify_copy(src, tmp, method=method)
+
+        if method == 'hardlink':
+            # Renaming is a no-op if `dst` is a link to the same file
+            dst.unlink(missing_ok=True)
+
+        os.replace(tmp, dst)
+    finally:
+        tmp.unlink(missing_ok=True)
+
+
+def copy_files(sources: Iterable[Path],
+               targets: Iterable[Path],
+               method: CopyMethod = 'file'):
+    """Copy files pairwise from `sources` to `targets`.
+
+    See `copy_file` for the parameters.
+    """
+    for src, dst in zip(sources, targets):
+        copy_file(src, dst, method=method)
+
+
+def materialize_file(path: Path):
+    """Replace a link to a shared data file by a copy of the data.
+
+    This applies to symbolic links (see `method='overlay'`) and to files
+    with more than one hard link (see `method='hardlink'`). The link is
+    replaced by the copy (see `copy_file`), so that the shared data are
+    never modified.
+    """
+    path = Path(path)
+    if path.is_symlink():
+        src = path.resolve()
+    elif path.stat().st_nlink > 1:
+        src = path
+    else:
+        return
+
+    logger.debug('Materializing %s', path)
+
+    copy_file(src, path)
+
+
+def _overlay_ids_data(source: ImasHandle, target: ImasHandle,
+                      ids: Collection[str]):
+    """Copy the data files of the given IDSs and link the other ones to the
+    source.
+
+    The HDF5 backend stores every IDS in a separate file
+    (`<ids>.h5`). The master file is always copied.
+    """
+    target.path().mkdir(parents=True, exist_ok=True)
+
+    for src_file in source.paths():
+        dst_file = target.path() / src_file.name
+
+        if src_file.stem in ids or src_file.stem == 'master':
+            copy_file(src_file, dst_file)
+        else:
+            _symlink(src_file, dst_file)
+
+
+def copy_ids_data(source: ImasHandle,
+                  target: ImasHandle,
+                  method: CopyMethod = 'file',
+                  ids: Optional[Collection[str]] = None):
+    """Copy the data of an ids entry to a new location.
+
+    The data files are copied directly if source and target use the same
+    backend. IMAS is only used if `method='imas'`, or if the data must be
+    converted to another backend.
+
+    Parameters
+    ----------
+    source : ImasHandle
+        Source ids entry
+    target : ImasHandle
+        Target ids entry
+    method : str, optional
+        One of `file` (default), `reflink`, `hardlink`, `overlay`, `imas`.
+        Hardlinked and overlaid data are shared with the source, and
+        copied when they are written to (see `ImasHandle.materialize`).
+    ids : Collection[str], optional
+        With `method='overlay'`, only these IDSs are copied, the others are
+        linked to the source. Linked IDSs are copied when they are
+        written to (see `ImasHandle.materialize`).
+    """
+    from ._hdf5handle import HDF5ImasHandle
+    from ._mdsplushandle import MdsplusImasHandle
+
+    same_backend = type(source) is type(target)
+
+    if method == 'overlay':
+        if same_backend and isinstance(source, HDF5ImasHandle):
+            if not source.paths():
+                raise KeyError(f'The entry you are trying to copy '
+                               f'does not exist: {source}')
+            _overlay_ids_data(source, target, ids=ids or ())
+            return
+
+        logger.debug('Overlay not supported for %s, copying all data',
+                     type(source).__name__)
+        method = 'file'
+
+    if same_backend and method != 'imas':
+        src_files = source.paths()
+        if not src_files:
+            raise KeyError(f'The entry you are trying to copy '
+                           f'does not exist: {source}')
+
+        if isinstance(source, MdsplusImasHandle):
+            # file names contain the shot and run number
+            dst_files = target.paths()
+        else:
+            target.path().mkdir(parents=True, exist_ok=True)
+            dst_files = [target.path() / path.name for path in src_files]
+
+        copy_files(src_files, dst_files, method=method)
+    elif same_backend and isinstance(source, MdsplusImasHandle):
+        copy_ids_entry_complex(source, target)
+    else:
+        logger.debug('Converting %s to %s via IMAS', source, target)
+        convert_ids_entry(source, target)
+
+
+@add_to_op_queue('Copy ids from template to',
+                 '{target}',
+                 quiet=True,
+                 reads=('{source}', ),
+                 writes=('{target}', ))
+def copy_ids_entry(source: ImasHandle,
+                   target: ImasHandle,
+                   method: CopyMethod = 'file',
+                   ids: Optional[Collection[str]] = None):
     """Copies the ids entry to a new location.
 
     Parameters
@@ -138,6 +445,10 @@ def copy_ids_entry(source: ImasHandle, target: ImasHandle):
         Source ids entry
     target : ImasHandle
         Target ids entry
+    method : str, optional
+        Copy method, see `copy_ids_data`.
+    ids : Collection[str], optional
+        IDSs to copy with `method='overlay'`, see `copy_ids_data`.
 
     Raises
     ------
@@ -146,10 +457,6 @@ def copy_ids_entry(source: ImasHandle, target: ImasHandle):
     """
     target.validate()
 
-    if os.environ.get('SIMPLE_IDS_COPY'):
-        for src_file, dst_file in zip(source.paths(), target.paths()):
-            shutil.copyfile(src_file, dst_file)
-    else:
-        copy_ids_entry_complex(source, target)
+    copy_ids_data(source, target, method=method, ids=ids)
 
     add_provenance_info(handle=target)
@@ -0,0 +1,210 @@
+"""Apply IDS operations to all runs in an ensemble at once.
+
+For sampled dimensions, every run applies the same operations to the
+same template data, only the values differ. Instead of applying the
+operations run by run, the template data are read once and stacked
+into an array with the samples on the first axis, so that each
+operation is a single numpy broadcast over all samples.
+"""
+from __future__ import annotations
+
+import logging
+from typing import TYPE_CHECKING, Any, Optional, Sequence
+
+import numpy as np
+
+from .._logging_utils import duqlog_screen
+
+if TYPE_CHECKING:
+    from ..schema import IDSOperation
+    from ._handle import ImasHandle
+    from ._mapping import IDSMapping
+
+logger = logging.getLogger(__name__)
+
+EnsembleData = dict[str, dict[str, np.ndarray]]
+
+
+def ensemble_key(model: Any) -> Optional[str]:
+    """Return key that identifies the operation, apart from its value.
+
+    Returns None if the operation cannot be applied to the ensemble,
+    i.e. it is not an IDS operation, or it uses custom code or input
+    variables.
+    """
+    from ..schema import IDSOperation
+
+    if not isinstance(model, IDSOperation):
+        return None
+
+    if model.operator == 'custom' or model.input_variables is not None:
+        return None
+
+    return model.model_dump_json(exclude={'value'})
+
+
+def _expand(arr: np.ndarray, ndim: int) -> np.ndarray:
+    """Insert axes after the sample axis, so that the per-sample arrays
+    broadcast against arrays with `ndim` dimensions like they would for
+    a single run (i.e. aligned on the trailing axes)."""
+    missing = max(ndim - (arr.ndim - 1), 0)
+    return arr.reshape(arr.shape[:1] + (1, ) * missing + arr.shape[1:])
+
+
+class Ensemble:
+
+    def __init__(self, ids_mapping: IDSMapping, n_samples: int):
+        """Stacked data for an ensemble of runs derived from the same
+        template data.
+
+        Parameters
+        ----------
+        ids_mapping : IDSMapping
+            Template data, these are not modified.
+        n_samples : int
+            Number of samples (runs) in the ensemble.
+        """
+        self.ids_mapping = ids_mapping
+        self.n_samples = n_samples
+        self.data: dict[str, np.ndarray] = {}
+
+    def __contains__(self, key: str) -> bool:
+        return key in self.data or key in self.ids_mapping
+
+    def __getitem__(self, key: str) -> np.ndarray:
+        """Return data with the samples on the first axis.
+
+        Unmodified data have length 1 on the first axis.
+        """
+        if key in self.data:
+            return self.data[key]
+
+        return np.asarray(self.ids_mapping[key])[np.newaxis]
+
+    def stack(self, key: str) -> np.ndarray:
+        """Return a writable stack of the data for all samples."""
+        if key not in self.data:
+            data = np.asarray(self.ids_mapping[key])
+            self.data[key] = np.repeat(data[np.newaxis],
+                                       self.n_samples,
+                                       axis=0)
+        return self.data[key]
+
+    def _sigma(self, model: IDSOperation, path: str,
+               values: np.ndarray) -> np.ndarray:
+        """Return the errors to scale the values by.
+
+        Uses the lower error for negative values if available, and
+        the upper error otherwise.
+        """
+        upper_key = path + model._upper_suffix
+        lower_key = path + model._lower_suffix
+
+        negative = values < 0
+        has_upper = upper_key in self
+        has_lower = lower_key in self
+
+        if has_lower and negative.any():
+            lower = self[lower_key]
+            if not has_upper:
+                if not negative.all():
+                    raise ValueError(f'scale_to_error={model.scale_to_error} '
+                                     f'but `{upper_key}` is empty.')
+                return lower
+            upper = self[upper_key]
+            mask = _expand(negative, upper.ndim - 1)
+            return np.where(mask, lower, upper)
+
+        if not has_upper:
+            raise ValueError(f'scale_to_error={model.scale_to_error} '
+                             f'but `{upper_key}` is empty.')
+
+        return self[upper_key]
+
+    def apply(self, models: Sequence[IDSOperation]) -> None:
+        """Apply the same operation with different values to all
+        samples.
+
+        The result is identical to applying `models[i]` to the data
+        of sample `i`.
+
+        Parameters
+        ----------
+        models : Sequence[IDSOperation]
+            One operation for each sample, these may only differ
+            in their `value`.
+        """
+        model = models[0]
+        values = np.array([m.value for m in models], dtype=float)
+
+        data_map = self.ids_mapping.findall(model.variable.path)
+
+        if len(data_map) == 0:
+            duqlog_screen.error(
+                f'{model.variable.path} not found in IDS, cannot adjust value')
+
+        logger.info('Apply %s to %d samples', model, self.n_samples)
+
+        for path in data_map:
+            data = self.stack(path)
+
+            if model.scale_to_error:
+                sigma = self._sigma(model, path, values)
+                value = sigma * _expand(values, sigma.ndim - 1)
+            else:
+                value = values
+
+            if model.linear_ramp is not None:
+                a, b = model.linear_ramp
+                ramp = np.linspace(a, b, data.shape[1])
+                value = _expand(value, max(value.ndim - 1, 1)) * ramp
+
+            model.npfunc(data, _expand(value, data.ndim - 1), out=data)
+
+            if model.clip_max is not None or model.clip_min is not None:
+                np.clip(data,
+                        a_min=model.clip_min,
+                        a_max=model.clip_max,
+                        out=data)
+
+    def sample(self, i: int) -> dict[str, np.ndarray]:
+        """Return the modified data for sample `i`."""
+        return {key: data[i] for key, data in self.data.items()}
+
+
+def apply_ensemble(
+    source: ImasHandle,
+    operations: Sequence[Sequence[IDSOperation]],
+) -> list[EnsembleData]:
+    """Apply IDS operations to the template data for all runs at once.
+
+    Every run must have the same sequence of operations (see
+    `ensemble_key`), only the values may differ.
+
+    Parameters
+    ----------
+    source : ImasHandle
+        Template data, each IDS is read once.
+    operations : Sequence[Sequence[IDSOperation]]
+        Operations for every run.
+
+    Returns
+    -------
+    list[EnsembleData]
+        For every run, the modified data as `{ids: {path: data}}`.
+    """
+    n_samples = len(operations)
+    ensembles: dict[str, Ensemble] = {}
+
+    for models in zip(*operations):
+        ids = models[0].variable.ids
+
+        if ids not in ensembles:
+            ensembles[ids] = Ensemble(source.get(ids, lazy=True), n_samples)
+
+        ensembles[ids].apply(models)
+
+    return [{
+        ids: ensemble.sample(i)
+        for ids, ensemble in ensembles.items()
+    } for i in range(n_samples)]
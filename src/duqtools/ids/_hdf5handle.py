@@ -2,12 +2,12 @@ from __future__ import annotations
 
 import logging
 import os
-import shutil
 from pathlib import Path
-from typing import TYPE_CHECKING, List
+from typing import TYPE_CHECKING, Collection, List, Optional
 
 from ..operations import add_to_op_queue
 from .__handle import _ImasHandle
+from ._copy import CopyMethod, copy_ids_data
 from ._imas import imas, imasdef
 
 if TYPE_CHECKING:
@@ -61,24 +61,33 @@ class HDF5ImasHandle(_ImasHandle):
 
     @add_to_op_queue('Copy imas data',
                      'from {self} to {destination}',
-                     quiet=True)
-    def copy_data_to(self, destination: _ImasHandle):
+                     quiet=True,
+                     reads=('{self}', ),
+                     writes=('{destination}', ))
+    def copy_data_to(self,
+                     destination: _ImasHandle,
+                     method: CopyMethod = 'file',
+                     ids: Optional[Collection[str]] = None):
         """Copy ids entry to given destination.
 
         Parameters
         ----------
         destination : ImasHandle
             Copy data to a new location.
+        method : str, optional
+            How to copy the data, one of `file`, `reflink`,
+            `hardlink`, `overlay`, `imas`.
+        ids : Collection[str], optional
+            With `method='overlay'`, only copy these IDSs and link
+            the others to this entry.
         """
         logger.debug('Copy %s to %s', self, destination)
 
         destination.path().mkdir(parents=True, exist_ok=True)
 
-        for src_file in self.paths():
-            dst_file = destination.path() / src_file.name
-            shutil.copyfile(src_file, dst_file)
+        copy_ids_data(self, destination, method=method, ids=ids)
 
-    @add_to_op_queue('Removing ids', '{self}')
+    @add_to_op_queue('Removing ids', '{self}', writes=('{self}', ))
     def delete(self):
         """Remove data from entry."""
         # ERASE_PULSE operation is yet supported by IMAS as of June 2022
@@ -0,0 +1,182 @@
+from __future__ import annotations
+
+import logging
+from types import SimpleNamespace
+from typing import TYPE_CHECKING, Any, Iterable, Sequence
+
+from ._mapping import INDEX_STR, IDSMapping, compile_path
+
+if TYPE_CHECKING:
+    import xarray as xr
+    from imas2xarray import Variable
+
+    from .__handle import _ImasHandle
+
+logger = logging.getLogger(__name__)
+
+
+def to_imas_data_path(path: str) -> str:
+    """Convert variable path to IMAS data path for partial reads.
+
+    For example: `profiles_1d/*/t_i_average` -> `profiles_1d(:)/t_i_average`
+    """
+    return path.replace(f'/{INDEX_STR}', '(:)')
+
+
+class LazyIDSMapping(IDSMapping):
+
+    def __init__(self, handle: _ImasHandle, ids: str = 'core_profiles'):
+        """Map the IMASDB object, reading data nodes on demand.
+
+        Only the nodes that are requested via `load`, `findall`,
+        `find_by_group` or `to_xarray` are read from the data entry.
+        Iterating over the mapping reads the full IDS.
+
+        If the backend does not support partial reads,
+        the full IDS is read instead.
+
+        Parameters
+        ----------
+        handle : ImasHandle
+            Handle to read the data from.
+        ids : str, optional
+            Name of the IDS to map.
+        """
+        super().__init__(SimpleNamespace())
+        self._handle = handle
+        self._ids_name = ids
+        self._loaded: set[str] = set()
+        self._fully_loaded = False
+
+    def load(self, paths: Iterable[str]) -> None:
+        """Read the data at the given paths from the data entry.
+
+        Parameters
+        ----------
+        paths : Iterable[str]
+            Variable paths, where `*` denotes all indices,
+            for example: `profiles_1d/*/electrons/temperature`.
+        """
+        if self._fully_loaded:
+            return
+
+        to_load = []
+        for path in paths:
+            segments = compile_path(path)
+
+            # Concrete indices and regex patterns cannot be read partially
+            if segments is None or any(part.isdigit() for part in segments):
+                self.load_all()
+                return
+
+            if path not in self._loaded:
+                to_load.append(segments)
+
+        if not to_load:
+            return
+
+        with self._handle.open() as data_entry:
+            for segments in to_load:
+                path = '/'.join(segments)
+                try:
+                    data = data_entry.partial_get(self._ids_name,
+                                                  to_imas_data_path(path))
+                    self._insert(self._ids, segments, data)
+                except Exception as err:
+                    logger.debug(
+                        'Partial read of %s failed (%s), '
+                        'reading full IDS', path, err)
+                    self._ids = data_entry.get(self._ids_name)
+                    self._fully_loaded = True
+                    self._reset_index()
+                    return
+
+                self._loaded.add(path)
+
+        self._reset_index()
+
+    def load_all(self) -> None:
+        """Read the full IDS from the data entry."""
+        if self._fully_loaded:
+            return
+
+        self._ids = self._handle.get_raw_data(self._ids_name)
+        self._fully_loaded = True
+        self._reset_index()
+
+    def _reset_index(self) -> None:
+        self._key_index = None
+        self._path_index = None
+
+    @staticmethod
+    def _insert(node: Any, segments: Sequence[str], data: Any) -> None:
+        """Insert data into the node tree, creating nodes where needed."""
+        part, *rest = segments
+
+        if not rest:
+            setattr(node, part, data)
+            return
+
+        if rest[0] == INDEX_STR:
+            nodes = getattr(node, part, None)
+            if nodes is None:
+                nodes = []
+                setattr(node, part, nodes)
+
+            for i, item in enumerate(data):
+                if i == len(nodes):
+                    nodes.append(SimpleNamespace())
+                LazyIDSMapping._insert(nodes[i], rest[1:], item)
+        else:
+            child = getattr(node, part, None)
+            if child is None:
+                child = SimpleNamespace()
+                setattr(node, part, child)
+
+            LazyIDSMapping._insert(child, rest, data)
+
+    def _build_index(self) -> None:
+        self.load_all()
+        super()._build_index()
+
+    def __getitem__(self, key: str) -> Any:
+        try:
+            return super().__getitem__(key)
+        except KeyError:
+            if self._fully_loaded:
+                raise
+
+        self.load((key, ))
+        return super().__getitem__(key)
+
+    def __contains__(self, key):
+        if isinstance(key, str):
+            self.load((key, ))
+        return super().__contains__(key)
+
+    def __bool__(self):
+        self.load_all()
+        return super().__bool__()
+
+    def findall(self, pattern: str) -> dict[str, Any]:
+        self.load((pattern, ))
+        return super().findall(pattern)
+
+    def find_by_group(self, pattern: str) -> dict[tuple | str, Any]:
+        self.load((pattern, ))
+        return super().find_by_group(pattern)
+
+    def to_xarray(
+        self,
+        variables: Sequence[str | Variable],
+        empty_var_ok: bool = False,
+        **kwargs,
+    ) -> xr.Dataset:
+        from imas2xarray import var_lookup
+
+        var_models = var_lookup.lookup(variables)
+        self.load(var.path for var in var_models)
+
+        return super().to_xarray(var_models,
+                                 empty_var_ok=empty_var_ok,
+                                 **kwargs)
@@ -2,16 +2,23 @@ from __future__ import annotations
 
 import re
 from collections.abc import Mapping
+from functools import lru_cache
 from typing import TYPE_CHECKING, Any, Sequence
 
 import numpy as np
 from imas2xarray import Variable, var_lookup
 
+from ..utils import groupby
+
 if TYPE_CHECKING:
     import xarray as xr
 
 INDEX_STR = '*'
 
+_SIMPLE_PATH = re.compile(r'^(\*|\w+)(/(\*|\w+))*$')
+
+_MISSING = object()
+
 
 class EmptyVarError(Exception):
     ...
@@ -31,6 +38,46 @@ def replace_index_str(string: str) -> str:
     return string.replace(INDEX_STR, r'(\d+)')
 
 
+@lru_cache(maxsize=256)
+def compile_path(pattern: str) -> tuple[str, ...] | None:
+    """Compile pattern into path segments for a direct lookup.
+
+    Returns `None` if the pattern uses regex syntax other than
+    the `*` index wildcard, in which case a regex scan is needed.
+    """
+    if not _SIMPLE_PATH.match(pattern):
+        return None
+    return tuple(pattern.split('/'))
+
+
+def _is_node_list(val: Any) -> bool:
+    """Return True if val is a list of nodes (i.e. not a data array)."""
+    return hasattr(val, '__getitem__') and not isinstance(
+        val, (str, np.ndarray, np.generic, dict))
+
+
+def _is_leaf(val: Any) -> bool:
+    """Return True if val is a non-empty data field."""
+    return isinstance(val, (np.ndarray, np.generic)) and val.size > 0
+
+
+def _child(val: Any, part: str) -> Any:
+    """Return child node for path segment, mirrors `IDSMapping.dive`."""
+    if isinstance(val, str):
+        return _MISSING
+
+    if _is_node_list(val):
+        if not part.isdigit():
+            return _MISSING
+        i = int(part)
+        return val[i] if i < len(val) else _MISSING
+
+    if hasattr(val, '__dict__'):
+        return val.__dict__.get(part, _MISSING)
+
+    return _MISSING
+
+
 class IDSMapping(Mapping):
 
     def __init__(self, ids: Any) -> None:
@@ -51,11 +98,30 @@ class IDSMapping(Mapping):
         """
         self._ids = ids
 
-        # All available data fields are stored in this set.
-        self._keys: set[str] = set()
-        self._paths: dict[str, Any] = {}
-
-        self.dive(ids, [])
+        # The index of all data fields is built on first use,
+        # lookups by path walk the IDS directly.
+        self._key_index: set[str] | None = None
+        self._path_index: dict[str, Any] | None = None
+
+    def _build_index(self) -> None:
+        """Walk the full IDS to index all available data fields."""
+        self._key_index = set()
+        self._path_index = {}
+        self.dive(self._ids, [])
+
+    @property
+    def _keys(self) -> set[str]:
+        """All available data fields."""
+        if self._key_index is None:
+            self._build_index()
+        return self._key_index  # type: ignore
+
+    @property
+    def _paths(self) -> dict[str, Any]:
+        """Nested dict (trie) of all available data fields."""
+        if self._path_index is None:
+            self._build_index()
+        return self._path_index  # type: ignore
 
     def __repr__(self):
         s = f'{self.__class__.__name__}(\n'
@@ -119,7 +185,57 @@ class IDSMapping(Mapping):
         return len(self._keys)
 
     def __contains__(self, key):
-        return key in self._keys
+        if not isinstance(key, str):
+            return False
+
+        segments = compile_path(key)
+        if segments is None or INDEX_STR in segments:
+            return False
+
+        return any(True for _ in self._walk(self._ids, segments, (), ()))
+
+    def __bool__(self):
+        return any(True for _ in self._walk_all(self._ids))
+
+    def _walk_all(self, val: Any):
+        """Yield data fields in the IDS, stops early if consumer does."""
+        if isinstance(val, str):
+            return
+        elif _is_node_list(val):
+            for i in range(len(val)):
+                yield from self._walk_all(val[i])
+        elif hasattr(val, '__dict__'):
+            for item in val.__dict__.values():
+                yield from self._walk_all(item)
+        elif _is_leaf(val):
+            yield val
+
+    def _walk(self, val: Any, segments: tuple[str, ...], path: tuple[str, ...],
+              groups: tuple[str, ...]):
+        """Walk the branches matching the path segments.
+
+        Yields the path, the indices matched by the `*` wildcards,
+        and the data for every data field found.
+        """
+        if not segments:
+            if _is_leaf(val):
+                yield '/'.join(path), groups, val
+            return
+
+        part, *rest = segments
+
+        if part == INDEX_STR:
+            if not _is_node_list(val):
+                return
+            for i in range(len(val)):
+                index = str(i)
+                yield from self._walk(val[i], tuple(rest), (*path, index),
+                                      (*groups, index))
+        else:
+            child = _child(val, part)
+            if child is not _MISSING:
+                yield from self._walk(child, tuple(rest), (*path, part),
+                                      groups)
 
     @staticmethod
     def _path_at_index(variable: str | Variable, index: int | Sequence[int]):
@@ -223,6 +339,9 @@ class IDSMapping(Mapping):
     def findall(self, pattern: str) -> dict[str, Any]:
         """Find keys matching regex pattern.
 
+        Plain paths where `*` denotes an index (e.g. `profiles_1d/*/t_i_ave`)
+        are resolved by walking only the matching branches of the IDS.
+
         Parameters
         ----------
         pattern : str
@@ -233,6 +352,13 @@ class IDSMapping(Mapping):
         dict
             New dict with all matching key/value pairs.
         """
+        segments = compile_path(pattern)
+        if segments is not None:
+            return {
+                key: val
+                for key, _, val in self._walk(self._ids, segments, (), ())
+            }
+
         pattern = insert_re_caret_dollar(pattern)
         pattern = replace_index_str(pattern)
 
@@ -256,6 +382,14 @@ class IDSMapping(Mapping):
         dict
             New dict with all matching key/value pairs.
         """
+        segments = compile_path(pattern)
+        if segments is not None:
+            new = {}
+            for _, groups, val in self._walk(self._ids, segments, (), ()):
+                idx = groups[0] if len(groups) == 1 else groups
+                new[idx] = val
+            return new
+
         pattern = insert_re_caret_dollar(pattern)
         pattern = replace_index_str(pattern)
 
@@ -271,22 +405,82 @@ class IDSMapping(Mapping):
 
         return new
 
-    def _read_array_from_parts(self, *parts: str):
-        arr = []
-        root, sub, *remaining = parts
-        nodes = self[root]
+    def _read_array_from_parts(self, *parts: str) -> np.ndarray | None:
+        """Read data spread over nested nodes into a single array.
+
+        The nodes are resolved once, and the data are copied into one
+        preallocated array. Ragged data are padded with `NaN`.
+
+        Returns
+        -------
+        np.ndarray | None
+            Array with the node indices as leading dimensions,
+            or None if any of the nodes or data are empty.
+        """
+        root, *subs = parts
+        sub_parts = [sub.split('/') for sub in subs]
+        n_levels = len(sub_parts)
+
+        lengths = [0] * n_levels
+        indices: list[tuple[int, ...]] = []
+        arrays: list[np.ndarray] = []
+
+        def gather(nodes, level: int, index: tuple[int, ...]) -> bool:
+            n = len(nodes)
+            if n == 0:
+                return False
+            lengths[level] = max(lengths[level], n)
+
+            for i in range(n):
+                val = nodes[i]
+                for part in sub_parts[level]:
+                    val = self._getattr(val, part)
+
+                if level + 1 < n_levels:
+                    if not gather(val, level + 1, (*index, i)):
+                        return False
+                else:
+                    indices.append((*index, i))
+                    arrays.append(np.asarray(val))
+
+            return True
+
+        if not gather(self[root], 0, ()):
+            return None
+
+        empty = np.fromiter((arr.size == 0 for arr in arrays),
+                            dtype=bool,
+                            count=len(arrays))
+        if empty.any():
+            return None
+
+        ndims = {arr.ndim for arr in arrays}
+        if len(ndims) > 1:
+            raise ValueError(f'Inconsistent number of dimensions for {parts}')
+
+        data_shape = tuple(np.max([arr.shape for arr in arrays], axis=0))
+        shape = (*lengths, *data_shape)
+
+        dtype = np.result_type(*{arr.dtype for arr in arrays})
 
-        for index in range(len(nodes)):
-            path = f'{root}/{index}/{sub}'
+        ragged = (len(arrays) != np.prod(lengths)) or any(
+            arr.shape != data_shape for arr in arrays)
 
-            if remaining:
-                sub_arr = self._read_array_from_parts(path, *remaining)
-            else:
-                sub_arr = self[path]
+        if not ragged:
+            out = np.empty(shape, dtype=dtype)
+            for index, arr in zip(indices, arrays):
+                out[index] = arr
+            return out
 
-            arr.append(sub_arr)
+        if dtype.kind not in 'biufc':
+            raise ValueError(f'Cannot pad ragged data of type {dtype} '
+                             f'for {parts}')
 
-        return arr
+        out = np.full(shape, np.nan, dtype=np.promote_types(dtype, np.float64))
+        for index, arr in zip(indices, arrays):
+            out[(*index, *(slice(0, n) for n in arr.shape))] = arr
+
+        return out
 
     def to_xarray(
         self,
@@ -296,6 +490,10 @@ class IDSMapping(Mapping):
     ) -> xr.Dataset:
         """Return dataset for given variables.
 
+        Data spread over multiple nodes (i.e. time slices) are stacked
+        into a single array per variable. Ragged data, for example grids
+        that change size over time, are padded with `NaN`.
+
         Parameters
         ----------
         variables : Sequence[str | Variable]]
@@ -310,20 +508,6 @@ class IDSMapping(Mapping):
         ds : xr.Dataset
             Return query as Dataset
         """
-
-        def _contains_empty(arr):
-            if isinstance(arr, list):
-                if len(arr) == 0:
-                    return True
-                return any(_contains_empty(sub_arr) for sub_arr in arr)
-            elif isinstance(arr, np.ndarray):
-                return arr.size == 0
-            elif isinstance(arr, (float, int)):
-                return False
-            else:
-                raise ValueError(
-                    f"Don't know how to deal with: {var.name}: {arr}")
-
         import xarray as xr
 
         xr_data_vars: dict[str, tuple[list[str], np.ndarray]] = {}
@@ -339,7 +523,7 @@ class IDSMapping(Mapping):
 
             arr = self._read_array_from_parts(*parts)
 
-            if _contains_empty(arr):
+            if arr is None:
                 if empty_var_ok:
                     continue
                 else:
@@ -351,22 +535,74 @@ class IDSMapping(Mapping):
 
         return ds
 
-    def _write_array_in_parts(self, data, *parts: str) -> None:
-        """_write_array_in_parts.
+    @staticmethod
+    def _write_data(pointer: Any, attr: str, data: Any) -> None:
+        """Write data to attribute, in place if the buffer matches."""
+        current = getattr(pointer, attr)
+
+        if (isinstance(current, np.ndarray) and isinstance(data, np.ndarray)
+                and current.shape == data.shape and current.dtype == data.dtype
+                and current.flags.writeable):
+            np.copyto(current, data)
+        else:
+            setattr(pointer, attr, data)
+
+    def _write_arrays_in_parts(
+            self, node: Any, entries: list[tuple[str, list[str],
+                                                 Any]]) -> None:
+        """Write data for all entries relative to the given node.
 
-        inner function that determines the path and writes back the data
+        Each entry consists of the variable path, the remaining parts
+        of the path (split by `*`), and the data. Structure nodes shared
+        by multiple entries are resolved only once.
         """
-        if len(parts) < 2:
-            # Write back
-            path, = parts
-            self[path] = data
-            return
+        grouped = groupby(entries, keyfunc=lambda entry: entry[1][0])
+
+        for head, group in grouped.items():
+            *parents, attr = head.split('/')
 
-        root, sub, *remaining = parts
-        nodes = self[root]
-        for index in range(len(nodes)):
-            path = f'{root}/{index}/{sub}'
-            self._write_array_in_parts(data[index], path, *remaining)
+            try:
+                pointer = node
+                for part in parents:
+                    pointer = self._getattr(pointer, part)
+
+                nested = []
+                for path, parts, data in group:
+                    if len(parts) == 1:
+                        self._write_data(pointer, attr, data)
+                    else:
+                        nested.append((path, parts[1:], data))
+
+                if not nested:
+                    continue
+
+                nodes = self._getattr(pointer, attr)
+            except (AttributeError, IndexError) as err:
+                raise KeyError(group[0][0]) from err
+
+            for index in range(len(nodes)):
+                self._write_arrays_in_parts(nodes[index],
+                                            [(path, parts, data[index])
+                                             for path, parts, data in nested])
+
+    def write_arrays_in_parts(
+            self, arrays: Mapping[str, xr.DataArray | np.ndarray]) -> None:
+        """Write back data for multiple variables in a single pass.
+
+        Works like `write_array_in_parts`, but the IDS is traversed only
+        once for all variables. Data are copied into the existing arrays
+        where the shape and type match.
+
+        Parameters
+        ----------
+        arrays : Mapping[str, xr.DataArray | np.ndarray]
+            Mapping of variable paths to data, where every star in the
+            variable path is a dimension in the data.
+        """
+        entries = [(path, path.split('/*/'), np.asarray(data))
+                   for path, data in arrays.items()]
+
+        self._write_arrays_in_parts(self._ids, entries)
 
     def write_array_in_parts(self, variable_path: str,
                              data: xr.DataArray) -> None:
@@ -386,5 +622,23 @@ class IDSMapping(Mapping):
         -------
         None
         """
-        parts = variable_path.split('/*/')
-        self._write_array_in_parts(data.data, *parts)
+        self.write_arrays_in_parts({variable_path: data})
+
+    def from_xarray(self, dataset: xr.Dataset,
+                    variables: Sequence[str | Variable]) -> None:
+        """Write variables in dataset back to the IDS.
+
+        Inverse of `to_xarray`, all variables are written in a single pass.
+
+        Parameters
+        ----------
+        dataset : xr.Dataset
+            Input dataset
+        variables : Sequence[str | Variable]
+            Variables to write back, must be present in the dataset.
+        """
+        var_models = var_lookup.lookup(variables)
+
+        self.write_arrays_in_parts(
+            {var.path: dataset[var.name]
+             for var in var_models})
@@ -3,11 +3,11 @@ from __future__ import annotations
 import logging
 import os
 from pathlib import Path
-from typing import TYPE_CHECKING, List
+from typing import TYPE_CHECKING, Collection, List, Optional
 
 from ..operations import add_to_op_queue
 from .__handle import _ImasHandle
-from ._copy import copy_ids_entry
+from ._copy import CopyMethod, copy_ids_entry
 from ._imas import imas, imasdef
 
 if TYPE_CHECKING:
@@ -69,22 +69,31 @@ class MdsplusImasHandle(_ImasHandle):
         path = self.path()
         return all(path.with_suffix(sf).exists() for sf in SUFFIXES)
 
-    def copy_data_to(self, destination: _ImasHandle):
+    def copy_data_to(self,
+                     destination: _ImasHandle,
+                     method: CopyMethod = 'file',
+                     ids: Optional[Collection[str]] = None):
         """Copy ids entry to given destination.
 
         Parameters
         ----------
         destination : ImasHandle
             Copy data to a new location.
+        method : str, optional
+            How to copy the data, one of `file`, `reflink`,
+            `hardlink`, `overlay`, `imas`.
+        ids : Collection[str], optional
+            With `method='overlay'`, only copy these IDSs and link
+            the others to this entry.
         """
         logger.debug('Copy %s to %s', self, destination)
 
         try:
-            copy_ids_entry(self, destination)
+            copy_ids_entry(self, destination, method=method, ids=ids)
         except Exception as err:
             raise OSError(f'Failed to copy {self}') from err
 
-    @add_to_op_queue('Removing ids', '{self}')
+    @add_to_op_queue('Removing ids', '{self}', writes=('{self}', ))
     def delete(self):
         """Remove data from entry."""
         # ERASE_PULSE operation is yet supported by IMAS as of June 2022
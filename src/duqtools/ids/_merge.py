@@ -1,15 +1,19 @@
 from __future__ import annotations
 
 import logging
-from typing import TYPE_CHECKING, Sequence
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import TYPE_CHECKING, Callable, Iterator, Literal, Optional, Sequence
 
-import xarray as xr
-from imas2xarray import rebase_all_coords, squash_placeholders
+from imas2xarray import squash_placeholders
 
 from ..operations import add_to_op_queue
 from ..utils import groupby
+from ._rebase import rebase_all_coords
+from ._stats import RunningStats
 
 if TYPE_CHECKING:
+    import xarray as xr
     from imas2xarray import Variable
 
     from ._handle import ImasHandle
@@ -18,18 +22,102 @@ logger = logging.getLogger(__name__)
 
 info = logger.info
 
+POOLS = {
+    'process': ProcessPoolExecutor,
+    'thread': ThreadPoolExecutor,
+}
 
-@add_to_op_queue('Merging to', '{target}')
+
+def _get_variables(handle: ImasHandle,
+                   variables: Sequence[Variable]) -> xr.Dataset:
+    """Load variables from handle, module level so it can be pickled."""
+    return handle.get_variables(variables, empty_var_ok=True)  # type: ignore
+
+
+def iter_data(
+    handles: Sequence[ImasHandle],
+    variables: Sequence[Variable],
+    *,
+    jobs: int = 1,
+    pool: Literal['process', 'thread'] = 'process',
+    callback: Optional[Callable[[float], None]] = None,
+) -> Iterator[xr.Dataset]:
+    """Load variables from all handles, concurrently if `jobs > 1`.
+
+    Processes are used by default, because the IMAS access layer
+    is not thread-safe. The datasets are yielded in the same order as the
+    handles, at most `2 * jobs` datasets are loaded ahead.
+
+    Parameters
+    ----------
+    handles : Sequence[ImasHandle]
+        Handles to load the data from.
+    variables : Sequence[Variable]
+        Variables to load, must belong to the same IDS.
+    jobs : int, optional
+        Number of workers.
+    pool : {'process', 'thread'}, optional
+        Type of worker pool.
+    callback : Callable[[float], None], optional
+        Called with the fraction of handles that have been loaded.
+
+    Yields
+    ------
+    xr.Dataset
+    """
+    n_tot = len(handles)
+
+    if jobs <= 1 or n_tot <= 1:
+        for i, handle in enumerate(handles):
+            ds = _get_variables(handle, variables)
+            if callback:
+                callback((i + 1) / n_tot)
+            yield ds
+        return
+
+    with POOLS[pool](max_workers=jobs) as executor:
+        pending: deque[Future] = deque()
+        to_submit = iter(handles)
+
+        for i in range(n_tot):
+            for handle in to_submit:
+                pending.append(
+                    executor.submit(_get_variables, handle, variables))
+                if len(pending) >= 2 * jobs:
+                    break
+
+            ds = pending.popleft().result()
+            if callback:
+                callback((i + 1) / n_tot)
+            yield ds
+
+
+def load_data(handles: Sequence[ImasHandle], variables: Sequence[Variable],
+              **kwargs) -> list[xr.Dataset]:
+    """Load variables from all handles into a list.
+
+    See `iter_data` for the parameters.
+    """
+    return list(iter_data(handles, variables, **kwargs))
+
+
+@add_to_op_queue('Merging to', '{target}', writes=('{target}', ))
 def merge_data(
     handles: Sequence[ImasHandle],
     target: ImasHandle,
     variables: list[Variable],
     callback=None,
+    jobs: int = 1,
+    pool: Literal['process', 'thread'] = 'process',
+    weights: Optional[Sequence[float]] = None,
 ):
     """merge_data merges the data from the handles to the target, only merges
     over the listed variables, coordination variables are never overwritten,
     and data is rebased according to the target coordination variable.
 
+    The data are loaded one handle at a time and folded into running
+    statistics, so that memory use does not depend on the number of handles.
+
     Parameters
     ----------
     handles : Sequence[ImasHandle]
@@ -38,6 +126,15 @@ def merge_data(
         target
     variables : Sequence[Variable]
         variables
+    callback : Callable[[float], None], optional
+        Called with the fraction of the merge that has been completed.
+    jobs : int, optional
+        Number of workers used to load the data from the handles.
+    pool : {'process', 'thread'}, optional
+        Type of worker pool used to load the data.
+    weights : Sequence[float], optional
+        Weights of the handles for the (weighted) mean and
+        standard deviation.
     """
     from ..config import var_lookup
 
@@ -57,15 +154,17 @@ def merge_data(
 
     variables = tuple(variable_dict.values())
 
+    if weights is None:
+        weights = [1.0] * len(handles)
+    elif len(weights) != len(handles):
+        raise ValueError('Number of weights must match number of handles')
+
     # Get all known variables per ids
     grouped_ids_vars = groupby(variables, keyfunc=lambda var: var.ids)
 
     i_tot = len(grouped_ids_vars)
 
     for i, (ids_name, ids_vars) in enumerate(grouped_ids_vars.items()):
-        if callback:
-            callback(i / i_tot)
-
         # Get all data, and rebase it
         target_ids = target.get(ids_name)  # type: ignore
 
@@ -78,24 +177,32 @@ def merge_data(
                                            empty_var_ok=True)
         target_data = squash_placeholders(target_data)
 
-        ids_data = [
-            handle.get_variables(ids_vars, empty_var_ok=True)  # type: ignore
-            for handle in handles
-        ]
+        def ids_callback(fraction: float, i: int = i):
+            if callback:
+                callback((i + fraction) / i_tot)
+
+        stats = RunningStats()
+
+        ids_data = iter_data(handles,
+                             ids_vars,
+                             jobs=jobs,
+                             pool=pool,
+                             callback=ids_callback)
 
-        ids_data = rebase_all_coords(ids_data, target_data)
-        ids_data = xr.concat(ids_data, 'handle')
+        for weight, ds in zip(weights, ids_data):
+            ds, = rebase_all_coords([ds], target_data)
+            stats.add(ds, weight=weight)
 
-        # Now we have to get the stddeviations
-        mean_data = ids_data.mean(dim='handle')
-        std_data = ids_data.std(dim='handle', skipna=True)
+        mean_data = stats.mean()
+        std_data = stats.std()
 
         # Then, write it back to target
-        for name in ids_data.data_vars.keys():
+        arrays = {}
+        for name in mean_data.data_vars.keys():
             path = variable_dict[name].path
-            target_ids.write_array_in_parts(path, mean_data[name])
+            arrays[path] = mean_data[name]
+            arrays[path + '_error_upper'] = std_data[name]
 
-            path_upper = path + '_error_upper'
-            target_ids.write_array_in_parts(path_upper, std_data[name])
+        target_ids.write_arrays_in_parts(arrays)
 
         target.update_from(target_ids)
@@ -0,0 +1,218 @@
+"""Rebase operations with cached interpolation weights.
+
+These are drop-in replacements for the functions in `imas2xarray`.
+Runs in an ensemble usually share the same grid, so the weights to
+interpolate from one grid to another are computed once and applied to
+all variables as a sparse matrix product.
+"""
+from __future__ import annotations
+
+import logging
+from functools import lru_cache
+from typing import TYPE_CHECKING, Mapping, Sequence
+
+import numpy as np
+from scipy import sparse
+
+if TYPE_CHECKING:
+    import xarray as xr
+
+logger = logging.getLogger(__name__)
+
+NUMERIC_KINDS = 'biufc'
+
+
+@lru_cache(maxsize=256)
+def _interp_matrix(old: bytes, new: bytes) -> sparse.csr_matrix:
+    """Return matrix for linear interpolation (with extrapolation) from
+    `old` to `new` coordinates.
+
+    The arguments are the raw float64 buffers, so that identical
+    coordinate arrays map to the same cache entry.
+    """
+    x_old = np.frombuffer(old)
+    x_new = np.frombuffer(new)
+
+    n_old = len(x_old)
+    n_new = len(x_new)
+    rows = np.arange(n_new)
+
+    if n_old == 1:
+        return sparse.csr_matrix((np.ones(n_new), (rows, np.zeros(n_new))),
+                                 shape=(n_new, 1))
+
+    order = np.argsort(x_old, kind='stable')
+    x_sorted = x_old[order]
+
+    lo = np.clip(np.searchsorted(x_sorted, x_new) - 1, 0, n_old - 2)
+    hi = lo + 1
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        t = (x_new - x_sorted[lo]) / (x_sorted[hi] - x_sorted[lo])
+
+    data = np.concatenate((1 - t, t))
+    cols = np.concatenate((order[lo], order[hi]))
+
+    return sparse.csr_matrix((data, (np.tile(rows, 2), cols)),
+                             shape=(n_new, n_old))
+
+
+def interp_matrix(old: np.ndarray, new: np.ndarray) -> sparse.csr_matrix:
+    """Return (cached) sparse matrix to interpolate data on the `old`
+    coordinates to the `new` coordinates."""
+    old = np.ascontiguousarray(old, dtype=np.float64)
+    new = np.ascontiguousarray(new, dtype=np.float64)
+    return _interp_matrix(old.tobytes(), new.tobytes())
+
+
+def _apply_along_axis(matrix: sparse.csr_matrix, data: np.ndarray,
+                      axis: int) -> np.ndarray:
+    """Apply matrix to data along the given axis."""
+    data = np.moveaxis(np.asarray(data), axis, 0)
+    shape = data.shape
+
+    out = matrix @ data.reshape(shape[0], -1)
+    out = out.reshape(matrix.shape[0], *shape[1:])
+
+    return np.moveaxis(out, 0, axis)
+
+
+def _can_rebase(ds: xr.Dataset, coords: Mapping) -> bool:
+    """Check if the fast path applies to this dataset."""
+    for name, new in coords.items():
+        if name not in ds.dims or name not in ds.indexes:
+            return False
+        if np.ndim(new) != 1:
+            return False
+
+    for var in ds.variables.values():
+        if any(name in var.dims for name in coords):
+            if var.dtype.kind not in NUMERIC_KINDS:
+                return False
+
+    return True
+
+
+def _rebase_dim(ds: xr.Dataset, dim: str, new: np.ndarray) -> xr.Dataset:
+    """Interpolate all variables along `dim` to the new coordinates."""
+    import xarray as xr
+
+    old = ds[dim].data
+
+    if old.shape == new.shape and np.array_equal(old, new):
+        return ds
+
+    matrix = interp_matrix(old, new)
+
+    def rebase(var: xr.Variable) -> xr.Variable:
+        if dim not in var.dims:
+            return var
+        data = _apply_along_axis(matrix, var.data, var.dims.index(dim))
+        return xr.Variable(var.dims, data, attrs=var.attrs)
+
+    coords = {
+        name:
+        (dim, new, coord.attrs) if name == dim else rebase(coord.variable)
+        for name, coord in ds.coords.items()
+    }
+    data_vars = {
+        name: rebase(var.variable)
+        for name, var in ds.data_vars.items()
+    }
+
+    return xr.Dataset(data_vars=data_vars, coords=coords, attrs=ds.attrs)
+
+
+def rebase_on_coords(ds: xr.Dataset, coords: Mapping) -> xr.Dataset:
+    """Rebase (interpolate) the dataset to the new coordinates.
+
+    Equivalent to `ds.interp(coords, kwargs={'fill_value': 'extrapolate'})`
+    for linear interpolation along 1D dimension coordinates. Falls back
+    to `xarray` for anything else.
+
+    Parameters
+    ----------
+    ds : xr.Dataset
+        Source dataset
+    coords : Mapping
+        Mapping of dimension names to the new coordinates.
+
+    Returns
+    -------
+    xr.Dataset
+        Rebased dataset
+    """
+    if not _can_rebase(ds, coords):
+        return ds.interp(coords=coords, kwargs={'fill_value': 'extrapolate'})
+
+    for name, new in coords.items():
+        ds = _rebase_dim(ds, name, np.asarray(new))
+
+    return ds
+
+
+def rebase_all_coords(
+    datasets: Sequence[xr.Dataset],
+    reference_dataset: xr.Dataset,
+) -> tuple[xr.Dataset, ...]:
+    """Rebase all coords, by applying rebase operations.
+
+    Parameters
+    ----------
+    datasets : Sequence[xr.Dataset]
+        datasets
+    reference_dataset : xr.Dataset
+        reference_dataset
+
+    Returns
+    -------
+    tuple[xr.Dataset, ...]
+    """
+    interp_dict = {
+        name: dim.data
+        for name, dim in reference_dataset.coords.items() if dim.size > 1
+    }
+
+    return tuple(rebase_on_coords(ds, interp_dict) for ds in datasets)
+
+
+def standardize_grid_and_time(
+    datasets: Sequence[xr.Dataset],
+    *,
+    grid_var: str = 'rho_tor_norm',
+    time_var: str = 'time',
+    reference_dataset: int = 0,
+) -> tuple[xr.Dataset, ...]:
+    """Standardize list of datasets by rebasing the grid and time
+    to the reference dataset.
+
+    Parameters
+    ----------
+    datasets : Sequence[xr.Dataset]
+        List of source datasets
+    grid_var : str, optional
+        Name of the grid dimension (i.e. grid variable)
+    time_var : str, optional
+        Name of the time dimension (i.e. time variable)
+    reference_dataset : int, optional
+        The dataset with this index will be used as the reference for rebasing.
+
+    Returns
+    -------
+    tuple[xr.Dataset]
+        Tuple of output datasets
+    """
+    reference_grid = datasets[reference_dataset][grid_var].data
+
+    datasets = tuple(
+        rebase_on_coords(ds, {grid_var: reference_grid}) for ds in datasets)
+
+    reference_time = datasets[reference_dataset][time_var].data
+
+    def rebase_on_time(ds: xr.Dataset) -> xr.Dataset:
+        if len(ds[time_var]) < 2:
+            # nothing to rebase with only 1 timestep
+            return ds
+        return rebase_on_coords(ds, {time_var: reference_time})
+
+    return tuple(rebase_on_time(ds) for ds in datasets)
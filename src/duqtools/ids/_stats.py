@@ -0,0 +1,157 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Any
+
+import numpy as np
+
+if TYPE_CHECKING:
+    import xarray as xr
+
+
+class _Moments:
+    """Running (weighted) central moments for a single array.
+
+    NaN values are skipped, so the statistics for every element are
+    computed over the samples where it is defined.
+    """
+
+    def __init__(self, shape: tuple[int, ...], higher_moments: bool = False):
+        self.weight = np.zeros(shape)
+        self.mean = np.zeros(shape)
+        self.m2 = np.zeros(shape)
+
+        self.higher_moments = higher_moments
+        if higher_moments:
+            self.m3 = np.zeros(shape)
+            self.m4 = np.zeros(shape)
+
+    def add(self, x: np.ndarray, weight: float = 1.0) -> None:
+        """Fold sample into the moments.
+
+        Uses the pairwise update formulas by Welford/West (mean, M2)
+        and Pébay (M3, M4), where the sample is a set of size `weight`.
+        """
+        x = np.asarray(x, dtype=float)
+        if x.shape != self.mean.shape:
+            raise ValueError(f'Expected data with shape {self.mean.shape}, '
+                             f'got {x.shape}')
+
+        valid = ~np.isnan(x)
+
+        w_a = self.weight
+        w_b = np.where(valid, weight, 0.0)
+        w = w_a + w_b
+
+        delta = np.where(valid, x - self.mean, 0.0)
+        d = np.divide(delta, w, out=np.zeros_like(delta), where=w > 0)
+
+        if self.higher_moments:
+            self.m4 += (w_a * w_b *
+                        (w_a * w_a - w_a * w_b + w_b * w_b) * delta * d**3 +
+                        6 * w_b * w_b * d * d * self.m2 -
+                        4 * w_b * d * self.m3)
+            self.m3 += (w_a * w_b * (w_a - w_b) * delta * d * d -
+                        3 * w_b * d * self.m2)
+
+        self.m2 += w_a * w_b * delta * d
+        self.mean += w_b * d
+        self.weight = w
+
+    def _masked(self, arr: np.ndarray) -> np.ndarray:
+        return np.where(self.weight > 0, arr, np.nan)
+
+    def get_mean(self) -> np.ndarray:
+        return self._masked(self.mean)
+
+    def get_var(self) -> np.ndarray:
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return self._masked(self.m2 / self.weight)
+
+    def get_skewness(self) -> np.ndarray:
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return self._masked(np.sqrt(self.weight) * self.m3 / self.m2**1.5)
+
+    def get_kurtosis(self) -> np.ndarray:
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return self._masked(self.weight * self.m4 / self.m2**2 - 3)
+
+
+class RunningStats:
+
+    def __init__(self, higher_moments: bool = False):
+        """Streaming statistics over a sequence of datasets.
+
+        Datasets are folded into the running moments one at a time,
+        so that memory use does not depend on the number of datasets.
+        All datasets must have the same shape (i.e. be rebased to the same
+        coordinates). NaN values are skipped.
+
+        Parameters
+        ----------
+        higher_moments : bool, optional
+            Also keep track of the third and fourth moments,
+            needed for `skewness` and `kurtosis`.
+        """
+        self.higher_moments = higher_moments
+        self.n = 0
+
+        self._moments: dict[Any, _Moments] = {}
+        self._dims: dict[Any, tuple] = {}
+        self._coords: xr.Coordinates | None = None
+
+    def add(self, ds: xr.Dataset, weight: float = 1.0) -> None:
+        """Add dataset to the statistics.
+
+        Parameters
+        ----------
+        ds : xr.Dataset
+            Input dataset.
+        weight : float, optional
+            Weight of the dataset.
+        """
+        if self._coords is None:
+            self._coords = ds.coords
+
+        for name, da in ds.data_vars.items():
+            if name not in self._moments:
+                self._dims[name] = da.dims
+                self._moments[name] = _Moments(da.shape, self.higher_moments)
+
+            data = da.transpose(*self._dims[name]).data
+            self._moments[name].add(data, weight=weight)
+
+        self.n += 1
+
+    def _to_dataset(self, attr: str) -> xr.Dataset:
+        import xarray as xr
+
+        data_vars = {
+            name: (self._dims[name], getattr(moments, attr)())
+            for name, moments in self._moments.items()
+        }
+
+        return xr.Dataset(data_vars=data_vars, coords=self._coords)
+
+    def mean(self) -> xr.Dataset:
+        """Return the (weighted) mean."""
+        return self._to_dataset('get_mean')
+
+    def var(self) -> xr.Dataset:
+        """Return the (weighted) population variance."""
+        return self._to_dataset('get_var')
+
+    def std(self) -> xr.Dataset:
+        """Return the (weighted) population standard deviation."""
+        return np.sqrt(self.var())
+
+    def skewness(self) -> xr.Dataset:
+        """Return the (weighted) skewness."""
+        if not self.higher_moments:
+            raise ValueError('Skewness requires `higher_moments=True`')
+        return self._to_dataset('get_skewness')
+
+    def kurtosis(self) -> xr.Dataset:
+        """Return the (weighted) excess kurtosis."""
+        if not self.higher_moments:
+            raise ValueError('Kurtosis requires `higher_moments=True`')
+        return self._to_dataset('get_kurtosis')
@@ -4,7 +4,14 @@ import logging
 
 import click
 
-from ..cli import common_options, dry_run_option, logging_options, variables_option, yes_option
+from ..cli import (
+    common_options,
+    dry_run_option,
+    jobs_option,
+    logging_options,
+    variables_option,
+    yes_option,
+)
 from ..operations import op_queue_context
 
 logger = logging.getLogger(__name__)
@@ -81,15 +88,16 @@ def cli_setup(**kwargs):
 @click.option('--no-sampling',
               is_flag=True,
               help='Create base runs (ignores `dimensions`/`sampler`).')
+@jobs_option
 @common_options(*logging_options, yes_option, dry_run_option)
-def cli_create(**kwargs):
+def cli_create(jobs, **kwargs):
     """Create data sets for large scale validation.
 
     Example to only match config files in subdirectories matching jet*:
     `duqduq create --pattern 'jet*/**'`
     """
     from .create import create
-    with op_queue_context():
+    with op_queue_context(jobs=jobs):
         create(**kwargs)
 
 
@@ -166,6 +174,7 @@ def cli_status(**kwargs):
 @cli.command('merge')
 @click.option('--force', is_flag=True, help='Overwrite existing data')
 @variables_option
+@jobs_option
 @common_options(*logging_options, yes_option, dry_run_option)
 def cli_merge(**kwargs):
     """Merge data sets with error propagation.
@@ -23,7 +23,7 @@ def _write_data_csv(handles: dict[str, ImasHandle], fname: str = 'data.csv'):
     df.to_csv(fname)
 
 
-def merge(force: bool, var_names: Sequence[str], **kwargs):
+def merge(force: bool, var_names: Sequence[str], jobs: int = 1, **kwargs):
     cwd = Path.cwd()
 
     variables = _resolve_variables(var_names)
@@ -68,6 +68,7 @@ def merge(force: bool, var_names: Sequence[str], **kwargs):
             target=target_data,
             template=template_data,
             force=force,
+            jobs=jobs,
         )
 
     _write_data_csv(target_handles, fname='merge_data.csv')
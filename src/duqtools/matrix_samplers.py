@@ -1,15 +1,18 @@
 from __future__ import annotations
 
 import itertools
-from typing import Any, Optional
+from typing import Any, Iterator, Optional
 
+import numpy as np
 from scipy.stats import qmc
 
+from .schema import ContinuousDim
 
-def cartesian_product(*iterables, **kwargs) -> list[Any]:
+
+def cartesian_product(*iterables, **kwargs) -> Iterator[Any]:
     """Return cartesian product of input iterables.
 
-    Uses `itertools.product`
+    Uses `itertools.product`, the samples are generated lazily.
 
     Parameters
     ----------
@@ -18,30 +21,84 @@ def cartesian_product(*iterables, **kwargs) -> list[Any]:
 
     Returns
     -------
-    list[Any]
-        List of product of input arguments.
+    Iterator[Any]
+        Iterator over the product of input arguments.
     """
-    return list(itertools.product(*iterables))
+    if any(isinstance(iterable, ContinuousDim) for iterable in iterables):
+        raise ValueError('Continuous dimensions cannot be used with the '
+                         'cartesian product, use one of the other samplers.')
 
+    return itertools.product(*iterables)
+
+
+def sample_indices(func, bounds: tuple[int, ...], *, n_samples: int,
+                   **kwargs) -> np.ndarray:
+    """Sample indices into the iterables with the given lengths.
+
+    Parameters
+    ----------
+    func
+        Sampler class from `scipy.stats.qmc`.
+    bounds : tuple[int, ...]
+        Length of each iterable.
+    n_samples : int
+        Number of samples.
+
+    Returns
+    -------
+    np.ndarray
+        Array of shape `(n_samples, len(bounds))` with the indices.
+    """
+    sampler = func(d=len(bounds), **kwargs)
+    return sampler.integers(l_bounds=bounds, n=n_samples)
 
-def _sampler(func, *iterables, n_samples: int, **kwargs) -> list[Any]:
-    """Generic sampler."""
-    bounds = tuple(len(iterable) for iterable in iterables)
 
+def _continuous_sampler(func, *iterables, n_samples: int,
+                        **kwargs) -> Iterator[Any]:
+    """Sampler for a mix of discrete and continuous dimensions.
+
+    The samples from the unit hypercube are mapped onto the continuous
+    distributions directly, and onto indices for the discrete dimensions.
+    """
     sampler = func(d=len(iterables), **kwargs)
-    indices = sampler.integers(l_bounds=bounds, n=n_samples)
+    points = sampler.random(n=n_samples)
 
-    samples = []
-    for row in indices:
-        samples.append(tuple(arg[col] for col, arg in zip(row, iterables)))
+    columns = []
+    for col, iterable in zip(points.T, iterables):
+        if isinstance(iterable, ContinuousDim):
+            columns.append(iterable.sample(col))
+        else:
+            indices = np.minimum((col * len(iterable)).astype(int),
+                                 len(iterable) - 1)
+            columns.append(map(iterable.__getitem__, indices))
+
+    yield from zip(*columns)
+
+
+def _sampler(func, *iterables, n_samples: int, **kwargs) -> Iterator[Any]:
+    """Generic sampler.
 
-    return samples
+    Only the index array is stored, the samples are generated lazily.
+    """
+    if any(isinstance(iterable, ContinuousDim) for iterable in iterables):
+        yield from _continuous_sampler(func,
+                                       *iterables,
+                                       n_samples=n_samples,
+                                       **kwargs)
+        return
+
+    bounds = tuple(len(iterable) for iterable in iterables)
+
+    indices = sample_indices(func, bounds, n_samples=n_samples, **kwargs)
+
+    for row in indices:
+        yield tuple(arg[col] for col, arg in zip(row, iterables))
 
 
 def latin_hypercube(*iterables,
                     n_samples: int,
                     seed: Optional[int] = None,
-                    **kwargs) -> list[Any]:
+                    **kwargs) -> Iterator[Any]:
     """Sample input iterables using Latin hypercube sampling (LHS).
 
     Uses `scipy.stats.qmc.LatinHyperCube`.
@@ -57,8 +114,8 @@ def latin_hypercube(*iterables,
 
     Returns
     -------
-    samples : list[Any]
-        List of sampled input arguments.
+    samples : Iterator[Any]
+        Iterator over the sampled input arguments.
     """
     return _sampler(qmc.LatinHypercube,
                     *iterables,
@@ -69,7 +126,7 @@ def latin_hypercube(*iterables,
 def sobol(*iterables,
           n_samples: int,
           seed: Optional[int] = None,
-          **kwargs) -> list[Any]:
+          **kwargs) -> Iterator[Any]:
     """Sample input iterables using the Sobol sampling method for generating
     low discrepancy sequences.
 
@@ -88,8 +145,8 @@ def sobol(*iterables,
 
     Returns
     -------
-    samples : list[Any]
-        List of sampled input arguments.
+    samples : Iterator[Any]
+        Iterator over the sampled input arguments.
     """
     return _sampler(qmc.Sobol, *iterables, n_samples=n_samples, seed=seed)
 
@@ -97,7 +154,7 @@ def sobol(*iterables,
 def halton(*iterables,
            n_samples: int,
            seed: Optional[int] = None,
-           **kwargs) -> list[Any]:
+           **kwargs) -> Iterator[Any]:
     """Sample input iterables using the Halton sampling method.
 
     Uses `scipy.stats.qmc.Halton`.
@@ -113,8 +170,8 @@ def halton(*iterables,
 
     Returns
     -------
-    samples : list[Any]
-        List of sampled input arguments.
+    samples : Iterator[Any]
+        Iterator over the sampled input arguments.
     """
     return _sampler(qmc.Halton, *iterables, n_samples=n_samples, seed=seed)
 
@@ -36,7 +36,8 @@ def _merge(*,
            template: ImasHandle,
            target: ImasHandle,
            variables: Sequence[Variable],
-           force: bool = False):
+           force: bool = False,
+           jobs: int = 1):
     """Merge mas data.
 
     Parameters
@@ -51,6 +52,8 @@ def _merge(*,
         These are the IDS variables to be merged.
     force : bool
         Force overwriting existing files.
+    jobs : int
+        Number of processes used to load the data.
     """
     for handle in handles:
         logger.debug('Source for merge %s', handle)
@@ -66,11 +69,18 @@ def _merge(*,
 
     template.copy_data_to(target)
 
-    merge_data(handles, target, variables)
+    merge_data(handles, target, variables, jobs=jobs)
 
 
-def merge(*, target: str, template: str, handles: list[str],
-          input_files: list[str], var_names: list[str], force: bool, **kwargs):
+def merge(*,
+          target: str,
+          template: str,
+          handles: list[str],
+          input_files: list[str],
+          var_names: list[str],
+          force: bool,
+          jobs: int = 1,
+          **kwargs):
     """Merge as many data as possible."""
     template = ImasHandle.from_string(template)
     target = ImasHandle.from_string(target)
@@ -89,4 +99,5 @@ def merge(*, target: str, template: str, handles: list[str],
         target=target,  # type: ignore
         variables=variables,
         force=force,
+        jobs=jobs,
     )
@@ -3,6 +3,7 @@ from __future__ import annotations
 from ._job import Job, JobStatus
 from ._locations import Locations
 from ._run import Run, Runs
+from ._snapshot import StatusSnapshot
 
 __all__ = [
     'Locations',
@@ -10,4 +11,5 @@ __all__ = [
     'JobStatus',
     'Run',
     'Runs',
+    'StatusSnapshot',
 ]
@@ -4,7 +4,7 @@ import logging
 import time
 from enum import Enum
 from pathlib import Path
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, Optional
 
 import click
 
@@ -98,18 +98,27 @@ class Job:
         sf = self.status_file
         with open(sf) as f:
             content = f.read()
-            if self.cfg.system.msg_completed in content:
-                return JobStatus.COMPLETED
-            elif self.cfg.system.msg_failed in content:
-                return JobStatus.FAILED
-            elif self.cfg.system.msg_running in content:
-                return JobStatus.RUNNING
+
+        status = self.parse_status(content)
+        if status:
+            return status
 
         if self.is_submitted:
             return JobStatus.SUBMITTED
 
         return JobStatus.UNKNOWN
 
+    def parse_status(self, content: str) -> Optional[str]:
+        """Return the status from the contents of the status file, or None
+        if it cannot be determined."""
+        if self.cfg.system.msg_completed in content:
+            return JobStatus.COMPLETED
+        elif self.cfg.system.msg_failed in content:
+            return JobStatus.FAILED
+        elif self.cfg.system.msg_running in content:
+            return JobStatus.RUNNING
+        return None
+
     @property
     def is_completed(self) -> bool:
         """Return true if the job has been completed succesfully."""
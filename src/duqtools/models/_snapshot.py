@@ -0,0 +1,226 @@
+"""Collect the status of many jobs at once.
+
+Checking the status job by job hits the filesystem several times per
+job (submit script, status file, lockfile), which is slow for large
+ensembles on a shared filesystem. A snapshot lists every run directory
+once, reads each status file at most once, and gets the state of all
+submitted jobs from a single slurm query (`sacct`, or `squeue` as a
+fallback), using the job ids that were written to the lockfiles.
+"""
+from __future__ import annotations
+
+import logging
+import os
+import re
+import shutil
+import subprocess as sp
+from pathlib import Path
+from typing import TYPE_CHECKING, Iterable, NamedTuple, Optional, Sequence
+
+from ._job import JobStatus
+
+if TYPE_CHECKING:
+    from ._job import Job
+
+logger = logging.getLogger(__name__)
+debug = logger.debug
+
+# Output of `sbatch` or `sbatch --parsable`
+JOB_ID_PATTERN = re.compile(rb'(?:Submitted batch job\s+)?(\d+)(?:;\S+)?')
+
+SLURM_ACTIVE = {
+    'RUNNING': JobStatus.RUNNING,
+    'COMPLETING': JobStatus.RUNNING,
+    'PENDING': JobStatus.SUBMITTED,
+    'CONFIGURING': JobStatus.SUBMITTED,
+    'REQUEUED': JobStatus.SUBMITTED,
+    'SUSPENDED': JobStatus.SUBMITTED,
+}
+
+SLURM_FAILED = {
+    'BOOT_FAIL',
+    'CANCELLED',
+    'DEADLINE',
+    'FAILED',
+    'NODE_FAIL',
+    'OUT_OF_MEMORY',
+    'PREEMPTED',
+    'TIMEOUT',
+}
+
+
+class JobState(NamedTuple):
+    has_submit_script: bool
+    has_status: bool
+    is_submitted: bool
+    status: str
+
+
+def parse_job_id(content: bytes) -> Optional[str]:
+    """Return slurm job id from the contents of a lockfile (i.e. the
+    output of `sbatch`), or None if there is no job id."""
+    match = JOB_ID_PATTERN.fullmatch(content.strip())
+    return match.group(1).decode() if match else None
+
+
+def _run_query(cmd: list[str]) -> Optional[str]:
+    if not shutil.which(cmd[0]):
+        return None
+
+    debug('Query slurm: %s', ' '.join(cmd))
+
+    try:
+        ret = sp.run(cmd, check=True, capture_output=True, text=True)
+    except (OSError, sp.CalledProcessError) as err:
+        debug('Slurm query failed: %s', err)
+        return None
+
+    return ret.stdout
+
+
+def query_slurm(job_ids: Iterable[str]) -> dict[str, str]:
+    """Return the slurm state for all job ids in a single query.
+
+    Array jobs are reported by their base id, with the most active
+    state of their tasks.
+
+    Parameters
+    ----------
+    job_ids : Iterable[str]
+        Slurm job ids.
+
+    Returns
+    -------
+    dict[str, str]
+        Slurm state (e.g. `RUNNING`, `PENDING`, `FAILED`) for each job id.
+        Jobs that slurm does not know about are omitted.
+    """
+    job_ids = sorted(set(job_ids))
+    if not job_ids:
+        return {}
+
+    id_list = ','.join(job_ids)
+
+    output = _run_query(
+        ['sacct', '-X', '-n', '-P', '-o', 'JobID,State', '-j', id_list])
+    if output is None:
+        output = _run_query(
+            ['squeue', '-h', '-o', '%i|%T', '-t', 'all', '-j', id_list])
+    if output is None:
+        return {}
+
+    states: dict[str, str] = {}
+
+    for line in output.splitlines():
+        try:
+            job_id, state = line.strip().split('|')[:2]
+        except ValueError:
+            continue
+
+        job_id = job_id.split('_')[0].split('.')[0]
+        # e.g. `CANCELLED by 1234`
+        state = state.split()[0] if state else ''
+
+        if states.get(job_id) not in SLURM_ACTIVE:
+            states[job_id] = state
+
+    return states
+
+
+class StatusSnapshot:
+
+    def __init__(self, jobs: Sequence[Job], *, query_cluster: bool = True):
+        """Status of all jobs at one moment in time.
+
+        Parameters
+        ----------
+        jobs : Sequence[Job]
+            Jobs to collect the status for.
+        query_cluster : bool, optional
+            Get the state of submitted jobs from slurm.
+        """
+        self.jobs = jobs
+        self.query_cluster = query_cluster
+        self.states: dict[Path, JobState] = {}
+
+    def __getitem__(self, job: Job) -> JobState:
+        return self.states[job.path]
+
+    def status(self, job: Job) -> str:
+        """Return the status of the job."""
+        return self[job].status
+
+    def refresh(self) -> StatusSnapshot:
+        """Collect the status of all jobs."""
+        listings = {job.path: self._scandir(job.path) for job in self.jobs}
+
+        job_ids: dict[Path, str] = {}
+        if self.query_cluster:
+            for job in self.jobs:
+                if job.lockfile.name in listings[job.path]:
+                    job_id = self._read_job_id(job)
+                    if job_id:
+                        job_ids[job.path] = job_id
+
+        cluster_states = query_slurm(job_ids.values())
+
+        for job in self.jobs:
+            files = listings[job.path]
+            cluster_state = cluster_states.get(job_ids.get(job.path, ''))
+            self.states[job.path] = self._job_state(job, files, cluster_state)
+
+        return self
+
+    @staticmethod
+    def _scandir(path: Path) -> set[str]:
+        try:
+            with os.scandir(path) as it:
+                return {entry.name for entry in it}
+        except OSError:
+            return set()
+
+    @staticmethod
+    def _read_job_id(job: Job) -> Optional[str]:
+        try:
+            return parse_job_id(job.lockfile.read_bytes())
+        except OSError:
+            return None
+
+    @staticmethod
+    def _exists(job: Job, path: Path, files: set[str]) -> bool:
+        if path.parent == job.path:
+            return path.name in files
+        return path.exists()
+
+    @classmethod
+    def _job_state(cls, job: Job, files: set[str],
+                   cluster_state: Optional[str]) -> JobState:
+        has_submit_script = cls._exists(job, job.submit_script, files)
+        has_status = cls._exists(job, job.status_file, files)
+        is_submitted = cls._exists(job, job.lockfile, files)
+
+        status = None
+
+        if has_status:
+            try:
+                status = job.parse_status(job.status_file.read_text())
+            except OSError:
+                pass
+
+        if status == JobStatus.RUNNING and cluster_state in SLURM_FAILED:
+            # Killed by slurm before it could update the status file
+            status = JobStatus.FAILED
+        elif status is None and cluster_state in SLURM_ACTIVE:
+            status = SLURM_ACTIVE[cluster_state]
+        elif status is None:
+            if not has_status:
+                status = JobStatus.NOSTATUS
+            elif is_submitted:
+                status = JobStatus.SUBMITTED
+            else:
+                status = JobStatus.UNKNOWN
+
+        return JobState(has_submit_script=has_submit_script,
+                        has_status=has_status,
+                        is_submitted=is_submitted,
+                        status=status)
@@ -9,10 +9,20 @@ from __future__ import annotations
 
 import atexit
 import logging
+import multiprocessing
+import os
 from collections import deque
-from contextlib import contextmanager
+from concurrent.futures import (
+    FIRST_COMPLETED,
+    Future,
+    ProcessPoolExecutor,
+    ThreadPoolExecutor,
+    wait,
+)
+from contextlib import ExitStack, contextmanager
+from functools import partial
 from inspect import signature
-from typing import Any, Callable, Optional, Sequence
+from typing import Any, Callable, Hashable, Iterator, Optional, Sequence
 
 import click
 from pydantic import Field, field_validator
@@ -95,6 +105,23 @@ class Operation(LongDescription):
         description='keyword arguments that will be '
         'passed to the action')
 
+    group: Optional[Hashable] = Field(
+        None,
+        description='operations in the same group are applied in order, '
+        'different groups may be applied in parallel')
+
+    reads: tuple[Hashable, ...] = Field(
+        (), description='resources (e.g. paths) read by the action')
+
+    writes: tuple[Hashable, ...] = Field(
+        (), description='resources (e.g. paths) written by the action')
+
+    @property
+    def is_barrier(self) -> bool:
+        """Operations without declared resources are applied after all
+        previous operations and before all later operations."""
+        return (self.group is None and not self.reads and not self.writes)
+
     def __call__(self) -> Operation:
         """Execute the action with the args and kwargs.
 
@@ -121,6 +148,72 @@ class Operation(LongDescription):
         return v
 
 
+class LaneProgress:
+
+    def __init__(self, ops: Sequence[Operation], max_shown: int = 3):
+        """Keep track of the status of every lane (group of operations)
+        while the operations are applied.
+
+        Parameters
+        ----------
+        ops : Sequence[Operation]
+            Operations to apply, operations without a group are
+            counted as a single lane.
+        max_shown : int, optional
+            Maximum number of running lanes to list by name.
+        """
+        self.max_shown = max_shown
+        self.remaining: dict[Hashable, int] = {}
+        self.running: dict[Hashable, int] = {}
+        self.failed: set[Hashable] = set()
+
+        for op in ops:
+            if op.action:
+                self.remaining[op.group] = self.remaining.get(op.group, 0) + 1
+
+    def start(self, op: Operation) -> None:
+        self.running[op.group] = self.running.get(op.group, 0) + 1
+
+    def _stop(self, op: Operation) -> None:
+        self.running[op.group] -= 1
+        if not self.running[op.group]:
+            del self.running[op.group]
+
+    def finish(self, op: Operation) -> None:
+        self._stop(op)
+        self.remaining[op.group] -= 1
+
+    def fail(self, op: Operation) -> None:
+        self._stop(op)
+        self.failed.add(op.group)
+
+    def counts(self) -> dict[str, int]:
+        """Return the number of lanes for every status."""
+        n_done = sum(not n for lane, n in self.remaining.items()
+                     if lane not in self.failed)
+        n_running = sum(lane not in self.failed for lane in self.running)
+        n_failed = len(self.failed)
+        n_waiting = len(self.remaining) - n_done - n_running - n_failed
+        return {
+            'lanes': len(self.remaining),
+            'running': n_running,
+            'waiting': n_waiting,
+            'done': n_done,
+            'failed': n_failed,
+        }
+
+    def description(self) -> str:
+        """Return a description of the lanes that are running."""
+        lanes = [str(lane) for lane in self.running if lane is not None]
+        if not lanes:
+            return ''
+
+        shown = ', '.join(lanes[:self.max_shown])
+        if len(lanes) > self.max_shown:
+            shown += f' (+{len(lanes) - self.max_shown})'
+        return f'Running: {shown}'
+
+
 class Operations(deque):
     """Operations Queue which keeps track of all the operations that need to be
     done.
@@ -130,6 +223,10 @@ class Operations(deque):
     communication between queue items is possible through references, or
     global values, but not really recommended, and no guidance for this
     is provided
+
+    Operations can declare the resources they read and write (and the
+    group they belong to), so that independent operations can be applied
+    concurrently (see `apply_graph`).
     """
 
     _instance = None
@@ -137,6 +234,7 @@ class Operations(deque):
     enabled = False  # Actually do something
     dry_run = False  # Never apply any operations (do not even ask)
     warnings: set[Warning] = set()
+    _group: Optional[Hashable] = None
 
     def __new__(cls, *args, **kwargs):
         # Make it a singleton
@@ -159,8 +257,29 @@ class Operations(deque):
         description="Function that prints hello world")
         ```
         """
+        kwargs.setdefault('group', self._group)
         self.append(Operation(**kwargs))
 
+    @contextmanager
+    def group(self, key: Hashable):
+        """Context manager to put the operations added within into a group.
+
+        Groups are independent chains of operations, that may be applied
+        in parallel (see `apply_all`).
+
+        ```python
+        for run in runs:
+            with op_queue.group(run.dirname):
+                create_run(run)
+        ```
+        """
+        prev_group = self._group
+        self._group = key
+        try:
+            yield
+        finally:
+            self._group = prev_group
+
     def add_no_op(self,
                   description: str,
                   extra_description: str | None = None):
@@ -202,38 +321,111 @@ class Operations(deque):
         op()
         return op
 
-    def _apply_all(self, callback: Optional[Callable] = None) -> None:
-        """Pop and apply all operations in the queue."""
+    def _apply_all(self,
+                   callback: Optional[Callable] = None,
+                   jobs: int = 1,
+                   pool: str = 'process',
+                   on_error: Optional[Callable] = None,
+                   on_start: Optional[Callable] = None,
+                   submit: Optional[Callable[[int], Future]] = None) -> None:
+        """Pop and apply all operations in the queue.
+
+        With `jobs > 1`, the operations are applied concurrently as a
+        graph, see `apply_graph`. `submit` is passed to `apply_graph`, it
+        must belong to a pool started for the operations in the queue.
+        """
+        if jobs > 1:
+            ops = list(self)
+            self.clear()
+            apply_graph(ops,
+                        jobs=jobs,
+                        pool=pool,
+                        callback=callback,
+                        on_error=on_error,
+                        on_start=on_start,
+                        submit=submit)
+            return
+
         while self:
-            op = self.apply()
+            op = self[0]
+            if on_start and op.action:
+                on_start(op)
+            self.apply()
             if callback:
                 callback(op)
 
-    def apply_all(self) -> None:
+    def apply_all(self, jobs: int = 1, pool: str = 'process') -> None:
         """Apply all queued operations and empty the queue.
 
         and show a fancy progress bar while applying
+
+        Parameters
+        ----------
+        jobs : int, optional
+            Number of workers to apply independent operations with.
+        pool : str, optional
+            Type of worker pool, `process` or `thread`.
         """
         from tqdm import tqdm
         loginfo(style('Applying Operations', **HEADER_STYLE))  # type: ignore
 
-        with tqdm(total=self.n_actions, position=1) as pbar:
-            pbar.set_description('Progress')
+        lanes = LaneProgress(self)
 
-            with tqdm(bar_format='{desc}') as dbar:
+        with ExitStack() as stack:
+            submit = None
+            if jobs > 1:
+                # Start the pool before the progress bars start their
+                # threads, see `worker_pool`
+                submit = stack.enter_context(
+                    worker_pool(list(self), jobs=jobs, pool=pool))
 
-                def callback(op):
-                    if not op.action:
-                        return
-                    if not op.quiet:
-                        dbar.set_description(op.long_description)
-                    pbar.update()
-
-                self._apply_all(callback=callback)
+            pbar = stack.enter_context(tqdm(total=self.n_actions, position=1))
+            pbar.set_description('Progress')
 
-    def confirm_apply_all(self) -> bool:
+            dbar = stack.enter_context(tqdm(bar_format='{desc}'))
+
+            def refresh(op):
+                if jobs > 1:
+                    pbar.set_postfix(lanes.counts())
+                    dbar.set_description(lanes.description())
+                elif not op.quiet:
+                    dbar.set_description(op.long_description)
+
+            def on_start(op):
+                lanes.start(op)
+                refresh(op)
+
+            def callback(op):
+                if not op.action:
+                    return
+                lanes.finish(op)
+                pbar.update()
+                refresh(op)
+
+            def on_error(op, err):
+                lanes.fail(op)
+                refresh(op)
+                logwarning(
+                    style(f'Failed: {op.long_description} ({err})',
+                          **NO_OP_STYLE))
+
+            self._apply_all(callback=callback,
+                            jobs=jobs,
+                            pool=pool,
+                            on_error=on_error,
+                            on_start=on_start,
+                            submit=submit)
+
+    def confirm_apply_all(self, jobs: int = 1, pool: str = 'process') -> bool:
         """First asks the user if he wants to apply everything.
 
+        Parameters
+        ----------
+        jobs : int, optional
+            Number of workers to apply independent operations with.
+        pool : str, optional
+            Type of worker pool, `process` or `thread`.
+
         Returns
         -------
         bool: did we apply everything or not
@@ -269,7 +461,7 @@ class Operations(deque):
             default=False)
 
         if is_confirmed:
-            self.apply_all()
+            self.apply_all(jobs=jobs, pool=pool)
 
         return is_confirmed
 
@@ -284,6 +476,225 @@ class Operations(deque):
 
 op_queue = Operations()
 
+# Operations to apply, inherited by the forked worker processes
+_OPS: list[Operation] = []
+
+
+def _apply_op(index: int) -> None:
+    _OPS[index]()
+
+
+@contextmanager
+def worker_pool(ops: Sequence[Operation],
+                jobs: int = 1,
+                pool: str = 'process') -> Iterator[Callable[[int], Future]]:
+    """Start a pool of workers to apply operations with.
+
+    The actions are in general not picklable (e.g. those added via
+    `add_to_op_queue`), so with `pool='process'` the workers are forked
+    and look up their operation by index. The workers are forked right
+    away, so that the pool can be started before any other threads
+    (e.g. for the progress bars), forking a process with running
+    threads may deadlock the workers.
+
+    Parameters
+    ----------
+    ops : Sequence[Operation]
+        Operations to apply.
+    jobs : int, optional
+        Number of workers.
+    pool : str, optional
+        Type of worker pool, `process` or `thread`.
+
+    Yields
+    ------
+    Callable[[int], Future]
+        Submit the operation with this index to the pool.
+    """
+    global _OPS
+
+    if pool == 'process':
+        _OPS = list(ops)
+        executor = ProcessPoolExecutor(
+            max_workers=jobs, mp_context=multiprocessing.get_context('fork'))
+        submit = partial(executor.submit, _apply_op)
+        # All workers are forked on the first submission
+        executor.submit(os.getpid).result()
+    elif pool == 'thread':
+        executor = ThreadPoolExecutor(max_workers=jobs)
+        submit = lambda i: executor.submit(ops[i])  # noqa: E731
+    else:
+        raise ValueError(f'Unknown pool: {pool!r}')
+
+    try:
+        with executor:
+            yield submit
+    finally:
+        _OPS = []
+
+
+def _resources(op: Operation) -> tuple[set, set]:
+    reads = set(op.reads)
+    writes = set(op.writes)
+    if op.group is not None:
+        writes.add(('group', op.group))
+    return reads, writes
+
+
+def dependencies(ops: Sequence[Operation]) -> list[set[int]]:
+    """Return the indices of the operations that every operation depends on.
+
+    An operation depends on earlier operations that write a resource
+    it reads or writes, and on earlier operations that read a resource it
+    writes. Operations in the same group write a shared resource, so they
+    are applied in order. Operations that do not declare any resources
+    (see `Operation.is_barrier`) depend on all earlier operations,
+    and all later operations depend on them.
+    """
+    deps: list[set[int]] = []
+
+    last_write: dict[Hashable, int] = {}
+    readers: dict[Hashable, list[int]] = {}
+    barrier: Optional[int] = None
+    since_barrier: list[int] = []
+
+    for i, op in enumerate(ops):
+        if op.action is None:
+            deps.append(set())
+            continue
+
+        if op.is_barrier:
+            deps.append(set(since_barrier))
+            if barrier is not None:
+                deps[i].add(barrier)
+
+            barrier = i
+            since_barrier = []
+            last_write.clear()
+            readers.clear()
+            continue
+
+        reads, writes = _resources(op)
+        dep = set() if barrier is None else {barrier}
+
+        for resource in reads | writes:
+            if resource in last_write:
+                dep.add(last_write[resource])
+
+        for resource in writes:
+            dep.update(readers.get(resource, ()))
+
+        for resource in reads:
+            readers.setdefault(resource, []).append(i)
+
+        for resource in writes:
+            last_write[resource] = i
+            readers[resource] = []
+
+        deps.append(dep)
+        since_barrier.append(i)
+
+    return deps
+
+
+def apply_graph(ops: Sequence[Operation],
+                jobs: int = 1,
+                pool: str = 'process',
+                callback: Optional[Callable] = None,
+                on_error: Optional[Callable] = None,
+                on_start: Optional[Callable] = None,
+                submit: Optional[Callable[[int], Future]] = None) -> None:
+    """Apply operations concurrently, respecting their dependencies.
+
+    If an operation fails, the operations that depend on it are cancelled.
+    All independent operations are still applied.
+
+    Parameters
+    ----------
+    ops : Sequence[Operation]
+        Operations to apply.
+    jobs : int, optional
+        Maximum number of operations to apply at the same time.
+    pool : str, optional
+        Type of worker pool, `process` or `thread`.
+    callback : Optional[Callable], optional
+        Called with every operation that has been applied.
+    on_error : Optional[Callable], optional
+        Called with every operation that failed and the exception.
+    on_start : Optional[Callable], optional
+        Called with every operation that is started.
+    submit : Optional[Callable[[int], Future]], optional
+        Submit function of a running pool for `ops` (see `worker_pool`),
+        a new pool is started if not given.
+
+    Raises
+    ------
+    Exception
+        The first exception raised by any of the operations.
+    """
+    deps = dependencies(ops)
+
+    dependents: list[list[int]] = [[] for _ in ops]
+    for i, dep in enumerate(deps):
+        for j in dep:
+            dependents[j].append(i)
+
+    n_deps = [len(dep) for dep in deps]
+    ready = deque(i for i, n in enumerate(n_deps) if n == 0)
+    errors: dict[int, Exception] = {}
+    n_done = 0
+
+    running: dict[Future, int] = {}
+
+    def finish(i: int) -> None:
+        nonlocal n_done
+        n_done += 1
+        if callback:
+            callback(ops[i])
+        for j in dependents[i]:
+            n_deps[j] -= 1
+            if n_deps[j] == 0:
+                ready.append(j)
+
+    with ExitStack() as stack:
+        if submit is None:
+            submit = stack.enter_context(worker_pool(ops, jobs=jobs,
+                                                     pool=pool))
+
+        while ready or running:
+            while ready and len(running) < jobs:
+                i = ready.popleft()
+                if ops[i].action is None:
+                    finish(i)
+                else:
+                    if on_start:
+                        on_start(ops[i])
+                    running[submit(i)] = i
+
+            if not running:
+                continue
+
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+
+            for future in done:
+                i = running.pop(future)
+
+                try:
+                    future.result()
+                except Exception as err:
+                    # Dependents never become ready, so they are cancelled
+                    errors[i] = err
+                    if on_error:
+                        on_error(ops[i], err)
+                else:
+                    finish(i)
+
+    if errors:
+        n_cancelled = len(ops) - n_done - len(errors)
+        logger.error('%d operations failed, %d operations were cancelled',
+                     len(errors), n_cancelled)
+        raise next(iter(errors.values()))
+
 
 def confirm_operations(func):
     """Decorator which confirms and applies queued operations after the
@@ -319,7 +730,11 @@ def confirm_operations(func):
     return wrapper
 
 
-def add_to_op_queue(op_desc: str, extra_desc: str | None = None, quiet=False):
+def add_to_op_queue(op_desc: str,
+                    extra_desc: str | None = None,
+                    quiet=False,
+                    reads: Sequence[str] = (),
+                    writes: Sequence[str] = ()):
     """Decorator which adds the function call to the op_queue, instead of
     executing it directly, the string can be a format string and use the
     function arguments.
@@ -336,6 +751,10 @@ def add_to_op_queue(op_desc: str, extra_desc: str | None = None, quiet=False):
 
     op_queue.confirm_apply_all()
     ```
+
+    The resources that the function reads and writes can be declared in the
+    same way (e.g. `writes=('{target}', )`), so that independent
+    operations can be applied concurrently.
     """
 
     def op_queue_real(func):
@@ -351,13 +770,23 @@ def add_to_op_queue(op_desc: str, extra_desc: str | None = None, quiet=False):
                 extra_formatted = extra_desc.format(**fkwargs)
             op_formatted = op_desc.format(**fkwargs)
 
+            resources = {}
+            if reads or writes:
+                bound = sig.bind(*args, **kwargs)
+                bound.apply_defaults()
+                resources['reads'] = tuple(
+                    str(res).format(**bound.arguments) for res in reads)
+                resources['writes'] = tuple(
+                    str(res).format(**bound.arguments) for res in writes)
+
             # add the function to the queue
             op_queue.add(action=func,
                          args=args,
                          kwargs=kwargs,
                          description=op_formatted,
                          extra_description=extra_formatted,
-                         quiet=quiet)
+                         quiet=quiet,
+                         **resources)
 
         return wrapper
 
@@ -368,21 +797,31 @@ atexit.register(op_queue.check_unconfirmed_operations)
 
 
 @contextmanager
-def op_queue_context():
+def op_queue_context(jobs: int = 1, pool: str = 'process'):
     """Context manager to enable the op_queue, and confirm_operations on exit
     Also disables the op_queue on exit.
 
     Works more or less the same as the `@confirm_operations` decorator
+
+    Parameters
+    ----------
+    jobs : int, optional
+        Number of workers to apply independent operations with.
+    pool : str, optional
+        Type of worker pool, `process` or `thread`.
     """
     if op_queue.enabled:
         raise RuntimeError('op_queue already enabled')
+    yes = op_queue.yes
     try:
         op_queue.enabled = True
         yield
-        op_queue.confirm_apply_all()
+        op_queue.confirm_apply_all(jobs=jobs, pool=pool)
         op_queue.clear()
         op_queue.enabled = False
     except Exception:
         op_queue.clear()
         op_queue.enabled = False
         raise
+    finally:
+        op_queue.yes = yes
@@ -11,11 +11,13 @@ from ._dimensions import (
     OperationDim,
     OperatorMixin,
 )
-from ._ranges import ARange, LinSpace
+from ._ranges import ARange, ContinuousDim, Distribution, LinSpace
 
 __all__ = [
     'ARange',
     'BaseModel',
+    'ContinuousDim',
+    'Distribution',
     'RootModel',
     'IDSOperation',
     'OperatorMixin',
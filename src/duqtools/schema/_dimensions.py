@@ -1,8 +1,8 @@
 from __future__ import annotations
 
-import ast
-from functools import partial
-from typing import Any, Literal, Optional, Union
+from functools import lru_cache, partial
+from types import CodeType
+from typing import Any, Callable, Literal, Optional, Union
 
 import numpy as np
 from imas2xarray import Variable
@@ -11,7 +11,13 @@ from pydantic import Field, field_validator, model_validator
 from duqtools.utils import formatter as f
 
 from ._basemodel import BaseModel, RootModel
-from ._ranges import ARange, LinSpace
+from ._ranges import ARange, ContinuousDim, Distribution, LinSpace
+
+
+@lru_cache(maxsize=None)
+def _compile_custom_code(code: str) -> CodeType:
+    """Compile custom code to a code object, so it is parsed only once."""
+    return compile(code, '<custom_code>', 'eval')
 
 
 class OperatorMixin(BaseModel):
@@ -86,6 +92,24 @@ class OperatorMixin(BaseModel):
         The resulting data must be of the same shape.
             """))
 
+    custom_vectorize: bool = Field(False,
+                                   description=f("""
+        If True, evaluate the `custom_code` once for all matching time slices,
+        instead of once per time slice. The time slices are stacked into a
+        single array, so `data` has the time slices on the first axis.
+        Only applies if all time slices have the same shape, and the code must
+        work on the stacked array (i.e. element-wise operations).
+        """))
+
+    custom_backend: Literal['python', 'numexpr'] = Field('python',
+                                                         description=f("""
+        How to evaluate the `custom_code`. By default (`python`), the code is
+        evaluated as Python code. `numexpr` evaluates the expression with
+        [numexpr](https://github.com/pydata/numexpr), which is faster for
+        large arrays, but only supports simple element-wise expressions of
+        `data` and `value`. Requires `numexpr` to be installed.
+        """))
+
     _upper_suffix: str = '_error_upper'
     _lower_suffix: str = '_error_lower'
 
@@ -93,7 +117,7 @@ class OperatorMixin(BaseModel):
     @classmethod
     def check_ast(cls, custom_code):
         if custom_code:
-            ast.parse(custom_code)
+            _compile_custom_code(custom_code)
         return custom_code
 
     @model_validator(mode='before')
@@ -109,14 +133,29 @@ class OperatorMixin(BaseModel):
                          value,
                          *,
                          out: Optional[np.ndarray] = None,
-                         code: str,
-                         var: Any):
+                         var: Any = None):
         """Mimick np.ufunc for custom functions."""
-        if out is not None:
-            out[:] = eval(code)
+        assert self.custom_code
+
+        if self.custom_backend == 'numexpr':
+            import numexpr
+
+            result = numexpr.evaluate(self.custom_code,
+                                      local_dict={
+                                          'data': data,
+                                          'value': value
+                                      })
         else:
-            out = eval(code)
-        return out
+            result = eval(_compile_custom_code(self.custom_code), globals(), {
+                'data': data,
+                'value': value,
+                'var': var
+            })
+
+        if out is not None:
+            out[:] = result
+            return out
+        return result
 
     def npfunc(self,
                data: np.ndarray | float,
@@ -125,12 +164,9 @@ class OperatorMixin(BaseModel):
                out: Optional[np.ndarray] = None,
                var: Optional[Any] = None) -> Any:
         if self.operator == 'custom':
-            assert self.custom_code
-            npfunc = partial(self._custom_function,
-                             code=self.custom_code,
-                             var=var)
-        else:
-            npfunc = getattr(np, self.operator)
+            return self._custom_function(data, value, out=out, var=var)
+
+        npfunc = getattr(np, self.operator)
 
         # copyto is different, and does not like scalars
         if self.operator == 'copyto' and not isinstance(data, np.ndarray):
@@ -146,17 +182,30 @@ class OperatorMixin(BaseModel):
 
 
 class DimMixin(BaseModel):
-    values: Union[list[float], ARange, LinSpace] = Field(description=f("""
+    values: Union[list[float], ARange, LinSpace,
+                  Distribution] = Field(description=f("""
             Values to use with operator on field to create sampling
-            space."""))
+            space. Use a `distribution` to sample from a continuous
+            distribution instead."""))
 
     @field_validator('values')
     @classmethod
     def convert_to_list(cls, v):
-        if not isinstance(v, list):
+        if isinstance(v, (ARange, LinSpace)):
             v = v.values
         return v
 
+    def _expand(self, make_operation: Callable[..., Any]):
+        """Expand values into operations.
+
+        Continuous dimensions are expanded lazily, the operations
+        are created when the values are sampled.
+        """
+        if isinstance(self.values, Distribution):
+            return ContinuousDim(self.values, make_operation)
+
+        return tuple(make_operation(value=value) for value in self.values)
+
 
 class OperationDim(OperatorMixin, DimMixin, BaseModel):
     variable: str = Field(description=f("""
@@ -186,6 +235,9 @@ class CoupledDim(RootModel):
     @field_validator('root')
     @classmethod
     def check_dimensions_match(cls, dims):
+        if any(isinstance(dim.values, Distribution) for dim in dims):
+            raise ValueError('continuous dimensions cannot be coupled')
+
         if len(dims) > 0:
             refdim = len(dims[0].values)
             for dim in dims[1:]:
@@ -223,14 +275,14 @@ class IDSOperationDim(IDSPathMixin, OperatorMixin, DimMixin, BaseModel):
     the given values.
     """
 
-    def expand(self, *args, variable, **kwargs) -> tuple[IDSOperation, ...]:
+    def expand(self, *args, variable,
+               **kwargs) -> tuple[IDSOperation, ...] | ContinuousDim:
         """Expand list of values into operations with its components."""
-        return tuple(
-            IDSOperation(variable=variable,
-                         operator=self.operator,
-                         value=value,
-                         scale_to_error=self.scale_to_error)
-            for value in self.values)
+        return self._expand(
+            partial(IDSOperation,
+                    variable=variable,
+                    operator=self.operator,
+                    scale_to_error=self.scale_to_error))
 
 
 class Operation(OperatorMixin, BaseModel):
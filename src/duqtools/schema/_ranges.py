@@ -1,7 +1,9 @@
 from __future__ import annotations
 
+from typing import Any, Callable, Iterator, Literal, Optional
+
 import numpy as np
-from pydantic import Field
+from pydantic import Field, model_validator
 
 from ._basemodel import BaseModel
 
@@ -43,3 +45,98 @@ class ARange(BaseModel):
         return [
             val.item() for val in np.arange(self.start, self.stop, self.step)
         ]
+
+
+class Distribution(BaseModel):
+    """Sample values from a continuous distribution.
+
+    Instead of picking from a list of pre-defined values, every sample
+    gets its own value, drawn from the distribution. This requires one of
+    the (quasi-)random samplers (`latin-hypercube`, `sobol`, `halton`).
+    The samples from the unit hypercube are mapped onto the distribution
+    via [scipy.stats.qmc.scale][] (uniform, log-uniform), or the inverse
+    of the cumulative distribution function (normal).
+    """
+    distribution: Literal['uniform', 'normal', 'log-uniform'] = Field(
+        'uniform', description='Type of distribution to sample from.')
+    lower: Optional[float] = Field(
+        None, description='Lower bound (`uniform`, `log-uniform`).')
+    upper: Optional[float] = Field(
+        None, description='Upper bound (`uniform`, `log-uniform`).')
+    mean: Optional[float] = Field(None, description='Mean value (`normal`).')
+    std: Optional[float] = Field(None,
+                                 description='Standard deviation (`normal`).')
+
+    @model_validator(mode='after')
+    def check_parameters(self):
+        if self.distribution == 'normal':
+            if self.mean is None or self.std is None:
+                raise ValueError(
+                    '`mean` and `std` are required for a normal distribution')
+            if self.std <= 0:
+                raise ValueError('`std` must be larger than 0')
+        else:
+            if self.lower is None or self.upper is None:
+                raise ValueError(
+                    f'`lower` and `upper` are required for a {self.distribution} '
+                    'distribution')
+            if self.lower >= self.upper:
+                raise ValueError('`lower` must be smaller than `upper`')
+            if self.distribution == 'log-uniform' and self.lower <= 0:
+                raise ValueError('`lower` must be larger than 0 '
+                                 'for a log-uniform distribution')
+
+        return self
+
+    def from_unit(self, sample: np.ndarray) -> np.ndarray:
+        """Map samples from the unit interval onto the distribution.
+
+        Parameters
+        ----------
+        sample : np.ndarray
+            1D array with samples in [0, 1).
+
+        Returns
+        -------
+        np.ndarray
+            Sampled values.
+        """
+        from scipy.stats import norm, qmc
+
+        sample = np.asarray(sample).reshape(-1, 1)
+
+        if self.distribution == 'normal':
+            return norm.ppf(sample[:, 0], loc=self.mean, scale=self.std)
+
+        if self.distribution == 'log-uniform':
+            assert self.lower and self.upper
+            bounds = np.log(self.lower), np.log(self.upper)
+            return np.exp(qmc.scale(sample, *bounds)[:, 0])
+
+        return qmc.scale(sample, self.lower, self.upper)[:, 0]
+
+
+class ContinuousDim:
+
+    def __init__(self, distribution: Distribution,
+                 make_operation: Callable[..., Any]):
+        """Dimension sampled from a continuous distribution.
+
+        This is the expanded form of a dimension with a `Distribution`
+        as `values`. The operations are created lazily for every
+        sampled value, so that the cost scales with the number of samples.
+
+        Parameters
+        ----------
+        distribution : Distribution
+            Distribution to sample the values from.
+        make_operation : Callable[..., Any]
+            Create the operation for a sampled `value` (keyword argument).
+        """
+        self.distribution = distribution
+        self.make_operation = make_operation
+
+    def sample(self, sample: np.ndarray) -> Iterator[Any]:
+        """Yield operations for samples from the unit interval."""
+        for value in self.distribution.from_unit(sample):
+            yield self.make_operation(value=value.item())
@@ -1,16 +1,18 @@
 from __future__ import annotations
 
+import heapq
 import logging
-import subprocess as sp
+import re
 from collections import Counter
+from pathlib import Path
 from time import sleep
-from typing import Sequence
+from typing import Optional, Sequence
 
-from jetto_tools import config, template
+import click
 
 from .config import Config
-from .models import Job, JobStatus, Locations
-from .systems.jetto._system import jetto_lookup
+from .models import Job, JobStatus, Locations, StatusSnapshot
+from .systems.jetto._fields import RunInfo, get_run_info
 
 logger = logging.getLogger(__name__)
 info, debug = logger.info, logger.debug
@@ -18,11 +20,105 @@ stream = logging.StreamHandler()
 stream.setFormatter(logging.Formatter('%(message)s'))
 logger.addHandler(stream)
 
+STEP_PATTERN = re.compile(rb'^\s*STEP[^=\n]*=[^=\n]*=\s*([^\s=]+)',
+                          re.MULTILINE)
+
 
 class StatusError(Exception):
     ...
 
 
+class StepTimeReader:
+
+    def __init__(self, path: Path, block_size: int = 1 << 16):
+        """Read the time of the last `STEP` line from the modelling
+        output file, e.g. `jetto.out`.
+
+        The file is only read from the end: the first call searches
+        backwards from the end of the file, and later calls only read
+        the bytes that were appended since the previous call.
+
+        Parameters
+        ----------
+        path : Path
+            Path to the output file.
+        block_size : int, optional
+            Number of bytes to read at once when searching backwards.
+        """
+        self.path = path
+        self.block_size = block_size
+        self.offset: Optional[int] = None
+        self.tail = b''
+        self.steptime: Optional[float] = None
+
+    @staticmethod
+    def _parse(data: bytes) -> Optional[float]:
+        """Return time from the last STEP line in `data`."""
+        value = None
+        for match in STEP_PATTERN.finditer(data):
+            value = match.group(1)
+
+        if value is None:
+            return None
+
+        try:
+            return float(value)
+        except ValueError:
+            return None
+
+    def _read_backwards(self, f, size: int) -> Optional[float]:
+        """Search backwards from `size` for the last STEP line."""
+        end = size
+        carry = b''
+
+        while end > 0:
+            start = max(end - self.block_size, 0)
+            f.seek(start)
+            data = f.read(end - start) + carry
+            end = start
+
+            if start > 0:
+                # The first line continues in the preceding block
+                cut = data.find(b'\n') + 1
+                if cut:
+                    carry, data = data[:cut], data[cut:]
+                else:
+                    carry, data = data, b''
+
+            steptime = self._parse(data)
+            if steptime is not None:
+                return steptime
+
+        return None
+
+    def read(self) -> Optional[float]:
+        """Return the time of the last STEP line, or None if there is
+        none."""
+        try:
+            size = self.path.stat().st_size
+        except OSError:
+            return None
+
+        with open(self.path, 'rb') as f:
+            if self.offset is None or size < self.offset:
+                # First read, or the file was rewritten
+                self.steptime = self._read_backwards(f, size)
+                self.tail = b''
+            elif size > self.offset:
+                f.seek(self.offset)
+                data = self.tail + f.read(size - self.offset)
+                # Keep the incomplete last line for the next read
+                end = data.rfind(b'\n') + 1
+                self.tail = data[end:]
+
+                steptime = self._parse(data[:end])
+                if steptime is not None:
+                    self.steptime = steptime
+
+        self.offset = size
+        return self.steptime
+
+
 class Status():
 
     jobs: Sequence[Job]
@@ -35,17 +131,21 @@ class Status():
 
     def __init__(self, jobs=Sequence[Job]):
         self.jobs = jobs
+        self.snapshot = StatusSnapshot(jobs)
 
         debug('Case directories: %s', self.jobs)
 
         debug('Total number of jobs: %i', len(self.jobs))
 
     def update_status(self):
+        """Collect the status of all jobs, this lists each run directory
+        once and queries slurm once."""
+        states = self.snapshot.refresh().states.values()
 
-        self.n_submit_script = sum(job.has_submit_script for job in self.jobs)
-        self.n_status = sum(job.has_status for job in self.jobs)
+        self.n_submit_script = sum(state.has_submit_script for state in states)
+        self.n_status = sum(state.has_status for state in states)
 
-        counter = Counter(job.status() for job in self.jobs)
+        counter = Counter(state.status for state in states)
 
         self.n_submitted = counter[JobStatus.SUBMITTED]
         self.n_completed = counter[JobStatus.COMPLETED]
@@ -92,50 +192,124 @@ class Status():
             sleep(5)
             self.update_status()
 
-    def detailed_status(self):
-        from tqdm import tqdm
-        """detailed_status of all separate runs."""
-        monitors = []
-        for i, job in enumerate(self.jobs):
-            pbar = tqdm(total=100, position=i)
-            monitor = Monitor(pbar=pbar, job=job)
-            monitors.append(monitor)
-
-        while not all([monitor.finished for monitor in monitors]):
+    def detailed_status(self, n_slowest: int = 5, n_buckets: int = 10):
+        """Detailed status of all separate runs.
+
+        Shows a histogram of the progress of the running jobs, and the
+        slowest running jobs, so that the size of the view does not
+        depend on the number of jobs.
+
+        Parameters
+        ----------
+        n_slowest : int, optional
+            Number of slowest jobs to show.
+        n_buckets : int, optional
+            Number of bins for the progress histogram.
+        """
+        monitors = [Monitor(job=job) for job in self.jobs]
+
+        n_lines = 0
+
+        while True:
+            self.snapshot.refresh()
             for monitor in monitors:
-                monitor.update()
+                monitor.update(status=self.snapshot.status(monitor.job))
+
+            lines = render_detailed(monitors,
+                                    n_slowest=n_slowest,
+                                    n_buckets=n_buckets)
+
+            # Move the cursor up to redraw the previous view
+            click.echo('\033[F' * n_lines, nl=False)
+            click.echo('\n'.join(f'{line}\033[K' for line in lines))
+            n_lines = len(lines)
+
+            if all(monitor.finished for monitor in monitors):
+                break
+
             sleep(5)
 
 
+def render_detailed(monitors: Sequence[Monitor],
+                    *,
+                    n_slowest: int = 5,
+                    n_buckets: int = 10,
+                    width: int = 40) -> list[str]:
+    """Render aggregated progress of the jobs.
+
+    Parameters
+    ----------
+    monitors : Sequence[Monitor]
+        Monitors for all jobs.
+    n_slowest : int, optional
+        Number of slowest running jobs to show.
+    n_buckets : int, optional
+        Number of bins for the progress histogram.
+    width : int, optional
+        Width of the largest bar in the histogram.
+
+    Returns
+    -------
+    list[str]
+        Lines to show, the number of lines does not depend on
+        the number of jobs.
+    """
+    counter = Counter(monitor.status for monitor in monitors)
+    running = [
+        monitor for monitor in monitors if monitor.status == JobStatus.RUNNING
+    ]
+
+    histogram = [0] * n_buckets
+    for monitor in running:
+        histogram[min(monitor.progress * n_buckets // 100, n_buckets - 1)] += 1
+
+    lines = [
+        ', '.join(f'{status.value}: {counter[status]}'
+                  for status in JobStatus),
+        'Progress of running jobs:',
+    ]
+
+    scale = width / max(max(histogram), 1)
+    for i, count in enumerate(histogram):
+        low = 100 * i // n_buckets
+        high = 100 * (i + 1) // n_buckets
+        bar = '#' * round(count * scale)
+        lines.append(f'  {low:3d}-{high:3d}% | {bar} {count}')
+
+    lines.append(f'Slowest running jobs (of {len(running)}):')
+    slowest = heapq.nsmallest(n_slowest,
+                              running,
+                              key=lambda monitor: monitor.progress)
+    for monitor in slowest:
+        lines.append(f'  {monitor.job.path.name:20s} {monitor.progress:3d}%')
+    lines.extend([''] * (n_slowest - len(slowest)))
+
+    return lines
+
+
 class Monitor():
-    """Convenience class to keep track of submissions and update progress
-    bars."""
+    """Convenience class to keep track of the progress of a job."""
 
-    def __init__(self, pbar, job):
-        self.pbar = pbar
+    def __init__(self, job):
         self.job = job
-        self.outfile = None
+        self.status: str = JobStatus.NOSTATUS
+        self.progress = 0
+        self.finished = False
+        self.steptime_reader = StepTimeReader(job.out_file)
 
-        jetto_template = template.from_directory(job.path)
-        jetto_template.lookup.update(jetto_lookup)
-        jetto_config = config.RunConfig(jetto_template)
+        run_info = get_run_info(job.path)
 
-        self.check_kwmain_flag(jetto_config)
+        self.check_kwmain_flag(run_info)
 
         infile = job.in_file
         if not infile.exists():
             debug('%s does not exist, but the job is running', infile)
-            return
 
-        self.start = jetto_config.start_time
-        self.end = jetto_config.end_time
+        self.start = run_info.start_time
+        self.end = run_info.end_time
         self.time = self.start
 
-        self.finished = False
-
-        self.set_status()
-
-    def check_kwmain_flag(self, jetto_config):
+    def check_kwmain_flag(self, run_info: RunInfo):
         """Check for NLIST2/KWMAIN in jetto.jset. If this flag is not set, the
         output in `job.out_file` does not contain the output that is grepped
         for the progress.
@@ -144,36 +318,25 @@ class Monitor():
         https://github.com/duqtools/duqtools/issues/337
         """
         msg = ('Cannot show detailed status, `nlist2.KWMAIN` flag'
-               ' is not set to 1 in `{self.job.status_file}`')
-        if jetto_config['kwmain'] != 1:
+               f' is not set to 1 in `{self.job.path}`')
+        if run_info.kwmain != 1:
             raise StatusError(msg)
 
-    def set_status(self):
-        status = self.job.status()
-
-        self.pbar.set_description(f'{self.job.path.name:8s}, {status:12s}')
-        self.pbar.refresh()
-
-        return status
-
     def get_steptime(self):
         if not self.job.out_file.exists():
             debug(
                 f'{self.job.out_file} does not exists, but the job is running')
             return None
 
-        of = self.job.out_file
-        cmd = f'tac {of} | grep -m 1 ^\\s*STEP'
-        ret = sp.run(cmd, shell=True, capture_output=True)
-        if len(ret.stdout) > 0:
-            return float(ret.stdout.split('=')[2].lstrip(' ').split(' ')[0])
-        return None
+        return self.steptime_reader.read()
+
+    def update(self, status: Optional[str] = None):
+        if status is None:
+            status = self.job.status()
+        self.status = status
 
-    def update(self):
-        status = self.set_status()
         if status in (JobStatus.COMPLETED, JobStatus.FAILED):
-            self.pbar.n = 100 if status == JobStatus.COMPLETED else 0
-            self.pbar.refresh()
+            self.progress = 100 if status == JobStatus.COMPLETED else 0
             self.finished = True
             return
         if not status == JobStatus.RUNNING:
@@ -183,9 +346,10 @@ class Monitor():
         if steptime:
             self.time = steptime
 
-        self.pbar.n = int(100 * (self.time - self.start) /
-                          (self.end - self.start))
-        self.pbar.refresh()
+        if self.end > self.start:
+            progress = int(100 * (self.time - self.start) /
+                           (self.end - self.start))
+            self.progress = min(max(progress, 0), 100)
 
 
 def status(*,
@@ -1,22 +1,32 @@
 from __future__ import annotations
 
+import asyncio
+import csv
+import json
 import logging
+import threading
 import time
 from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from itertools import cycle
 from pathlib import Path
-from typing import Deque, Optional, Sequence
+from typing import Any, Deque, Iterable, Optional, Sequence
+
+import click
 
 from ._logging_utils import duqlog_screen
 from .config import Config
 from .create import CreateError
-from .models import Job, Locations
+from .models import Job, JobStatus, Locations
 from .operations import add_to_op_queue, op_queue
 from .systems import get_system
 
 logger = logging.getLogger(__name__)
 info, debug = logger.info, logger.debug
 
+JOURNAL = 'duqtools_schedule.jsonl'
+REPORT = 'duqtools_submit_report.csv'
+
 
 class SubmitError(Exception):
     ...
@@ -27,60 +37,368 @@ def Spinner(frames='⠋⠙⠹⠸⠼⠴⠦⠧⠇⠏'):
     yield from cycle(frames)
 
 
-@add_to_op_queue('Submitting', '{job}')
-def _submit_job(job: Job, *, delay: float = 0):
-    """
+class TokenBucket:
+
+    def __init__(self, rate: float, capacity: float = 1.0):
+        """Thread-safe token bucket to limit the rate of submissions.
+
+        Parameters
+        ----------
+        rate : float
+            Number of tokens added per second.
+        capacity : float, optional
+            Maximum number of tokens, i.e. the size of a burst.
+        """
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.last = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self) -> None:
+        """Wait until a token is available, and take it."""
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity,
+                                  self.tokens + (now - self.last) * self.rate)
+                self.last = now
+
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+
+                wait = (1 - self.tokens) / self.rate
+
+            time.sleep(wait)
+
+
+class SubmissionReport:
+
+    FIELDS = ('job', 'status', 'start', 'latency', 'error')
+
+    def __init__(self):
+        """Keeps track of the latency of every submission, and the
+        overall throughput."""
+        self.start = time.monotonic()
+        self.end = self.start
+        self.records: list[dict[str, Any]] = []
+        self.lock = threading.Lock()
+
+    def submit(self, job: Job) -> bool:
+        """Submit job and record the result.
+
+        Returns
+        -------
+        bool
+            True if the job was submitted successfully.
+        """
+        start = time.monotonic()
+        error = None
+
+        try:
+            job.submit()
+        except Exception as err:
+            duqlog_screen.error(f'Failed to submit {job}: {err}')
+            error = err
+
+        end = time.monotonic()
+
+        with self.lock:
+            self.end = max(self.end, end)
+            self.records.append({
+                'job': str(job.path),
+                'status': 'failed' if error else 'submitted',
+                'start': round(start - self.start, 4),
+                'latency': round(end - start, 4),
+                'error': '' if error is None else repr(error),
+            })
+
+        return error is None
+
+    @property
+    def n_failed(self) -> int:
+        return sum(record['status'] == 'failed' for record in self.records)
+
+    @property
+    def throughput(self) -> float:
+        """Number of submitted jobs per second."""
+        duration = self.end - self.start
+        n_submitted = len(self.records) - self.n_failed
+        return n_submitted / duration if duration > 0 else float('inf')
+
+    def summary(self) -> str:
+        latencies = [record['latency'] for record in self.records] or [0]
+        return (f'Submitted {len(self.records) - self.n_failed} jobs'
+                f' ({self.n_failed} failed) in {self.end - self.start:.1f} s,'
+                f' {self.throughput:.2f} jobs/s, latency'
+                f' mean: {sum(latencies) / len(latencies):.2f} s,'
+                f' max: {max(latencies):.2f} s')
+
+    def write_csv(self, path: Path | str = REPORT) -> None:
+        """Write the report for every job to a csv file."""
+        with open(path, 'w', newline='') as f:
+            writer = csv.DictWriter(f, fieldnames=self.FIELDS)
+            writer.writeheader()
+            writer.writerows(
+                sorted(self.records, key=lambda record: record['start']))
+
+
+def submit_jobs(jobs: Sequence[Job],
+                *,
+                rate: float = 10.0,
+                workers: int = 4) -> SubmissionReport:
+    """Submit jobs concurrently, limited to `rate` jobs per second.
+
     Parameters
     ----------
-    delay : float
-        Add a delay to avoid all jobs starting at the same time.
-        This causes issues with slurm, for example.
+    jobs : Sequence[Job]
+        Jobs to submit.
+    rate : float, optional
+        Maximum number of submissions per second.
+    workers : int, optional
+        Maximum number of concurrent submissions.
+
+    Returns
+    -------
+    SubmissionReport
     """
-    if delay:
-        time.sleep(delay)
-    job.submit()
+    bucket = TokenBucket(rate)
+    report = SubmissionReport()
+
+    def submit(job: Job) -> bool:
+        bucket.acquire()
+        click.echo(f'Submitting {job}\033[K')
+        return report.submit(job)
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        list(pool.map(submit, jobs))
+
+    return report
+
+
+@add_to_op_queue('Submit jobs', 'write report to {report}')
+def _submit_jobs(jobs: Sequence[Job], *, report: str):
+    system = jobs[0].cfg.system
+
+    submission_report = submit_jobs(jobs,
+                                    rate=system.submit_rate,
+                                    workers=system.submit_workers)
+    submission_report.write_csv(report)
+
+    info(submission_report.summary())
+
+    if submission_report.n_failed:
+        raise SubmitError(f'{submission_report.n_failed} jobs failed to '
+                          f'submit, see {report}')
 
 
 def job_submitter(jobs: Sequence[Job], *, max_jobs: int, **kwargs):
-    for n, job in enumerate(jobs):
-        if max_jobs and (n >= max_jobs):
-            info(f'Max jobs ({max_jobs}) reached.')
-            break
+    """Submit jobs, at most `system.submit_rate` per second, and
+    `system.submit_workers` at the same time.
 
-        _submit_job(job, delay=0.1)
+    A report with the latency for every job is written to
+    `duqtools_submit_report.csv`.
+    """
+    if max_jobs and len(jobs) > max_jobs:
+        info(f'Max jobs ({max_jobs}) reached.')
+        jobs = list(jobs)[:max_jobs]
 
+    if not jobs:
+        return
 
-@add_to_op_queue('Start job scheduler')
-def job_scheduler(queue: Deque[Job], *, max_jobs: int = 10, **kwargs):
-    interval = 1.0
+    for job in jobs:
+        op_queue.add(action=lambda: None,
+                     description='Submitting',
+                     extra_description=f'{job}')
+
+    _submit_jobs(jobs, report=REPORT)
+
+
+class ScheduleJournal:
+
+    QUEUED = 'queued'
+    RUNNING = 'running'
+    DONE = 'done'
+
+    def __init__(self, path: Path | str = JOURNAL):
+        """Append-only journal with the state of the scheduled jobs.
+
+        Every state change is written as a line of json, so that an
+        interrupted scheduler can be resumed from the last known state.
+
+        Parameters
+        ----------
+        path : Path | str, optional
+            Location of the journal.
+        """
+        self.path = Path(path)
 
+    def reset(self, jobs: Iterable[Job]) -> None:
+        """Start a new journal with all jobs queued."""
+        self.path.write_text('')
+        for job in jobs:
+            self.record(job, self.QUEUED)
+
+    def record(self, job: Job, state: str) -> None:
+        """Record new state for job."""
+        with open(self.path, 'a') as f:
+            f.write(json.dumps({'job': str(job.path), 'state': state}) + '\n')
+
+    def load(self) -> dict[Path, str]:
+        """Return the last recorded state for every job."""
+        states: dict[Path, str] = {}
+
+        if not self.path.exists():
+            return states
+
+        with open(self.path) as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    # Incomplete line from interrupted write
+                    continue
+                states[Path(entry['job'])] = entry['state']
+
+        return states
+
+
+def _is_active(status: str) -> bool:
+    return status in (JobStatus.RUNNING, JobStatus.NOSTATUS)
+
+
+async def _schedule(queue: Deque[Job],
+                    *,
+                    running: Iterable[Job] = (),
+                    max_jobs: int = 10,
+                    journal: ScheduleJournal,
+                    min_interval: float = 1.0,
+                    max_interval: float = 30.0):
+    """Submit jobs from the queue, keeping `max_jobs` running at once.
+
+    The status of all running jobs is checked concurrently every tick.
+    Free slots are refilled immediately when a job finishes. When
+    nothing changes, the interval between checks grows up to
+    `max_interval`.
+    """
     s = Spinner()
 
-    tasks: Deque[Job] = deque()
-    completed: Deque[Job] = deque()
+    active: list[Job] = list(running)
+    n_completed = 0
+    interval = min_interval
 
-    while tasks or queue:
-        while queue and len(tasks) < max_jobs:
+    while active or queue:
+        while queue and len(active) < max_jobs:
             job = queue.popleft()
-            task = job.start()
-            tasks.append(task)
+            click.echo(f'Submitting {job}\033[K')
+            await asyncio.to_thread(job.submit)
+            journal.record(job, journal.RUNNING)
+            active.append(job)
             # starting jobs at the same time causes issues
-            time.sleep(0.1)
+            await asyncio.sleep(0.1)
 
-        time.sleep(interval)
-        task = tasks.popleft()
-        try:
-            next(task)  # Run to the next yield
-            tasks.append(task)  # Reschedule
-        except StopIteration:
-            completed.append(task)
+        statuses = await asyncio.gather(*(asyncio.to_thread(job.status)
+                                          for job in active))
+
+        finished = [
+            job for job, status in zip(active, statuses)
+            if not _is_active(status)
+        ]
+
+        for job in finished:
+            active.remove(job)
+            journal.record(job, journal.DONE)
+
+        n_completed += len(finished)
 
         print(
-            f' {next(s)} Running: {len(tasks)},'
-            f' queue: {len(queue)}, completed: {len(completed)}',
+            f' {next(s)} Running: {len(active)},'
+            f' queue: {len(queue)}, completed: {n_completed}',
             end='\033[K\r',
         )
 
+        if finished:
+            interval = min_interval
+            if queue:
+                # Refill the free slots right away
+                continue
+
+        if active:
+            await asyncio.sleep(interval)
+            interval = min(interval * 1.5, max_interval)
+
+
+@add_to_op_queue('Start job scheduler')
+def job_scheduler(queue: Deque[Job],
+                  *,
+                  max_jobs: int = 10,
+                  running: Sequence[Job] = (),
+                  journal: Optional[ScheduleJournal] = None,
+                  **kwargs):
+    """Submit jobs from the queue, and keep `max_jobs` jobs running until
+    the queue is empty.
+
+    Parameters
+    ----------
+    queue : Deque[Job]
+        Jobs to submit.
+    max_jobs : int, optional
+        Maximum number of jobs running at once.
+    running : Sequence[Job], optional
+        Jobs that are already running, i.e. when resuming.
+    journal : ScheduleJournal, optional
+        Journal to record the state of the jobs in, a new journal is
+        started in the current directory if not given.
+    """
+    if journal is None:
+        journal = ScheduleJournal()
+        journal.reset(queue)
+
+    asyncio.run(
+        _schedule(queue, running=running, max_jobs=max_jobs, journal=journal))
+
+
+def resume_scheduler(*, cfg: Config, max_jobs: int = 10) -> Deque[Job]:
+    """Resume scheduler from the journal.
+
+    Jobs that were running are monitored again, and the jobs that were
+    still queued are submitted.
+
+    Parameters
+    ----------
+    cfg : Config
+        Duqtools config.
+    max_jobs : int, optional
+        Maximum number of jobs running at once.
+
+    Returns
+    -------
+    Deque[Job]
+        Queued jobs
+    """
+    journal = ScheduleJournal()
+    states = journal.load()
+
+    if not states:
+        raise SubmitError(f'Cannot resume, no journal found: {journal.path}')
+
+    queue: Deque[Job] = deque()
+    running: list[Job] = []
+
+    for path, state in states.items():
+        if state == journal.QUEUED:
+            queue.append(Job(path, cfg=cfg))
+        elif state == journal.RUNNING:
+            running.append(Job(path, cfg=cfg))
+
+    info('Resuming scheduler, running: %d, queue: %d', len(running),
+         len(queue))
+
+    job_scheduler(queue, max_jobs=max_jobs, running=running, journal=journal)
+
+    return queue
+
 
 def job_array_submitter(
     jobs: Sequence[Job],
@@ -189,6 +507,7 @@ def submit(*,
            resubmit: Sequence[Path] = (),
            status_filter: Sequence[str] = (),
            parent_dir: Optional[Path] = None,
+           resume: bool = False,
            **kwargs):
     """Submit jobs to the cluster.
 
@@ -217,7 +536,11 @@ def submit(*,
         Only submit jobs with this status.
     parent_dir : Path
         Search for jobs in this directory.
+    resume : bool
+        Resume an interrupted scheduler (`schedule=True`) from its journal.
     """
+    if schedule and resume:
+        return resume_scheduler(cfg=cfg, max_jobs=max_jobs)
 
     locations = Locations(parent_dir=parent_dir, cfg=cfg)
 
@@ -2,9 +2,12 @@ from __future__ import annotations
 
 import logging
 from abc import ABC, abstractmethod
-from typing import TYPE_CHECKING, Sequence
+from typing import TYPE_CHECKING, Optional, Sequence
+
+from duqtools.operations import add_to_op_queue
 
 if TYPE_CHECKING:
+    from contextlib import AbstractContextManager
     from pathlib import Path
 
     from duqtools.api import ImasHandle, Job
@@ -54,6 +57,33 @@ class AbstractSystem(ABC):
         pass
 
     @abstractmethod
+    def session(
+        self,
+        run: Path,
+        template_drc: Optional[Path] = None,
+    ) -> AbstractContextManager:
+        """Context manager to batch changes to the configuration of a run.
+
+        The configuration is loaded when entering the context, and written
+        to the run directory once on (succesful) exit. Sessions are
+        re-entrant, so nested sessions for the same run share the
+        configuration.
+
+        Parameters
+        ----------
+        run : Path
+            Run directory
+        template_drc : Optional[Path]
+            If given, create the run from this template directory,
+            instead of loading the configuration from the run directory.
+        """
+        pass
+
+    @add_to_op_queue('Copying template to',
+                     '{target_drc}',
+                     quiet=True,
+                     reads=('{source_drc}', ),
+                     writes=('{target_drc}', ))
     def copy_from_template(self, source_drc: Path, target_drc: Path):
         """Copy from template directory `source_drc` to target directory
         `target_drc`
@@ -65,7 +95,8 @@ class AbstractSystem(ABC):
         target_drc : Path
             Target directory
         """
-        pass
+        with self.session(target_drc, template_drc=source_drc):
+            pass
 
     @abstractmethod
     def imas_from_path(self, template_drc: Path) -> ImasHandle:
@@ -83,6 +114,31 @@ class AbstractSystem(ABC):
         pass
 
     @abstractmethod
+    def set_imas_locations(
+        self,
+        run: Path,
+        inp: ImasBaseModel,
+        out: ImasBaseModel,
+    ):
+        """Set the imas entries for the run, both input imas file `in` and
+        output imas file `out`. Applied directly, use this within a
+        `session`.
+
+        Parameters
+        ----------
+        run : Path
+            Run directory
+        inp : ImasBaseModel
+            Imas entry to use as input
+        out : ImasBaseModel
+            Imas entry to use as output
+        """
+        pass
+
+    @add_to_op_queue('Updating imas locations of',
+                     '{run}',
+                     quiet=True,
+                     writes=('{run}', ))
     def update_imas_locations(
         self,
         run: Path,
@@ -102,7 +158,8 @@ class AbstractSystem(ABC):
         out : ImasBaseModel
             Imas entry to use as output
         """
-        pass
+        with self.session(run):
+            self.set_imas_locations(run, inp=inp, out=out)
 
     @abstractmethod
     def get_data_in_handle(
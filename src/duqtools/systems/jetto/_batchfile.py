@@ -68,27 +68,66 @@ cd {run_dir}
     llcmd_path.chmod(llcmd_path.stat().st_mode | stat.S_IXUSR)
 
 
-def write_array_batchfile(jobs: Sequence[Job], max_jobs: int,
-                          max_array_size: int):
-    """Write array batchfile to start jetto runs.
+ARRAY_SCRIPT = 'duqtools_slurm_array.sh'
+
+
+def _sbatch_options(job: Job) -> str:
+    """Return the `#SBATCH` options from the submit script of the job,
+    except for the options that are set per array."""
+    with open(job.submit_script) as lines:
+        sbatch_lines = (line for line in lines if line.startswith('#SBATCH'))
+        option_lines = (line for line in sbatch_lines
+                        if line.split()[1] not in ('-o', '-e', '-J'))
+        return ''.join(option_lines)
+
+
+def group_array_jobs(jobs: Sequence[Job]) -> list[tuple[str, list[Job]]]:
+    """Group jobs with the same slurm options (e.g. number of processors,
+    wall time) into separate arrays, because all tasks in an array get
+    the same resources.
 
     Parameters
     ----------
     jobs : Sequence[Job]
         List of jobs to run.
+
+    Returns
+    -------
+    list[tuple[str, list[Job]]]
+        Name of the array batchfile and the jobs for every array.
+    """
+    groups: dict[str, list[Job]] = {}
+    for job in jobs:
+        groups.setdefault(_sbatch_options(job), []).append(job)
+
+    return [(ARRAY_SCRIPT if i == 0 else f'duqtools_slurm_array_{i}.sh', group)
+            for i, group in enumerate(groups.values())]
+
+
+def write_array_batchfile(jobs: Sequence[Job],
+                          max_jobs: int,
+                          max_array_size: int,
+                          filename: str = ARRAY_SCRIPT):
+    """Write array batchfile to start jetto runs.
+
+    Parameters
+    ----------
+    jobs : Sequence[Job]
+        List of jobs to run, these must have the same slurm options
+        (see `group_array_jobs`).
     max_jobs : int
         Maximum number of jobs to run at the same time.
+    max_array_size : int
+        Maximum number of tasks in the array.
+    filename : str, optional
+        Name of the batchfile.
     """
     common_dir = Path(commonpath(job.path for job in jobs))  # type: ignore
     logs_dir = common_dir / 'logs'
     logs_dir.mkdir(exist_ok=True)
 
     # Get the first jobs submission script as a template
-    lines = open(jobs[0].submit_script)
-    sbatch_lines = (line for line in lines if line.startswith('#SBATCH'))
-    option_lines = (line for line in sbatch_lines
-                    if line.split()[1] not in ('-o', '-e', '-J'))
-    options = ''.join(option_lines)
+    options = _sbatch_options(jobs[0])
 
     # Append our own options, later options have precedence
     out_file = logs_dir / 'duqtools-%A_%a.out'
@@ -118,5 +157,5 @@ done
 
 """
 
-    with open('duqtools_slurm_array.sh', 'w') as f:
+    with open(filename, 'w') as f:
         f.write(string)
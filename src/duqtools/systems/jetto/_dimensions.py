@@ -1,10 +1,11 @@
 from __future__ import annotations
 
+from functools import partial
 from typing import Union
 
 from pydantic import Field
 
-from duqtools.schema import BaseModel, DimMixin, OperatorMixin
+from duqtools.schema import BaseModel, ContinuousDim, DimMixin, OperatorMixin
 from duqtools.utils import formatter as f
 
 from ._models import JettoVariableModel
@@ -22,11 +23,11 @@ class JettoOperation(JettoPathMixin, OperatorMixin, BaseModel):
 
 class JettoOperationDim(JettoPathMixin, OperatorMixin, DimMixin, BaseModel):
 
-    def expand(self, *args, variable, **kwargs) -> tuple[JettoOperation, ...]:
+    def expand(self, *args, variable,
+               **kwargs) -> tuple[JettoOperation, ...] | ContinuousDim:
         """Expand list of values into operations with its components."""
-        return tuple(
-            JettoOperation(variable=variable,
-                           operator=self.operator,
-                           value=value,
-                           scale_to_error=self.scale_to_error)
-            for value in self.values)
+        return self._expand(
+            partial(JettoOperation,
+                    variable=variable,
+                    operator=self.operator,
+                    scale_to_error=self.scale_to_error))
@@ -0,0 +1,147 @@
+"""Read single fields from jetto run directories.
+
+Parsing a full template with `jetto_tools` (jset, namelists, lookup and
+validation) is slow, and not needed to look up a handful of values,
+for example to monitor the progress of many runs.
+"""
+from __future__ import annotations
+
+import re
+from functools import lru_cache
+from pathlib import Path
+from typing import Iterable, NamedTuple, Optional
+
+from jetto_tools.template import TemplateError
+
+EXTRA_NAMELIST_PREFIX = 'OutputExtraNamelist.selItems.cell['
+
+
+class RunInfo(NamedTuple):
+    start_time: float
+    end_time: float
+    kwmain: Optional[int]
+
+
+def read_jset_fields(path: Path,
+                     keys: Iterable[str],
+                     prefix: Optional[str] = None) -> dict[str, str]:
+    """Read fields from a jset file.
+
+    Parameters
+    ----------
+    path : Path
+        Path to jset file.
+    keys : Iterable[str]
+        Names of the fields to read.
+    prefix : str, optional
+        Also read all fields starting with this prefix.
+
+    Returns
+    -------
+    dict[str, str]
+        Raw (string) values of the fields that were found.
+    """
+    keys = set(keys)
+    fields = {}
+
+    with open(path) as f:
+        for line in f:
+            key, sep, value = line.partition(':')
+            if not sep:
+                continue
+            key = key.strip()
+            if key in keys or (prefix and key.startswith(prefix)):
+                fields[key] = value.strip()
+
+    return fields
+
+
+def read_namelist_field(path: Path, namelist: str,
+                        field: str) -> Optional[str]:
+    """Read the (first) value of a field in a namelist file, e.g.
+    `jetto.in`.
+
+    Parameters
+    ----------
+    path : Path
+        Path to namelist file.
+    namelist : str
+        Name of the namelist, e.g. `NLIST2`.
+    field : str
+        Name of the field, e.g. `KWMAIN`.
+
+    Returns
+    -------
+    Optional[str]
+        Raw value, or None if the field cannot be found.
+    """
+    pattern = re.compile(rf'^\s*{field}\s*=\s*([^,\s]+)', re.IGNORECASE)
+    start = f'&{namelist}'.upper()
+
+    in_namelist = False
+
+    with open(path) as f:
+        for line in f:
+            stripped = line.strip().upper()
+            if stripped == start:
+                in_namelist = True
+            elif in_namelist and stripped.startswith('&END'):
+                break
+            elif in_namelist and (match := pattern.match(line)):
+                return match.group(1)
+
+    return None
+
+
+def _extra_namelist_field(fields: dict[str, str], field: str) -> Optional[str]:
+    """Find the value of `field` in the extra namelist items of the jset."""
+    for key, value in fields.items():
+        if key.endswith('][0]') and value.upper() == field:
+            return fields.get(key[:-len('[0]')] + '[2]')
+    return None
+
+
+@lru_cache(maxsize=4096)
+def _run_info(run_dir: Path, stamp: tuple[int, ...]) -> RunInfo:
+    fields = read_jset_fields(run_dir / 'jetto.jset',
+                              ('SetUpPanel.startTime', 'SetUpPanel.endTime'),
+                              prefix=EXTRA_NAMELIST_PREFIX)
+
+    kwmain = _extra_namelist_field(fields, 'KWMAIN')
+    if kwmain is None:
+        kwmain = read_namelist_field(run_dir / 'jetto.in', 'NLIST2', 'KWMAIN')
+
+    try:
+        return RunInfo(start_time=float(fields['SetUpPanel.startTime']),
+                       end_time=float(fields['SetUpPanel.endTime']),
+                       kwmain=None if kwmain is None else int(kwmain))
+    except (KeyError, ValueError) as err:
+        raise TemplateError(
+            f'Cannot read run times from {run_dir}: {err!r}') from err
+
+
+def get_run_info(run_dir: Path) -> RunInfo:
+    """Return start time, end time, and the `NLIST2.KWMAIN` flag for a
+    jetto run.
+
+    Results are cached for each run, and invalidated when `jetto.jset`
+    or `jetto.in` change.
+
+    Parameters
+    ----------
+    run_dir : Path
+        Jetto run directory.
+
+    Returns
+    -------
+    RunInfo
+    """
+    stamp = []
+    for name in ('jetto.jset', 'jetto.in'):
+        try:
+            stat = (run_dir / name).stat()
+        except OSError as err:
+            raise TemplateError(f'Cannot read {name} in {run_dir}') from err
+        stamp.extend((stat.st_mtime_ns, stat.st_size))
+
+    return _run_info(run_dir, tuple(stamp))
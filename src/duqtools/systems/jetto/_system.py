@@ -1,12 +1,14 @@
 from __future__ import annotations
 
+import copy
 import logging
 import os
-import shutil
 import stat
 import subprocess as sp
 import sys
 from collections.abc import Sequence
+from contextlib import contextmanager
+from functools import lru_cache
 from pathlib import Path
 from typing import TYPE_CHECKING, Any, List, Optional
 
@@ -14,10 +16,12 @@ from jetto_tools import config, jset, lookup, namelist, template
 from jetto_tools import job as jetto_job
 from jetto_tools.template import _EXTRA_FILE_REGEXES
 
+from duqtools.ids._copy import copy_file
 from duqtools.operations import add_to_op_queue
 
 from ..base_system import AbstractSystem
 from ..jintrac import V220922Mixin
+from ._batchfile import group_array_jobs as _group_array_jobs
 from ._batchfile import write_array_batchfile as _write_array_batchfile
 from ._batchfile import write_batchfile as _write_batchfile
 from ._jettovar_to_json import jettovar_to_json
@@ -66,6 +70,12 @@ def _get_jetto_extra(filenames: List[str], *, jset):
     return { file: file for file in jetto_extra }
 
 
+@lru_cache(maxsize=8)
+def _parse_lookup(text: str) -> dict:
+    """Parse lookup, runs of the same ensemble share the same lookup."""
+    return lookup.from_json(text)
+
+
 class BaseJettoSystem(AbstractSystem):
     """System that can be used to create runs for jetto.
 
@@ -74,6 +84,11 @@ class BaseJettoSystem(AbstractSystem):
     """
     options: JettoSystemModel
 
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._sessions: dict[Path, config.RunConfig] = {}
+        self._templates: dict[Path, template.Template] = {}
+
     @property
     def jruns_path(self) -> Path:
         """Return the Path specified in the system>jruns config variable, or,
@@ -116,7 +131,10 @@ class BaseJettoSystem(AbstractSystem):
 
         return path / dirname
 
-    @add_to_op_queue('Writing new batchfile', '{run_dir.name}', quiet=True)
+    @add_to_op_queue('Writing new batchfile',
+                     '{run_dir.name}',
+                     quiet=True,
+                     writes=('{run_dir}', ))
     def write_batchfile(self, run_dir: Path):
         jetto_jset = jset.read(run_dir / 'jetto.jset')
         _write_batchfile(run_dir,
@@ -144,21 +162,35 @@ class BaseJettoSystem(AbstractSystem):
         submit(job)
 
     def submit_slurm(self, job: Job):
-        jetto_template = template.from_directory(job.path)
-        jetto_config = config.RunConfig(jetto_template)
+        jetto_config = config.RunConfig(self._load_run_template(job.path))
         jetto_manager = jetto_job.JobManager()
 
         logger.info(f'submitting script via slurm')
         rundir = job.path / "rundir"
         rundir = os.path.relpath(rundir, self.jruns_path)
-        jetto_manager.submit_job_to_batch(config = jetto_config, rundir = rundir, run = True, exist_ok = True)
+        [jetto_run] = jetto_manager.submit_job_to_batch(config=jetto_config,
+                                                        rundir=rundir,
+                                                        run=False,
+                                                        exist_ok=True)
 
-        with open(job.lockfile, 'w') as f:
-            f.write("submitted")
+        # Submit ourselves to get the job id for the lockfile,
+        # so that the status can be queried from slurm
+        cmd = [
+            *self.options.submit_command.split(), '--parsable',
+            str(Path(jetto_run.rundir) / '.llcmd')
+        ]
+
+        ret = sp.run(cmd,
+                     check=True,
+                     capture_output=True,
+                     cwd=os.environ.get('RUNS_HOME'))
+        logger.info('submission returned: ' + str(ret.stdout))
+
+        with open(job.lockfile, 'wb') as f:
+            f.write(ret.stdout)
 
     def submit_docker(self, job: Job):
-        jetto_template = template.from_directory(job.path)
-        jetto_config = config.RunConfig(jetto_template)
+        jetto_config = config.RunConfig(self._load_run_template(job.path))
         jetto_manager = jetto_job.JobManager()
         extra_volumes = {
             job.path.parent / 'imasdb': {
@@ -178,9 +210,6 @@ class BaseJettoSystem(AbstractSystem):
             f.write(container.name)
 
     def submit_prominence(self, job: Job):
-        jetto_template = template.from_directory(job.path)
-        config.RunConfig(jetto_template)
-        jetto_job.JobManager()
         jetto_jset = jset.read(job.path / 'jetto.jset')
 
         # Jetto tools decided to be weird, so we use jams/prom-submit.py
@@ -218,7 +247,7 @@ class BaseJettoSystem(AbstractSystem):
                 ' not implemented')
 
     @add_to_op_queue('Create array job',
-                     'Submit using `sbatch duqtools_slurm_array.sh`')
+                     'Submit each `duqtools_slurm_array*.sh` using `sbatch`')
     def create_array_slurm(
         self,
         jobs: Sequence[Job],
@@ -226,10 +255,14 @@ class BaseJettoSystem(AbstractSystem):
         max_array_size: int,
         **kwargs,
     ):
-        logger.info('writing duqtools_slurm_array.sh file')
-        _write_array_batchfile(jobs, max_jobs, max_array_size)
-
-    @add_to_op_queue('Submit array job', 'duqtools_slurm_array.sh')
+        for filename, group in _group_array_jobs(jobs):
+            logger.info(f'writing {filename} file')
+            _write_array_batchfile(group,
+                                   max_jobs,
+                                   max_array_size,
+                                   filename=filename)
+
+    @add_to_op_queue('Submit array job', 'duqtools_slurm_array*.sh')
     def submit_array_slurm(
         self,
         jobs: Sequence[Job],
@@ -239,16 +272,18 @@ class BaseJettoSystem(AbstractSystem):
             job.lockfile.touch()
 
         submit_cmd = self.options.submit_command.split()
-        cmd: list[Any] = [*submit_cmd, 'duqtools_slurm_array.sh']
 
-        logger.info(f'Submitting script via: {cmd}')
+        for filename, group in _group_array_jobs(jobs):
+            cmd: list[Any] = [*submit_cmd, filename]
 
-        ret = sp.run(cmd, check=True, capture_output=True)
-        logger.info('submission returned: ' + str(ret.stdout))
+            logger.info(f'Submitting script via: {cmd}')
 
-        for job in jobs:
-            with open(job.lockfile, 'wb') as f:
-                f.write(ret.stdout)
+            ret = sp.run(cmd, check=True, capture_output=True)
+            logger.info('submission returned: ' + str(ret.stdout))
+
+            for job in group:
+                with open(job.lockfile, 'wb') as f:
+                    f.write(ret.stdout)
 
     def _apply_patches_to_template(self, jetto_template: template.Template):
         """Apply settings that are necessary for duqtools to function."""
@@ -256,9 +291,8 @@ class BaseJettoSystem(AbstractSystem):
         # https://github.com/duqtools/duqtools/issues/343
         jetto_template.jset._settings['JobProcessingPanel.selIdsRunid'] = True
 
-    @add_to_op_queue('Copying template to', '{target_drc}', quiet=True)
-    def copy_from_template(self, source_drc: Path, target_drc: Path):
-
+    def _parse_template(self, source_drc: Path) -> template.Template:
+        """Parse template from directory, with duqtools patches applied."""
         jetto_jset = jset.read(source_drc / 'jetto.jset')
         jetto_namelist = namelist.read(source_drc / 'jetto.in')
 
@@ -274,16 +308,112 @@ class BaseJettoSystem(AbstractSystem):
 
         jetto_template = template.Template(jset=jetto_jset,
                                            namelist=jetto_namelist,
-                                           lookup=jetto_lookup,
+                                           lookup=dict(jetto_lookup),
                                            sanco_namelist=jetto_sanco,
                                            extra_files=jetto_extra)
 
         self._apply_patches_to_template(jetto_template)
 
-        jetto_config = config.RunConfig(jetto_template)
+        return jetto_template
+
+    @staticmethod
+    def _load_run_template(run_dir: Path) -> template.Template:
+        """Load the template of a run directory for submission.
+
+        Equivalent to `template.from_directory`, but only the `imasdb`
+        subdirectory is searched for extra files, not the output of
+        earlier runs. The lookup is only parsed once for all runs that
+        share the same `lookup.json`. It was validated against the run
+        config when the run was created.
+        """
+        run_dir = Path(run_dir)
+
+        files = [Path(name) for name in os.listdir(run_dir)]
+        if (run_dir / 'imasdb').is_dir():
+            imasdb_files = (run_dir / 'imasdb').rglob('*')
+            files.extend(path.relative_to(run_dir) for path in imasdb_files)
+
+        extra_files = {}
+        for file in files:
+            if any(regex.match(str(file)) for regex in _EXTRA_FILE_REGEXES):
+                if (run_dir / file).is_file():
+                    extra_files[file] = run_dir / file
+
+        sanco_file = run_dir / 'jetto.sin'
+
+        jetto_template = template._from_files(
+            run_dir / 'jetto.jset',
+            run_dir / 'jetto.in',
+            sanco_namelist_path=sanco_file if sanco_file.is_file() else None,
+            extra_files=extra_files)
+
+        lookup_file = run_dir / 'lookup.json'
+        if lookup_file.is_file():
+            jetto_template._lookup = dict(
+                _parse_lookup(lookup_file.read_text()))
+
+        return jetto_template
+
+    def _get_template(self, source_drc: Path) -> template.Template:
+        """Return the parsed template for `source_drc`.
+
+        The template directory is parsed only once, the result is
+        shared and must not be modified. Use `_load_template` to get a
+        copy for a run.
+        """
+        key = Path(source_drc).resolve()
+
+        if key not in self._templates:
+            self._templates[key] = self._parse_template(key)
+
+        return self._templates[key]
+
+    def _load_template(self, source_drc: Path) -> template.Template:
+        """Load template from directory, with duqtools patches applied.
+
+        Returns a shallow clone of the cached template. `RunConfig` does
+        not modify the jset and namelists (they are copied on export),
+        so these are shared between clones. Only the lookup, which is
+        extended with custom variables, and the paths of the extra files
+        (see `_copy_extra_files`) are copied.
+        """
+        jetto_template = copy.copy(self._get_template(source_drc))
+        jetto_template._lookup = dict(jetto_template._lookup)
+        jetto_template._files = dict(jetto_template._files)
+        return jetto_template
+
+    @staticmethod
+    def _copy_extra_files(jetto_config: config.RunConfig, target_drc: Path):
+        """Copy the extra template files into `target_drc`.
+
+        The files are reflinked where the file system supports it, so
+        that the data are only copied when they are modified (see
+        `copy_file`). The run config is pointed to the copies, because
+        `RunConfig.export` skips files that are the same as the source,
+        instead of copying them again byte by byte.
+        """
+        jetto_template = jetto_config._template
+
+        for drc, files in (
+            (target_drc, jetto_config._files),
+            (target_drc / '_template', jetto_template.extra_files),
+        ):
+            for rel_path, src in files.items():
+                src = Path(src)
+                if not src.is_file():
+                    continue
+                dst = drc / rel_path
+                dst.parent.mkdir(parents=True, exist_ok=True)
+                copy_file(src, dst, method='reflink')
+                files[rel_path] = dst
+
+    def _export_from_template(self, jetto_config: config.RunConfig,
+                              source_drc: Path, target_drc: Path):
+        """Export run config created from template in `source_drc`."""
+        self._copy_extra_files(jetto_config, target_drc)
 
         jetto_config.export(target_drc)
-        lookup.to_file(jetto_lookup, target_drc /
+        lookup.to_file(jetto_config._template.lookup, target_drc /
                        'lookup.json')  # TODO, this should be copied as well
 
         for filename in (
@@ -292,13 +422,63 @@ class BaseJettoSystem(AbstractSystem):
         ):
             src = source_drc / filename
             dst = target_drc / filename
-            shutil.copyfile(src, dst)
+            copy_file(src, dst, method='reflink')
             dst.chmod(dst.stat().st_mode | stat.S_IXUSR)
 
+    @staticmethod
+    def _add_lookup(jetto_config: config.RunConfig, variable: JettoVar):
+        """Add the lookup for a (custom) variable to the run config."""
+        extra_lookup = lookup.from_json(jettovar_to_json(variable))
+        jetto_template = jetto_config._template
+        jetto_template._lookup.update(extra_lookup)
+
+        for name, param in extra_lookup.items():
+            if name not in jetto_config._parameters:
+                jetto_config._parameters[
+                    name] = config.RunConfig._initial_template_value(
+                        param, jetto_template.jset)
+
+    @contextmanager
+    def session(self, run: Path, template_drc: Optional[Path] = None):
+        """Load the jetto config of a run once, and export it once on exit.
+
+        All changes (variables, imas locations) made within the session are
+        applied to the same `RunConfig`. If `template_drc` is given, the run
+        is created from the template.
+
+        Yields
+        ------
+        config.RunConfig
+            Jetto run config
+        """
+        run = Path(run)
+
+        if run in self._sessions:
+            yield self._sessions[run]
+            return
+
+        if template_drc:
+            jetto_template = self._load_template(template_drc)
+        else:
+            jetto_template = template.from_directory(run)
+
+        jetto_config = config.RunConfig(jetto_template)
+
+        self._sessions[run] = jetto_config
+        try:
+            yield jetto_config
+        finally:
+            del self._sessions[run]
+
+        if template_drc:
+            self._export_from_template(jetto_config, template_drc, run)
+        else:
+            jetto_config.export(run)  # Just overwrite the poor files
+
     def imas_from_path(self, template_drc: Path) -> ImasHandle:
         from duqtools.api import ImasHandle
 
-        jetto_jset = jset.read(template_drc / 'jetto.jset')
+        jetto_jset = self._get_template(template_drc).jset
 
         return ImasHandle(
             db=jetto_jset['SetUpPanel.idsIMASDBMachine'],  # type: ignore
@@ -306,29 +486,30 @@ class BaseJettoSystem(AbstractSystem):
             run=jetto_jset['SetUpPanel.idsIMASDBRunid'],  # type: ignore
             shot=jetto_jset['SetUpPanel.idsIMASDBShot'])  # type: ignore
 
-    @add_to_op_queue('Updating imas locations of', '{run}', quiet=True)
-    def update_imas_locations(
+    def set_imas_locations(
         self,
         run: Path,
         inp: ImasHandle,
         out: ImasHandle,
-        **kwargs,
     ):
-        jetto_template = template.from_directory(run)
-        jetto_config = config.RunConfig(jetto_template)
+        with self.session(run) as jetto_config:
+            jetto_config['user_in'] = inp.user
+            jetto_config['machine_in'] = inp.db
+            jetto_config['shot_in'] = inp.shot
+            jetto_config['run_in'] = inp.run
 
-        jetto_config['user_in'] = inp.user
-        jetto_config['machine_in'] = inp.db
-        jetto_config['shot_in'] = inp.shot
-        jetto_config['run_in'] = inp.run
+            jetto_config['machine_out'] = out.db
+            jetto_config['shot_out'] = out.shot
+            #jetto_config['run_out'] = out.run
 
-        jetto_config['machine_out'] = out.db
-        jetto_config['shot_out'] = out.shot
-        #jetto_config['run_out'] = out.run
+    def get_variable(self, run: Path, key: str, variable: JettoVariableModel):
+        run = Path(run)
 
-        jetto_config.export(run)  # Just overwrite the poor files
+        if run in self._sessions:
+            jetto_config = self._sessions[run]
+            self._add_lookup(jetto_config, variable.lookup)
+            return jetto_config[key]
 
-    def get_variable(self, run: Path, key: str, variable: JettoVariableModel):
         jetto_template = template.from_directory(run)
         extra_lookup = lookup.from_json(jettovar_to_json(variable.lookup))
         jetto_template._lookup.update(extra_lookup)
@@ -343,32 +524,26 @@ class BaseJettoSystem(AbstractSystem):
                            operation: Optional[JettoOperation] = None,
                            input_var: Optional[SimpleNamespace] = None,
                            **kwargs):
-        jetto_template = template.from_directory(run)
-
-        if variable:
-            extra_lookup = lookup.from_json(jettovar_to_json(variable))
-            jetto_template._lookup.update(extra_lookup)
-
-        jetto_config = config.RunConfig(jetto_template)
-
-        special_keys = (
-            't_start',
-            't_end',
-        )
-
-        # Do operation if present
-        if key not in special_keys and operation is not None:
-            data = jetto_config[key]
-            value = operation.npfunc(data, value, var=input_var)
-
-        if key == 't_start':
-            jetto_config.start_time = value
-        elif key == 't_end':
-            jetto_config.end_time = value
-        else:
-            jetto_config[key] = value
-
-        jetto_config.export(run)  # Just overwrite the poor files
+        with self.session(run) as jetto_config:
+            if variable:
+                self._add_lookup(jetto_config, variable)
+
+            special_keys = (
+                't_start',
+                't_end',
+            )
+
+            # Do operation if present
+            if key not in special_keys and operation is not None:
+                data = jetto_config[key]
+                value = operation.npfunc(data, value, var=input_var)
+
+            if key == 't_start':
+                jetto_config.start_time = value
+            elif key == 't_end':
+                jetto_config.end_time = value
+            else:
+                jetto_config[key] = value
 
 
 class JettoSystemV220922(V220922Mixin, BaseJettoSystem):
@@ -18,6 +18,18 @@ class SubmitConfigModel(BaseModel):
         '.llcmd', description='Script for each run that needs to be submitted')
     submit_command: str = Field('sbatch',
                                 description='Submission command for slurm.')
+    submit_rate: float = Field(10.0,
+                               gt=0,
+                               description=f("""
+            Maximum number of jobs to submit per second. Submitting
+            too many jobs at the same time causes issues with slurm,
+            for example.
+            """))
+    submit_workers: int = Field(4,
+                                ge=1,
+                                description=f("""
+            Number of jobs to submit concurrently.
+            """))
 
 
 class StatusConfigModel(BaseModel):
@@ -2,11 +2,10 @@ from __future__ import annotations
 
 import os
 import shutil
+from contextlib import contextmanager
 from pathlib import Path
 from typing import TYPE_CHECKING, Optional
 
-from duqtools.operations import add_to_op_queue
-
 from ..base_system import AbstractSystem
 from ._schema import NoSystemModel
 
@@ -47,11 +46,13 @@ class NoSystem(AbstractSystem):
     def write_batchfile(*args, **kwargs):
         pass
 
-    @add_to_op_queue('Copying template to', '{target_drc}', quiet=True)
-    def copy_from_template(self, source_drc: Path, target_drc: Path):
-        shutil.copytree(source_drc, target_drc, dirs_exist_ok=True)
+    @contextmanager
+    def session(self, run: Path, template_drc: Optional[Path] = None):
+        if template_drc:
+            shutil.copytree(template_drc, run, dirs_exist_ok=True)
+        yield
 
-    def update_imas_locations(*args, **kwargs):
+    def set_imas_locations(*args, **kwargs):
         pass
 
     def submit_job(*args, **kwargs):
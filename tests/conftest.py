@@ -15,3 +15,17 @@ def pytest_configure():
 
     os.environ['JETTO_LOOKUP'] = str(pytest.TEST_DATA / 'jetto_lookup.json')
     os.environ['JINTRAC_IMAS_BACKEND'] = 'MDSPLUS'
+
+
+@pytest.fixture(autouse=True)
+def variable_cache(tmp_path, monkeypatch):
+    """Keep the variable cache out of the user's cache directory."""
+    from duqtools.ids._cache import variable_cache
+
+    monkeypatch.setenv('DUQTOOLS_CACHE_DIR', str(tmp_path / 'cache'))
+    monkeypatch.delenv('DUQTOOLS_CACHE', raising=False)
+    monkeypatch.setattr(variable_cache, 'cache_dir', tmp_path / 'cache')
+    monkeypatch.setattr(variable_cache, 'enabled', False)
+    monkeypatch.setattr(variable_cache, '_size', None)
+
+    yield variable_cache
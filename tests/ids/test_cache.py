@@ -0,0 +1,96 @@
+from __future__ import annotations
+
+import os
+
+import numpy as np
+import pytest
+import xarray as xr
+from imas2xarray import Variable
+
+from duqtools.ids import HDF5ImasHandle
+from duqtools.ids._cache import VariableCache
+
+
+@pytest.fixture
+def handle(tmp_path):
+    handle = HDF5ImasHandle(user=str(tmp_path / 'imasdb'),
+                            db='jet',
+                            shot=1,
+                            run=1)
+    handle.path().mkdir(parents=True)
+    (handle.path() / 'core_profiles.h5').write_bytes(b'data')
+    return handle
+
+
+def gen_dataset(n=100):
+    return xr.Dataset(data_vars={'t_e': (('time', ), np.arange(float(n)))},
+                      coords={'time': np.arange(float(n))})
+
+
+VARIABLES = [
+    Variable(name='t_e', ids='core_profiles', path='t_e', dims=['time'])
+]
+
+
+def test_cache_roundtrip(tmp_path, handle):
+    cache = VariableCache(cache_dir=tmp_path / 'cache', enabled=True)
+
+    key = cache.key(handle, 'core_profiles', VARIABLES)
+    assert cache.load(key) is None
+
+    ds = gen_dataset()
+    cache.save(key, ds)
+    xr.testing.assert_identical(cache.load(key), ds)
+
+    assert cache.key(handle, 'core_profiles', VARIABLES, squash=False) != key
+
+    # Data changed, invalidates the key
+    (handle.path() / 'core_profiles.h5').write_bytes(b'new data')
+    assert cache.key(handle, 'core_profiles', VARIABLES) != key
+
+
+def test_cache_eviction(tmp_path, handle):
+    cache = VariableCache(cache_dir=tmp_path / 'cache', enabled=True)
+
+    for i in range(3):
+        cache.save(f'key{i}', gen_dataset())
+        os.utime(cache._path(f'key{i}'), (i, i))
+
+    entry_size = cache.size() // 3
+    cache.load('key0')  # mark as recently used
+
+    cache.max_size = 2 * entry_size
+    cache.evict()
+
+    assert cache.load('key1') is None
+    assert cache.load('key0') is not None
+    assert cache.load('key2') is not None
+
+
+def test_cache_no_data(tmp_path):
+    handle = HDF5ImasHandle(user=str(tmp_path), db='jet', shot=1, run=1)
+    assert VariableCache.key(handle, 'core_profiles', VARIABLES) is None
+
+
+def test_cache_disabled_by_default(monkeypatch):
+    monkeypatch.delenv('DUQTOOLS_CACHE', raising=False)
+    assert not VariableCache().enabled
+
+    monkeypatch.setenv('DUQTOOLS_CACHE', '1')
+    assert VariableCache().enabled
+
+
+def test_cache_size_tracking(tmp_path):
+    cache = VariableCache(cache_dir=tmp_path / 'cache', enabled=True)
+
+    cache.save('key0', gen_dataset())
+    entry_size = cache.size()
+
+    cache.max_size = int(2.5 * entry_size)
+    cache.save('key1', gen_dataset())
+    cache.save('key0', gen_dataset())  # overwrite, same size
+    assert cache.size() == 2 * entry_size
+
+    cache.save('key2', gen_dataset())
+    assert cache.size() == 2 * entry_size
+    assert len(cache._entries()) == 2
@@ -0,0 +1,170 @@
+from __future__ import annotations
+
+import pytest
+
+from duqtools.ids import HDF5ImasHandle
+from duqtools.ids._copy import _verify_copy, copy_file, copy_ids_data
+
+
+@pytest.fixture
+def source(tmp_path):
+    handle = HDF5ImasHandle(user=str(tmp_path / 'imasdb'),
+                            db='jet',
+                            shot=1,
+                            run=1)
+    handle.path().mkdir(parents=True)
+    (handle.path() / 'core_profiles.h5').write_bytes(b'core_profiles' * 100)
+    (handle.path() / 'master.h5').write_bytes(b'master')
+    return handle
+
+
+@pytest.mark.parametrize('method', ('file', 'reflink', 'hardlink'))
+def test_copy_ids_data(source, method):
+    target = source.model_copy(update={'run': 2})
+
+    copy_ids_data(source, target, method=method)
+
+    assert sorted(path.name for path in target.paths()) == [
+        'core_profiles.h5',
+        'master.h5',
+    ]
+
+    for src_file in source.paths():
+        dst_file = target.path() / src_file.name
+        assert dst_file.read_bytes() == src_file.read_bytes()
+
+
+def test_copy_file_overwrite(tmp_path):
+    src = tmp_path / 'src.h5'
+    dst = tmp_path / 'dst.h5'
+
+    src.write_bytes(b'new data')
+    dst.write_bytes(b'old data that is longer')
+
+    copy_file(src, dst)
+
+    assert dst.read_bytes() == b'new data'
+
+
+def test_copy_file_invalid_method(tmp_path):
+    src = tmp_path / 'src.h5'
+    src.write_bytes(b'data')
+
+    with pytest.raises(ValueError):
+        copy_file(src, tmp_path / 'dst.h5', method='imas')
+
+
+def test_copy_ids_data_missing(source, tmp_path):
+    missing = source.model_copy(update={'run': 3})
+    target = source.model_copy(update={'run': 4})
+
+    with pytest.raises(KeyError):
+        copy_ids_data(missing, target)
+
+
+def test_copy_ids_data_overlay(source):
+    target = source.model_copy(update={'run': 2})
+    (source.path() / 'equilibrium.h5').write_bytes(b'equilibrium')
+
+    copy_ids_data(source, target, method='overlay', ids=('core_profiles', ))
+
+    assert not (target.path() / 'core_profiles.h5').is_symlink()
+    assert not (target.path() / 'master.h5').is_symlink()
+
+    equilibrium = target.path() / 'equilibrium.h5'
+    assert equilibrium.is_symlink()
+    assert equilibrium.read_bytes() == b'equilibrium'
+
+    target.materialize(ids=('equilibrium', ))
+
+    assert not equilibrium.is_symlink()
+    assert equilibrium.read_bytes() == b'equilibrium'
+    assert (source.path() / 'equilibrium.h5').read_bytes() == b'equilibrium'
+
+
+def test_copy_ids_data_overlay_twice(source):
+    target = source.model_copy(update={'run': 2})
+    (source.path() / 'equilibrium.h5').write_bytes(b'equilibrium')
+
+    def read_source():
+        return {path.name: path.read_bytes() for path in source.paths()}
+
+    expected = read_source()
+
+    copy_ids_data(source, target, method='overlay', ids=('core_profiles', ))
+    (target.path() / 'core_profiles.h5').write_bytes(b'modified')
+
+    copy_ids_data(source, target, method='overlay', ids=('equilibrium', ))
+    (target.path() / 'equilibrium.h5').write_bytes(b'modified')
+
+    assert (target.path() / 'core_profiles.h5').is_symlink()
+    assert not (target.path() / 'equilibrium.h5').is_symlink()
+
+    assert read_source() == expected
+
+
+def test_copy_ids_data_hardlink_materialize(source):
+    target = source.model_copy(update={'run': 2})
+
+    copy_ids_data(source, target, method='hardlink')
+
+    core_profiles = target.path() / 'core_profiles.h5'
+    assert core_profiles.stat().st_nlink == 2
+
+    target.materialize(ids=('core_profiles', ))
+
+    for path in target.paths():
+        assert path.stat().st_nlink == 1
+
+    core_profiles.write_bytes(b'modified')
+    assert (source.path() / 'core_profiles.h5').read_bytes() != b'modified'
+
+
+def test_verify_copy_content(tmp_path):
+    src = tmp_path / 'src.h5'
+    dst = tmp_path / 'dst.h5'
+
+    data = bytearray(b'x' * (1 << 20))
+    src.write_bytes(data)
+    data[-10] = ord('y')
+    dst.write_bytes(data)
+
+    with pytest.raises(OSError):
+        _verify_copy(src, dst)
+
+
+@pytest.mark.parametrize('link', ('hardlink', 'symlink'))
+@pytest.mark.parametrize('method', ('file', 'reflink', 'hardlink'))
+def test_copy_file_over_link(tmp_path, link, method):
+    src = tmp_path / 'src.h5'
+    dst = tmp_path / 'dst.h5'
+
+    src.write_bytes(b'template data')
+
+    if link == 'hardlink':
+        dst.hardlink_to(src)
+    else:
+        dst.symlink_to(src)
+
+    new = tmp_path / 'new.h5'
+    new.write_bytes(b'new data')
+
+    copy_file(new, dst, method=method)
+
+    assert not dst.is_symlink()
+    assert dst.read_bytes() == b'new data'
+    assert src.read_bytes() == b'template data'
+    assert not list(tmp_path.glob('.*.tmp'))
+
+
+def test_verify_copy_same_file(tmp_path):
+    src = tmp_path / 'src.h5'
+    dst = tmp_path / 'dst.h5'
+
+    src.write_bytes(b'data')
+    dst.hardlink_to(src)
+
+    _verify_copy(src, dst, method='hardlink')
+
+    with pytest.raises(OSError):
+        _verify_copy(src, dst, method='file')
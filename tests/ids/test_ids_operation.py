@@ -152,3 +152,122 @@ def test_apply_model(model, output):
     apply_model(model, ids_mapping=data)
 
     assert_equal(data[model.variable.path], output)
+
+
+def test_apply_operations_single_pass(tmp_path):
+    from contextlib import nullcontext
+    from types import SimpleNamespace
+
+    from duqtools.create import CreateManager
+    from duqtools.ids import HDF5ImasHandle
+
+    calls = {'get': 0, 'update': 0}
+    data = gen_sample_data()
+
+    class Handle(HDF5ImasHandle):
+
+        def get(self, ids='core_profiles', lazy=False):
+            calls['get'] += 1
+            return data
+
+        def update_from_mappings(self, mappings):
+            calls['update'] += 1
+            assert list(mappings) == [data]
+
+    handle = Handle(user=str(tmp_path), db='test', shot=1, run=1)
+    system = SimpleNamespace(session=lambda *args, **kwargs: nullcontext())
+    manager = SimpleNamespace(system=system, template_drc=None)
+
+    ops = [IDSOperation(**TEST_INPUT[0]), [IDSOperation(**TEST_INPUT[1])]]
+
+    CreateManager.apply_operations(manager, handle, tmp_path, ops)
+
+    assert calls == {'get': 1, 'update': 1}
+    assert_equal(data['data/0/x'], TEST_OUTPUT[0])
+    assert_equal(data['data/0/y'], TEST_OUTPUT[1])
+
+
+@pytest.mark.parametrize('model', TEST_INPUT[:11])
+def test_apply_ensemble(model):
+    from types import SimpleNamespace
+
+    from duqtools.ids._ensemble import apply_ensemble
+
+    values = (-2.0, 0.5, 3.0)
+    models = [IDSOperation(**(model | {'value': value})) for value in values]
+
+    source = SimpleNamespace(get=lambda ids, lazy=False: gen_sample_data())
+    ensemble = apply_ensemble(source, [[m] for m in models])
+
+    for m, ids_data in zip(models, ensemble):
+        expected = gen_sample_data()
+        apply_model(m, ids_mapping=expected)
+
+        path = m.variable.path
+        assert list(ids_data['test']) == [path]
+        assert_equal(ids_data['test'][path], expected[path])
+
+
+def gen_time_slices():
+
+    class Data:
+        data = [
+            type('t0', (), {'x': np.array((10., 20., 30.))}),
+            type('t1', (), {'x': np.array((1., 2., 3.))}),
+        ]
+        time = np.array((0, 1))
+
+    return IDSMapping(Data)
+
+
+@pytest.mark.parametrize('backend', ('python', 'numexpr'))
+def test_apply_custom_vectorized(backend):
+    if backend == 'numexpr':
+        pytest.importorskip('numexpr')
+
+    data = gen_time_slices()
+    model = IDSOperation(operator='custom',
+                         variable=get_test_var('data/*/x'),
+                         value=2.0,
+                         custom_code='data * value + 1',
+                         custom_vectorize=True,
+                         custom_backend=backend,
+                         linear_ramp=(1, 2))
+
+    apply_model(model, ids_mapping=data)
+
+    assert_equal(data['data/0/x'], (21, 61, 121))
+    assert_equal(data['data/1/x'], (3, 7, 13))
+
+
+@pytest.mark.parametrize('value,expected', (
+    (0.5, ((10.5, 21, 31.5), (1.05, 2.1, 3.15))),
+    (-1.0, ((8, 16, 24), (0.9, 1.8, 2.7))),
+))
+def test_apply_stacked_time_slices(value, expected):
+
+    class t0:
+        x = np.array((10., 20., 30.))
+        x_error_upper = np.array((1., 2., 3.))
+        x_error_lower = np.array((2., 4., 6.))
+
+    class t1:
+        x = np.array((1., 2., 3.))
+        x_error_upper = np.array((.1, .2, .3))
+
+    class Data:
+        data = [t0, t1]
+        time = np.array((0, 1))
+
+    data = IDSMapping(Data)
+
+    model = IDSOperation(operator='add',
+                         variable=get_test_var('data/*/x'),
+                         value=value,
+                         scale_to_error=True,
+                         linear_ramp=(1, 1))
+
+    apply_model(model, ids_mapping=data)
+
+    np.testing.assert_allclose(data['data/0/x'], expected[0])
+    np.testing.assert_allclose(data['data/1/x'], expected[1])
@@ -0,0 +1,184 @@
+from __future__ import annotations
+
+from contextlib import contextmanager
+
+import numpy as np
+import pytest
+
+from duqtools.ids import IDSMapping, LazyIDSMapping
+from duqtools.ids._mapping import EmptyVarError
+
+assert_equal = np.testing.assert_array_equal
+
+
+@pytest.fixture
+def mapping():
+
+    class t0:
+        x = np.array((1., 2., 3.))
+        empty = np.array(())
+
+    class t1:
+        x = np.array((4., 5., 6.))
+        empty = np.array(())
+
+    class Data:
+        profiles_1d = [t0, t1]
+        time = np.array((0., 1.))
+        name = 'test'
+
+    return IDSMapping(Data)
+
+
+def test_index_is_lazy(mapping):
+    assert mapping._key_index is None
+
+    mapping.findall('profiles_1d/*/x')
+    assert 'profiles_1d/0/x' in mapping
+    assert mapping
+
+    assert mapping._key_index is None
+
+    assert len(mapping) == 3
+    assert mapping._key_index is not None
+
+
+def test_findall_wildcard(mapping):
+    ret = mapping.findall('profiles_1d/*/x')
+    assert set(ret) == {'profiles_1d/0/x', 'profiles_1d/1/x'}
+    assert ret['profiles_1d/1/x'] is mapping['profiles_1d/1/x']
+
+    assert mapping.findall('profiles_1d/*/empty') == {}
+    assert mapping.findall('profiles_1d/*/missing') == {}
+    assert mapping.findall('time/*') == {}
+
+
+def test_findall_regex_fallback(mapping):
+    ret = mapping.findall(r'profiles_1d/[01]/x')
+    assert set(ret) == {'profiles_1d/0/x', 'profiles_1d/1/x'}
+
+
+def test_find_by_group(mapping):
+    ret = mapping.find_by_group('profiles_1d/*/x')
+    assert set(ret) == {'0', '1'}
+
+    ret_regex = mapping.find_by_group(r'profiles_1d/(\d)/x')
+    assert set(ret_regex) == set(ret)
+
+
+def test_contains(mapping):
+    assert 'time' in mapping
+    assert 'profiles_1d/0/x' in mapping
+    assert 'profiles_1d/0/empty' not in mapping
+    assert 'profiles_1d/2/x' not in mapping
+    assert 'profiles_1d/*/x' not in mapping
+    assert 'name' not in mapping
+
+
+class FakeEntry:
+
+    def __init__(self, data, partial=True):
+        self.data = data
+        self.partial = partial
+        self.reads = []
+
+    def get(self, ids):
+        self.reads.append(ids)
+        return self.data
+
+    def partial_get(self, ids, path):
+        if not self.partial:
+            raise NotImplementedError
+        self.reads.append(path)
+        return {
+            'time': np.array((0., 1.)),
+            'profiles_1d(:)/x': [t.x for t in self.data.profiles_1d],
+        }[path]
+
+
+class FakeHandle:
+
+    def __init__(self, entry):
+        self.entry = entry
+
+    @contextmanager
+    def open(self):
+        yield self.entry
+
+    def get_raw_data(self, ids):
+        return self.entry.get(ids)
+
+
+@pytest.mark.parametrize('partial', (True, False))
+def test_lazy_mapping(mapping, partial):
+    entry = FakeEntry(mapping._ids, partial=partial)
+    lazy = LazyIDSMapping(FakeHandle(entry), 'test')
+
+    ret = lazy.findall('profiles_1d/*/x')
+    assert set(ret) == {'profiles_1d/0/x', 'profiles_1d/1/x'}
+    assert_equal(lazy['time'], (0., 1.))
+
+    if partial:
+        assert entry.reads == ['profiles_1d(:)/x', 'time']
+        assert 'profiles_1d/0/empty' not in lazy
+        assert entry.reads[-1] == 'test'
+    else:
+        assert entry.reads == ['test']
+
+
+def test_to_xarray():
+    from imas2xarray import Variable
+
+    class t0:
+        x = np.array((1., 2., 3.))
+        y = np.array((1., 2.))
+        empty = np.array(())
+
+    class t1:
+        x = np.array((4., 5., 6.))
+        y = np.array((3., 4., 5.))
+        empty = np.array((1., ))
+
+    class Data:
+        profiles_1d = [t0, t1]
+        time = np.array((0., 1.))
+
+    mapping = IDSMapping(Data)
+
+    variables = [
+        Variable(name=name,
+                 ids='test',
+                 path=f'profiles_1d/*/{name}',
+                 dims=['time', 'x']) for name in ('x', 'y', 'empty')
+    ]
+
+    ds = mapping.to_xarray(variables[:2])
+
+    assert_equal(ds['x'], ((1., 2., 3.), (4., 5., 6.)))
+    assert_equal(ds['y'], ((1., 2., np.nan), (3., 4., 5.)))
+
+    ds = mapping.to_xarray(variables, empty_var_ok=True)
+    assert 'empty' not in ds
+
+    with pytest.raises(EmptyVarError):
+        mapping.to_xarray(variables)
+
+
+def test_write_arrays_in_parts(mapping):
+    x0 = mapping['profiles_1d/0/x']
+    new_x = np.array(((7., 8., 9.), (10., 11., 12.)))
+
+    mapping.write_arrays_in_parts({
+        'profiles_1d/*/x': new_x,
+        'profiles_1d/*/empty': new_x + 1,
+        'time': np.array((2., 3.)),
+    })
+
+    assert mapping['profiles_1d/0/x'] is x0
+    assert_equal(mapping['profiles_1d/0/x'], (7., 8., 9.))
+    assert_equal(mapping['profiles_1d/1/x'], (10., 11., 12.))
+    assert_equal(mapping['profiles_1d/1/empty'], (11., 12., 13.))
+    assert_equal(mapping['time'], (2., 3.))
+
+    with pytest.raises(KeyError):
+        mapping.write_arrays_in_parts({'profiles_1d/*/missing/x': new_x})
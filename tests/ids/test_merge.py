@@ -0,0 +1,108 @@
+from __future__ import annotations
+
+import time
+
+import pytest
+
+from duqtools.ids._merge import load_data
+
+
+class FakeHandle:
+
+    def __init__(self, i):
+        self.i = i
+
+    def get_variables(self, variables, empty_var_ok=False):
+        # Later handles finish first
+        time.sleep(0.01 * (5 - self.i))
+        return self.i
+
+
+@pytest.mark.parametrize('jobs', (1, 4))
+def test_load_data_order(jobs):
+    handles = [FakeHandle(i) for i in range(5)]
+    progress = []
+
+    ret = load_data(handles, [],
+                    jobs=jobs,
+                    pool='thread',
+                    callback=progress.append)
+
+    assert ret == [0, 1, 2, 3, 4]
+    assert progress == [0.2, 0.4, 0.6, 0.8, 1.0]
+
+
+def test_running_stats():
+    import numpy as np
+    import xarray as xr
+
+    from duqtools.ids._stats import RunningStats
+
+    rng = np.random.default_rng(123)
+
+    datasets = []
+    for _ in range(10):
+        t_e = rng.normal(size=(3, 5))
+        t_e[0, 0] = np.nan
+        datasets.append(
+            xr.Dataset(data_vars={'t_e': (('time', 'x'), t_e)},
+                       coords={'time': [0., 1., 2.]}))
+
+    stats = RunningStats(higher_moments=True)
+    for ds in datasets:
+        stats.add(ds)
+
+    ds_all = xr.concat(datasets, 'handle')
+
+    xr.testing.assert_allclose(stats.mean(), ds_all.mean(dim='handle'))
+    xr.testing.assert_allclose(stats.std(),
+                               ds_all.std(dim='handle', skipna=True))
+
+    skew = stats.skewness()['t_e'].data
+    assert np.isnan(skew[0, 0])
+    assert np.isfinite(skew[1:]).all()
+
+    stats = RunningStats()
+    for weight, ds in zip((1, 2), datasets):
+        stats.add(ds, weight=weight)
+
+    expected = (datasets[0] + 2 * datasets[1]) / 3
+    xr.testing.assert_allclose(stats.mean().isel(time=slice(1, None)),
+                               expected.isel(time=slice(1, None)))
+
+
+def test_rebase_all_coords():
+    import numpy as np
+    import xarray as xr
+    from imas2xarray import rebase_all_coords as xr_rebase_all_coords
+
+    from duqtools.ids._rebase import _interp_matrix, rebase_all_coords
+
+    rng = np.random.default_rng(123)
+
+    datasets = [
+        xr.Dataset(data_vars={
+            't_e': (('time', 'x'), rng.normal(size=(4, 6))),
+            'ip': (('time', ), rng.normal(size=4)),
+        },
+                   coords={
+                       'time': [0., 1., 2.5, 3.],
+                       'x': np.linspace(0, 1, 6),
+                   }) for _ in range(3)
+    ]
+    target = xr.Dataset(coords={
+        'time': [0.5, 1., 2., 4.],
+        'x': np.linspace(-0.1, 1.2, 9),
+    })
+
+    _interp_matrix.cache_clear()
+
+    ret = rebase_all_coords(datasets, target)
+    expected = xr_rebase_all_coords(datasets, target)
+
+    for ds, ds_expected in zip(ret, expected):
+        xr.testing.assert_allclose(ds, ds_expected)
+
+    info = _interp_matrix.cache_info()
+    assert info.misses == 2
+    assert info.hits == 4
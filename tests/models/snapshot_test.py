@@ -0,0 +1,92 @@
+from __future__ import annotations
+
+from types import SimpleNamespace
+
+from duqtools.config import Config
+from duqtools.models import Job, JobStatus, StatusSnapshot, _snapshot
+from duqtools.models._snapshot import parse_job_id
+from duqtools.systems import get_system
+from duqtools.systems.jetto import _system
+from duqtools.systems.models import SystemModel
+
+
+def test_parse_job_id():
+    assert parse_job_id(b'Submitted batch job 1234\n') == '1234'
+    assert parse_job_id(b'1234;cluster') == '1234'
+    assert parse_job_id(b'submitted') is None
+    assert parse_job_id(b'container_12') is None
+
+
+def test_status_snapshot(tmp_path, monkeypatch):
+    cfg = SimpleNamespace(system=SystemModel())
+    jobs = [Job(tmp_path / f'run_{i}', cfg=cfg) for i in range(5)]
+
+    for job in jobs:
+        job.path.mkdir()
+        job.submit_script.touch()
+
+    jobs[0].status_file.write_text(cfg.system.msg_completed)
+    jobs[1].status_file.write_text(cfg.system.msg_running)
+    jobs[1].lockfile.write_text('Submitted batch job 101')
+    jobs[2].lockfile.write_text('Submitted batch job 102')
+    jobs[3].status_file.write_text('')
+
+    queries = []
+
+    def run_query(cmd):
+        queries.append(cmd)
+        return '101|TIMEOUT\n102_0|PENDING\n102_1|PENDING\n'
+
+    monkeypatch.setattr(_snapshot, '_run_query', run_query)
+
+    snapshot = StatusSnapshot(jobs).refresh()
+
+    assert len(queries) == 1
+    assert queries[0][-1] == '101,102'
+
+    assert [snapshot.status(job) for job in jobs] == [
+        JobStatus.COMPLETED,
+        JobStatus.FAILED,
+        JobStatus.SUBMITTED,
+        JobStatus.UNKNOWN,
+        JobStatus.NOSTATUS,
+    ]
+    assert all(snapshot[job].has_submit_script for job in jobs)
+    assert [snapshot[job].has_status
+            for job in jobs] == [True, True, False, True, False]
+
+
+def test_status_snapshot_jetto_slurm(tmp_path, monkeypatch):
+    cfg = Config.from_dict({'system': {'name': 'jetto'}})
+    system = get_system(cfg=cfg)
+
+    job = Job(tmp_path / 'run_0', cfg=cfg)
+    job.path.mkdir()
+
+    class JobManager:
+
+        def submit_job_to_batch(self, config, rundir, run, exist_ok):
+            assert not run
+            return [SimpleNamespace(rundir=str(job.path))]
+
+    commands = []
+
+    def run(cmd, **kwargs):
+        commands.append(cmd)
+        return SimpleNamespace(stdout=b'4321;cluster\n')
+
+    monkeypatch.setattr(system, '_load_run_template', lambda path: None)
+    monkeypatch.setattr(_system.config, 'RunConfig', lambda template: None)
+    monkeypatch.setattr(_system.jetto_job, 'JobManager', JobManager)
+    monkeypatch.setattr(_system.sp, 'run', run)
+
+    system.submit_slurm(job)
+
+    assert commands == [['sbatch', '--parsable', str(job.submit_script)]]
+
+    monkeypatch.setattr(_snapshot, '_run_query', lambda cmd: '4321|RUNNING\n')
+
+    snapshot = StatusSnapshot([job]).refresh()
+
+    assert snapshot[job].is_submitted
+    assert snapshot.status(job) == JobStatus.RUNNING
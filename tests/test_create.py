@@ -0,0 +1,118 @@
+from __future__ import annotations
+
+from types import SimpleNamespace
+
+import pytest
+
+from duqtools import create as create_module
+from duqtools.create import create
+from duqtools.operations import op_queue, op_queue_context
+
+
+class FakeCreateManager:
+    """Creates runs by queueing an operation that touches the run dir."""
+
+    def __init__(self, cfg):
+        self.root = cfg.root
+
+    def iter_ops(self, base_only=False):
+        return ((f'run_{i:04d}', [i]) for i in range(5))
+
+    def make_run_models(self, ops_dict, absolute_dirpath=False):
+        return [
+            SimpleNamespace(dirname=self.root / name, operations=ops)
+            for name, ops in ops_dict.items()
+        ]
+
+    def create_run(self, model, **kwargs):
+        op_queue.add(action=model.dirname.mkdir, description='Create run')
+
+    def apply_ensemble(self, runs):
+        return None
+
+    def runs_yaml_exists(self):
+        return False
+
+    def data_locations_exist(self, runs):
+        return False
+
+    def run_dirs_exist(self, runs):
+        return False
+
+    def write_runs_file(self, runs, append=False):
+        pass
+
+    write_runs_csv = write_runs_file
+
+    def copy_config(self):
+        pass
+
+
+def run_dirs(cfg):
+    return [cfg.root / f'run_{i:04d}' for i in range(5)]
+
+
+@pytest.fixture
+def cfg(tmp_path, monkeypatch):
+    monkeypatch.setattr(create_module, 'CreateManager', FakeCreateManager)
+    return SimpleNamespace(root=tmp_path)
+
+
+def test_create(cfg):
+    with op_queue_context():
+        op_queue.yes = True
+        runs = create(cfg=cfg)
+
+        # Applied when the context exits
+        assert not any(cfg.root.iterdir())
+        assert op_queue.n_actions == 5
+
+    assert [run.dirname for run in runs] == run_dirs(cfg)
+    assert all(run.dirname.exists() for run in runs)
+
+
+def test_create_chunks(cfg, monkeypatch):
+    confirmed = []
+
+    def confirm_apply_all(**kwargs):
+        if op_queue:
+            confirmed.append(op_queue.yes)
+            op_queue.apply_all()
+        return True
+
+    monkeypatch.setattr(op_queue, 'confirm_apply_all', confirm_apply_all)
+
+    with op_queue_context():
+        op_queue.yes = False
+        runs = create(cfg=cfg, chunk_size=2)
+
+        assert op_queue.yes is False
+        assert not op_queue
+
+    assert confirmed == [False, True, True]
+    assert [run.dirname for run in runs] == run_dirs(cfg)
+    assert all(run.dirname.exists() for run in runs)
+    assert all(run.operations is None for run in runs)
+
+
+def test_create_declined(cfg, monkeypatch):
+    monkeypatch.setattr(op_queue, 'confirm_apply_all', lambda **kwargs: False)
+
+    with op_queue_context():
+        runs = create(cfg=cfg, chunk_size=2)
+
+    assert runs == []
+    assert not any(cfg.root.iterdir())
+
+
+def test_create_chunks_dry_run(cfg, monkeypatch):
+    monkeypatch.setattr(op_queue, 'dry_run', True)
+
+    with op_queue_context():
+        runs = create(cfg=cfg, chunk_size=2)
+
+        # Only the first chunk is shown when the context exits
+        assert op_queue.n_actions == 2
+
+    assert runs == []
+    assert not any(cfg.root.iterdir())
@@ -0,0 +1,77 @@
+from __future__ import annotations
+
+from pathlib import Path
+from types import SimpleNamespace
+from unittest.mock import patch
+
+from jetto_tools import template
+from pytest import TEST_DATA
+
+from duqtools.config import Config
+from duqtools.systems import get_system
+
+TEMPLATE = TEST_DATA / 'template_model'  # type: ignore
+
+
+def test_load_template_parsed_once():
+    config = Config.from_dict({'system': {'name': 'jetto'}})
+    system = get_system(cfg=config)
+
+    with patch.object(system, '_parse_template',
+                      wraps=system._parse_template) as parse:
+        first = system._load_template(TEMPLATE)
+        second = system._load_template(TEMPLATE)
+
+    assert parse.call_count == 1
+
+    assert first is not second
+    assert first.jset is second.jset
+    assert first.lookup == second.lookup
+
+    first.lookup['test_var'] = {}
+    assert 'test_var' not in second.lookup
+    assert 'test_var' not in system._get_template(TEMPLATE).lookup
+
+
+def test_load_run_template():
+    config = Config.from_dict({'system': {'name': 'jetto'}})
+    system = get_system(cfg=config)
+
+    expected = template.from_directory(TEMPLATE)
+    run_template = system._load_run_template(TEMPLATE)
+
+    assert str(run_template.jset) == str(expected.jset)
+    assert str(run_template.namelist) == str(expected.namelist)
+    assert run_template.extra_files == expected.extra_files
+    assert run_template.lookup == expected.lookup
+
+    run_template.lookup['test_var'] = {}
+    assert 'test_var' not in system._load_run_template(TEMPLATE).lookup
+
+
+def test_copy_extra_files(tmp_path):
+    config = Config.from_dict({'system': {'name': 'jetto'}})
+    system = get_system(cfg=config)
+
+    extra_files = dict(system._get_template(TEMPLATE).extra_files)
+    assert extra_files
+
+    jetto_template = system._load_template(TEMPLATE)
+    jetto_config = SimpleNamespace(_template=jetto_template,
+                                   _files=dict(extra_files))
+
+    run = tmp_path / 'run_0000'
+    system._copy_extra_files(jetto_config, run)
+
+    for rel_path, src in extra_files.items():
+        for drc, files in ((run, jetto_config._files),
+                           (run / '_template', jetto_template.extra_files)):
+            dst = drc / rel_path
+            assert dst.read_bytes() == Path(src).read_bytes()
+            assert not dst.samefile(src)
+            assert files[rel_path] == dst
+
+        (run / rel_path).write_bytes(b'modified')
+        assert Path(src).read_bytes() != b'modified'
+
+    assert system._get_template(TEMPLATE).extra_files == extra_files
@@ -1,6 +1,19 @@
 from __future__ import annotations
 
-from duqtools.operations import Operation, add_to_op_queue, op_queue, op_queue_context
+import multiprocessing
+
+import pytest
+
+from duqtools.operations import (
+    LaneProgress,
+    Operation,
+    add_to_op_queue,
+    apply_graph,
+    dependencies,
+    op_queue,
+    op_queue_context,
+    worker_pool,
+)
 
 op_queue.yes = True
 
@@ -104,3 +117,131 @@ def test_without_queue_enabled(tmp_path):
     op_queue.put(
         Operation(action=test_file2.touch, description='touching test file2'))
     assert (test_file2.exists())
+
+
+def test_operation_apply_all_groups(tmp_path):
+    with op_queue_context():
+
+        @add_to_op_queue('writing {file}')
+        def write(file, text):
+            with open(file, 'a') as f:
+                f.write(text)
+
+        for i in range(4):
+            with op_queue.group(i):
+                write(tmp_path / f'{i}.txt', 'a')
+                write(tmp_path / f'{i}.txt', 'b')
+
+        write(tmp_path / 'done.txt', 'c')
+
+        assert all(op.group is not None for op in list(op_queue)[:-1])
+        assert op_queue[-1].group is None
+
+        op_queue.apply_all(jobs=2)
+
+        for i in range(4):
+            assert (tmp_path / f'{i}.txt').read_text() == 'ab'
+        assert (tmp_path / 'done.txt').read_text() == 'c'
+
+
+def test_dependencies():
+
+    def op(**kwargs):
+        return Operation(action=print, description='op', **kwargs)
+
+    ops = [
+        op(writes=('a', )),
+        op(reads=('a', ), writes=('b', )),
+        op(reads=('a', )),
+        op(writes=('a', )),
+        op(group=1),
+        op(group=1, reads=('b', )),
+        op(),
+        op(writes=('c', )),
+    ]
+
+    assert dependencies(ops) == [
+        set(),
+        {0},
+        {0},
+        {0, 1, 2},
+        set(),
+        {1, 4},
+        {0, 1, 2, 3, 4, 5},
+        {6},
+    ]
+
+
+@pytest.mark.parametrize('pool', ('thread', 'process'))
+def test_apply_graph_cancel_dependents(tmp_path, pool):
+
+    def fail():
+        raise ValueError('fail')
+
+    done = []
+
+    ops = [
+        Operation(action=fail, description='fail', writes=('a', )),
+        Operation(action=(tmp_path / 'b').touch,
+                  description='b',
+                  reads=('a', )),
+        Operation(action=(tmp_path / 'c').touch,
+                  description='c',
+                  writes=('c', )),
+    ]
+
+    with pytest.raises(ValueError):
+        apply_graph(ops, jobs=2, pool=pool, callback=done.append)
+
+    assert not (tmp_path / 'b').exists()
+    assert (tmp_path / 'c').exists()
+    assert [op.description for op in done] == ['c']
+
+
+def test_worker_pool_forks_on_start(tmp_path):
+    ops = [
+        Operation(action=(tmp_path / name).touch,
+                  description=name,
+                  writes=(name, )) for name in 'ab'
+    ]
+
+    with worker_pool(ops, jobs=2) as submit:
+        assert len(multiprocessing.active_children()) == 2
+        apply_graph(ops, jobs=2, submit=submit)
+
+    assert (tmp_path / 'a').exists()
+    assert (tmp_path / 'b').exists()
+
+
+def test_lane_progress():
+
+    def op(group):
+        return Operation(action=print, description='op', group=group)
+
+    ops = [op(0), op(0), op(1), op(2), op(None)]
+    lanes = LaneProgress(ops)
+
+    assert lanes.counts() == {
+        'lanes': 4,
+        'running': 0,
+        'waiting': 4,
+        'done': 0,
+        'failed': 0,
+    }
+
+    for i in (0, 2, 3):
+        lanes.start(ops[i])
+    lanes.finish(ops[0])
+    lanes.fail(ops[3])
+
+    assert lanes.counts() == {
+        'lanes': 4,
+        'running': 1,
+        'waiting': 2,
+        'done': 0,
+        'failed': 1,
+    }
+    assert lanes.description() == 'Running: 1'
+
+    lanes.finish(ops[2])
+    assert lanes.counts()['done'] == 1
@@ -7,7 +7,7 @@ def test_cartesian_product():
     i = 'ab'
     j = 'def'
 
-    ret = cartesian_product(i, j)
+    ret = list(cartesian_product(i, j))
 
     assert ret == [('a', 'd'), ('a', 'e'), ('a', 'f'), ('b', 'd'), ('b', 'e'),
                    ('b', 'f')]
@@ -18,7 +18,7 @@ def test_latin_hypercube():
     j = 'cde'
     k = 'fghi'
 
-    ret = latin_hypercube(i, j, k, n_samples=3, seed=123)
+    ret = list(latin_hypercube(i, j, k, n_samples=3, seed=123))
 
     assert ret == [('b', 'e', 'h'), ('b', 'd', 'h'), ('a', 'c', 'f')]
 
@@ -28,7 +28,7 @@ def test_sobol():
     j = 'cde'
     k = 'fghi'
 
-    ret = sobol(i, j, k, n_samples=4, seed=123)
+    ret = list(sobol(i, j, k, n_samples=4, seed=123))
 
     assert ret == [('b', 'd', 'g'), ('a', 'c', 'i'), ('a', 'e', 'f'),
                    ('b', 'c', 'h')]
@@ -39,7 +39,41 @@ def test_halton():
     j = 'cde'
     k = 'fghi'
 
-    ret = halton(i, j, k, n_samples=4, seed=123)
+    ret = list(halton(i, j, k, n_samples=4, seed=123))
 
     assert ret == [('a', 'c', 'f'), ('b', 'd', 'g'), ('a', 'e', 'i'),
                    ('b', 'c', 'h')]
+
+
+def test_cartesian_product_lazy():
+    ret = cartesian_product(range(10**6), range(10**6))
+
+    assert next(ret) == (0, 0)
+    assert next(ret) == (0, 1)
+
+
+def test_continuous_dimension():
+    import pytest
+    from imas2xarray import Variable
+
+    from duqtools.schema import IDSOperationDim
+
+    variable = Variable(name='var', path='data/*/x', ids='test', dims=[])
+    dim = IDSOperationDim(variable=variable,
+                          values={
+                              'distribution': 'log-uniform',
+                              'lower': 0.1,
+                              'upper': 10
+                          })
+
+    expanded = dim.expand(variable=variable)
+
+    ret = list(latin_hypercube('ab', expanded, n_samples=100, seed=123))
+
+    assert len(ret) == 100
+    assert {i for i, _ in ret} == {'a', 'b'}
+    assert all(0.1 <= op.value <= 10 for _, op in ret)
+    assert len({op.value for _, op in ret}) == 100
+
+    with pytest.raises(ValueError):
+        cartesian_product('ab', expanded)
@@ -0,0 +1,59 @@
+from __future__ import annotations
+
+from pathlib import Path
+from types import SimpleNamespace
+
+from duqtools.models import JobStatus
+from duqtools.status import StepTimeReader, render_detailed
+from duqtools.systems.jetto._fields import get_run_info
+
+
+def step_line(i: int) -> str:
+    return f'  STEP=  {i:6d}  TIME=  {i / 10:.4E}  DTIME= 1.0E-03\n'
+
+
+def test_step_time_reader(tmp_path):
+    out_file = tmp_path / 'jetto.out'
+    reader = StepTimeReader(out_file, block_size=16)
+
+    assert reader.read() is None
+
+    out_file.write_text('header\n' + step_line(1) + step_line(2) + 'x' * 100 +
+                        '\n')
+    assert reader.read() == 0.2
+
+    with open(out_file, 'a') as f:
+        f.write(step_line(3)[:10])
+    assert reader.read() == 0.2
+
+    with open(out_file, 'a') as f:
+        f.write(step_line(3)[10:] + 'footer\n')
+    assert reader.read() == 0.3
+
+    out_file.write_text(step_line(4))
+    assert reader.read() == 0.4
+
+
+def test_get_run_info():
+    run_info = get_run_info(Path('tests', 'test_data', 'template_model'))
+
+    assert run_info.start_time == 45.75
+    assert run_info.end_time == 45.76
+    assert run_info.kwmain == 1
+
+
+def test_render_detailed():
+    monitors = [
+        SimpleNamespace(job=SimpleNamespace(path=Path(f'run_{i:04d}')),
+                        status=JobStatus.RUNNING,
+                        progress=i % 100) for i in range(1000)
+    ]
+    monitors[0].status = JobStatus.COMPLETED
+
+    lines = render_detailed(monitors, n_slowest=3, n_buckets=4)
+
+    assert len(lines) == 2 + 4 + 1 + 3
+    assert 'completed: 1' in lines[0]
+    assert 'running: 999' in lines[0]
+    assert lines[2].endswith(' 249')
+    assert lines[-3].split() == ['run_0100', '0%']
@@ -0,0 +1,126 @@
+from __future__ import annotations
+
+import asyncio
+import csv
+import time
+from collections import deque
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+
+from duqtools.models import JobStatus
+from duqtools.submit import ScheduleJournal, TokenBucket, _schedule, submit_jobs
+from duqtools.systems.jetto._batchfile import group_array_jobs
+
+
+class FakeJob:
+
+    def __init__(self, name: str, polls: int = 2):
+        self.path = Path(name)
+        self.polls = polls
+        self.submitted = False
+        self.n_submit = 0
+
+    def __repr__(self):
+        return f'FakeJob({self.path})'
+
+    def submit(self):
+        self.submitted = True
+        self.n_submit += 1
+
+    def status(self):
+        if not self.submitted:
+            return JobStatus.NOSTATUS
+        self.polls -= 1
+        return JobStatus.RUNNING if self.polls > 0 else JobStatus.COMPLETED
+
+
+def test_schedule(tmp_path):
+    journal = ScheduleJournal(tmp_path / 'journal.jsonl')
+    jobs = [FakeJob(f'run_{i}') for i in range(5)]
+    jobs[0].submitted = True
+
+    journal.reset(jobs)
+    assert set(journal.load().values()) == {journal.QUEUED}
+
+    asyncio.run(
+        _schedule(deque(jobs[1:]),
+                  running=jobs[:1],
+                  max_jobs=2,
+                  journal=journal,
+                  min_interval=0,
+                  max_interval=0))
+
+    assert all(job.n_submit == 1 for job in jobs[1:])
+    assert jobs[0].n_submit == 0
+
+    assert set(journal.load().values()) == {journal.DONE}
+
+
+def test_journal_resume_state(tmp_path):
+    journal = ScheduleJournal(tmp_path / 'journal.jsonl')
+    a, b = FakeJob('a'), FakeJob('b')
+
+    journal.reset((a, b))
+    journal.record(a, journal.RUNNING)
+
+    with open(journal.path, 'a') as f:
+        f.write('{"job": "b", "sta')  # interrupted write
+
+    assert journal.load() == {
+        Path('a'): journal.RUNNING,
+        Path('b'): journal.QUEUED,
+    }
+
+
+def test_token_bucket():
+    bucket = TokenBucket(rate=100)
+
+    start = time.monotonic()
+    for _ in range(11):
+        bucket.acquire()
+
+    assert time.monotonic() - start == pytest.approx(0.1, abs=0.05)
+
+
+def test_submit_jobs(tmp_path):
+    jobs = [FakeJob(f'run_{i}') for i in range(10)]
+
+    def fail():
+        raise RuntimeError('sbatch: error')
+
+    jobs[3].submit = fail
+
+    report = submit_jobs(jobs, rate=1000, workers=3)
+
+    assert all(job.n_submit == 1 for job in jobs if job is not jobs[3])
+    assert report.n_failed == 1
+    assert report.throughput > 0
+
+    report.write_csv(tmp_path / 'report.csv')
+
+    with open(tmp_path / 'report.csv') as f:
+        records = list(csv.DictReader(f))
+
+    assert len(records) == 10
+    assert {r['job']: r['status'] for r in records}['run_3'] == 'failed'
+
+
+def test_group_array_jobs(tmp_path):
+    jobs = []
+    for i, n_proc in enumerate((1, 4, 1)):
+        path = tmp_path / f'run_{i}'
+        path.mkdir()
+        submit_script = path / '.llcmd'
+        submit_script.write_text(f'#!/bin/sh\n#SBATCH -J run_{i}\n'
+                                 f'#SBATCH -n {n_proc}\n')
+        jobs.append(SimpleNamespace(path=path, submit_script=submit_script))
+
+    groups = group_array_jobs(jobs)
+
+    assert [(name, [job.path.name for job in group])
+            for name, group in groups] == [
+                ('duqtools_slurm_array.sh', ['run_0', 'run_2']),
+                ('duqtools_slurm_array_1.sh', ['run_1']),
+            ]